@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Benchmarks for AddressBook persistence
+"""
+
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from tasks.address_book import AddressBook, Record
+from tasks.address_book.storage import CODECS, FORMATS
+
+
+def build_book(size: int, seed: int = 42) -> AddressBook:
+    """ Build an address book with the given number of random contacts
+
+    :param size: number of contacts (int, mandatory)
+    :param seed: random generator seed (int, optional)
+    :return: address book (AddressBook)
+    """
+    rnd = random.Random(seed)
+    domains = ["gmail.com", "ukr.net", "example.com", "company.com.ua"]
+    book = AddressBook()
+    for index in range(size):
+        book.add_record(
+            Record(
+                f"Contact{index}",
+                birthday=f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1950, 2010)}",
+                phones=[f"0{rnd.randint(100000000, 999999999)}" for _ in range(rnd.randint(1, 3))],
+                emails=[f"contact{index}.{n}@{rnd.choice(domains)}" for n in range(rnd.randint(0, 2))],
+            )
+        )
+    return book
+
+
+def bench_persistence(book: AddressBook, directory: Path, repeat: int = 3) -> None:
+    """ Print the data file size, save and load time for each format and codec
+
+    :param book: address book (AddressBook, mandatory)
+    :param directory: directory for the data files (Path, mandatory)
+    :param repeat: number of repetitions, the best time is reported (int, optional)
+    """
+    print(f"{'format':<8}{'codec':<8}{'size, KiB':>12}{'save, ms':>12}{'load, ms':>12}")
+    for file_format in FORMATS:
+        for codec in CODECS:
+            datafile: Path = directory / f"addressbook.{file_format}.{codec}.pkl"
+            setattr(book, "_AddressBook__datafile", datafile)
+            book.codec = codec
+            book.file_format = file_format
+            save_time: float = min(timeit.repeat(book.save, number=1, repeat=repeat))
+            load_time: float = min(
+                timeit.repeat(lambda: AddressBook.load(datafile, file_format=file_format), number=1, repeat=repeat)
+            )
+            print(
+                f"{file_format:<8}{codec:<8}{datafile.stat().st_size / 1024:>12.1f}"
+                f"{save_time * 1000:>12.1f}{load_time * 1000:>12.1f}"
+            )
+
+
+def main():
+    for size in (1_000, 10_000, 50_000):
+        print("#" * 20, f"  Persistence formats and codecs, {size} contacts  ", "#" * 20)
+        book = build_book(size)
+        with tempfile.TemporaryDirectory() as directory:
+            bench_persistence(book, Path(directory))
+
+    exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,4 @@ __title__ = 'Home Work Tasks'
 __author__ = 'Roman'
 
 
-__all__ = ['address_book', 'contacts_bot']
+__all__ = ['address_book', 'contacts_bot', 'contacts_sync']
@@ -5,5 +5,9 @@ __author__ = 'Roman'
 
 
 from .book import AddressBook, Record
+from .manager import BookManager
+from .autosave import Autosaver
+from .replication import Primary, Replica, ReplicationServer, JournalFile
+from .shared import SharedPublisher, SharedReader
 
-__all__ = ['AddressBook', 'Record']
+__all__ = ['AddressBook', 'Record', 'BookManager', 'Autosaver', 'Primary', 'Replica', 'ReplicationServer', 'JournalFile', 'SharedPublisher', 'SharedReader']
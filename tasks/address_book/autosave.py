@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Background saving of the address book, which does not block its users on disk
+"""
+
+import logging
+import threading
+from typing import Optional
+from contextlib import AbstractContextManager
+
+
+from .book import AddressBook, Snapshot
+from .mutation import Mutation
+
+
+logger = logging.getLogger(__name__)
+
+
+def save_snapshot(book: AddressBook, lock: AbstractContextManager) -> bool:
+    """ Save the changed address book, holding the lock only while it is serialized in memory.
+    If the data file has been saved by another process meanwhile, the address book is saved with the merge
+    holding the lock.
+
+    :param book: the address book (AddressBook, mandatory)
+    :param lock: the lock, which guards the address book changes (Lock, mandatory)
+    :return: True if the address book is saved, False if nothing is changed (bool)
+    """
+    with lock:
+        snapshot: Optional[Snapshot] = book.snapshot()
+    if snapshot is None:
+        return False
+    if book.write_snapshot(snapshot):
+        with lock:
+            book.commit_snapshot(snapshot)
+    else:
+        with lock:
+            book.save()
+    return True
+
+
+class Autosaver:
+    def __init__(
+            self,
+            book: AddressBook,
+            lock: Optional[AbstractContextManager] = None,
+            interval: float = 30.0,
+            mutations: int = 100,
+    ):
+        """ Initialize the background saving of the address book
+
+        :param book: the address book with the data file (AddressBook, mandatory)
+        :param lock: the lock, which the users hold while they change the address book (Lock, optional)
+        :param interval: the number of seconds between the saves of the changed address book (float, optional)
+        :param mutations: the number of the mutations, which triggers the save before the interval ends (int, optional)
+        """
+        self.__book = book
+        self.lock = lock or threading.RLock()
+        self.__interval = interval
+        self.__mutations = mutations
+        # Number of the mutations since the last save
+        self.__pending: int = 0
+        self.__wake = threading.Event()
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        # The error of the last failed save, None if the last save succeeded
+        self.__error: Optional[Exception] = None
+
+    def __enter__(self) -> "Autosaver":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def changed(self, mutations: list[Mutation]) -> None:
+        """ Count the mutations of the address book, waking the background thread, if there are enough of them
+
+        :param mutations: the applied mutations (list of Mutation, mandatory)
+        """
+        self.__pending += len(mutations)
+        if self.__pending >= self.__mutations:
+            self.__wake.set()
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """ Return the error of the last failed save, the changes are not written until a save succeeds
+
+        :return: the save error, None if the last save succeeded (Exception, optional)
+        """
+        return self.__error
+
+    def flush(self) -> bool:
+        """ Save the changed address book, or raise the save error
+
+        :return: True if the address book is saved, False if nothing is changed (bool)
+        """
+        self.__pending = 0
+        try:
+            saved: bool = save_snapshot(self.__book, self.lock)
+        except Exception as e:
+            self.__error = e
+            raise
+        self.__error = None
+        return saved
+
+    def __run(self) -> None:
+        """ Private method of the background thread, saving the address book until the autosaver is closed.
+        The failed saves are logged and retried by the next run.
+        """
+        while not self.__stop.is_set():
+            self.__wake.wait(self.__interval)
+            self.__wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("The address book could not be saved in the background", exc_info=e)
+
+    def start(self) -> None:
+        """ Start saving the address book in the background
+        """
+        if self.__thread is None:
+            self.__book.subscribe(self.changed)
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__run, name="address-book-autosave", daemon=True)
+            self.__thread.start()
+
+    def close(self) -> None:
+        """ Stop the background thread and save the changed address book, or raise the save error,
+        if the changes are still not written
+        """
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__wake.set()
+            self.__thread.join()
+            self.__thread = None
+            self.__book.unsubscribe(self.changed)
+        self.flush()
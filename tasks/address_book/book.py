@@ -4,44 +4,193 @@
 Address Book class implementation
 """
 
+import io
+import re
+import mmap
+import calendar
 import datetime
 import pickle
-from typing import Optional, Union
+from typing import Optional, Union, Callable
+from contextlib import contextmanager
 from collections import UserDict, namedtuple, defaultdict
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator, MutableMapping
 from pathlib import Path
 
 
-from .error import ContactNotFound, ContactAlreadyExist, AddressBookDataFileWrongFormat
+from .error import (
+    ContactNotFound,
+    ContactAlreadyExist,
+    ContactNameAmbiguous,
+    ContactPhoneValueError,
+    AddressBookDataFileWrongFormat,
+)
 from .record import Record
+from .record.record import Phone
+from .dedupe import duplicate_clusters
+from .mutation import Mutation, invert
+from .history import MutationHistory
+from .index import BirthdayIndex, PhoneIndex, ContentIndex, EmailIndex, NameIndex
+from .query import Predicate, QueryIndexes, QueryPlan, plan, execute
+from .statistics import BookStatistics
+from .cache import RecordCache, CacheInfo
+from .storage import (
+    verify_codec,
+    verify_format,
+    compressed_writer,
+    decompressed_reader,
+    file_lock,
+    atomic_writer,
+    binary,
+)
+
+
+# The contact with its congratulation date
+UpcomingBirthday = namedtuple('UpcomingBirthday', ['contact', 'congratulation_date'])
+
+# The Address Book serialized in memory: the data file content, its version stamp
+# and the number of the mutations applied before the serialization
+Snapshot = namedtuple('Snapshot', ['data', 'version_stamp', 'sequence'])
+
+# Differences of the other Address Book: names of the added, removed and changed contacts
+BookDiff = namedtuple('BookDiff', ['added', 'removed', 'changed'])
 
 
 class AddressBook(UserDict):
-    def __init__(self, *args, congratulation_range_days: int = 7, datafile: Optional[Union[Path, str]] = None):
+    def __init__(
+            self,
+            *args,
+            congratulation_range_days: int = 7,
+            datafile: Optional[Union[Path, str]] = None,
+            codec: Optional[str] = None,
+            file_format: Optional[str] = None,
+            history_size: int = 100,
+            cache_size: Optional[int] = None,
+    ):
         """ Initialize an Address Book with the specified Contacts and the birthday congratulations days range, if given
 
         :param args: the contact records (Record, optional)
         :param upcoming_birthdays_period: the birthday congratulations days range (int)
         :param datafile: the file path where the address book data will be stored when it is saved, if specified
                          (string, Path, optional)
+        :param codec: the data file compression codec: "none", "zlib", "bz2" or "lzma" (string, optional)
+        :param file_format: the data file format: "binary" or "pickle" (string, optional)
+        :param history_size: the maximum number of the undo and redo steps (int, optional)
+        :param cache_size: the maximum number of the contact records kept in memory, the other records are evicted
+                           to a temporary dbm file; all the records are kept in memory by default (int, optional)
         """
         super().__init__()
+        if cache_size:
+            self.data = RecordCache(cache_size, owner=self)
         self.__congratulation_range_days = congratulation_range_days or 7
         self.__datafile = datafile
+        self.__codec = verify_codec(codec)
+        self.__file_format = verify_format(file_format)
+        # Mutations of the current batch, None if there is no batch
+        self.__batch: Optional[list[Mutation]] = None
+        # Subscribers notified about the mutations, once per batch
+        self.__listeners: list[Callable[[list[Mutation]], None]] = []
+        # Subscribers notified about each mutation at once, when it is applied
+        self.__observers: list[Callable[[list[Mutation]], None]] = []
+        # Undo/redo history, the history is not recorded while the step is undone or redone
+        self.__history = MutationHistory(history_size)
+        self.__replaying: bool = False
+        # Pre-rendered readable strings of the contacts, invalidated by each mutation
+        self.__rendered_lines: Optional[list[str]] = None
+        # The upcoming birthdays report with its key: today's date and the congratulations days range
+        self.__upcoming_birthdays_report: Optional[tuple[tuple, dict[datetime.date, list[Record]]]] = None
+        # Sorted day-of-year index of the birthdays, built on the first query
+        self.__birthday_index: Optional[BirthdayIndex] = None
+        # Sorted index of the phone numbers, built on the first query
+        self.__phone_index: Optional[PhoneIndex] = None
+        # Index of the emails by the domain, built on the first query
+        self.__email_index: Optional[EmailIndex] = None
+        # Index of the names by the caseless key, built on the first lookup, which is not an exact match
+        self.__name_index: Optional[NameIndex] = None
+        # Merkle-style index of the contact content hashes, built on the first comparison
+        self.__content_index: Optional[ContentIndex] = None
+        # Aggregate statistics, updated by each mutation and stored with the Address Book
+        self.__statistics = BookStatistics()
+        # Version stamp of the data file, which the Address Book was loaded from or saved to, 0 if there is none
+        self.__version_stamp: int = 0
+        # Names of the contacts changed since the Address Book was loaded or saved, merged into the newer data file,
+        # with the sequence number of their last mutation
+        self.__changed: dict[str, int] = {}
+        self.__sequence: int = 0
         # Add contact records if given, removing duplicates
         for contact in args:
             if str(contact.name) not in self:
                 self.add_record(contact)
+        # The initial records can not be undone
+        self.__history.clear()
 
     def __getstate__(self):
         attributes = self.__dict__.copy()
+        # The records evicted to the temporary dbm file are stored with the Address Book as well
+        if isinstance(self.data, RecordCache):
+            attributes["data"] = dict(self.data)
         # Clear the Address Book data file path
         if f"_{self.__class__.__name__}__datafile" in attributes:
             attributes[f"_{self.__class__.__name__}__datafile"] = None
+        # The batch and the subscribers are not stored with the Address Book
+        attributes[f"_{self.__class__.__name__}__batch"] = None
+        attributes[f"_{self.__class__.__name__}__listeners"] = []
+        attributes[f"_{self.__class__.__name__}__observers"] = []
+        # The undo/redo history is kept only for the current session
+        attributes[f"_{self.__class__.__name__}__history"] = None
+        attributes[f"_{self.__class__.__name__}__replaying"] = False
+        attributes[f"_{self.__class__.__name__}__rendered_lines"] = None
+        attributes[f"_{self.__class__.__name__}__upcoming_birthdays_report"] = None
+        attributes[f"_{self.__class__.__name__}__birthday_index"] = None
+        attributes[f"_{self.__class__.__name__}__phone_index"] = None
+        attributes[f"_{self.__class__.__name__}__email_index"] = None
+        attributes[f"_{self.__class__.__name__}__name_index"] = None
+        attributes[f"_{self.__class__.__name__}__content_index"] = None
+        attributes[f"_{self.__class__.__name__}__changed"] = {}
+        attributes[f"_{self.__class__.__name__}__sequence"] = 0
         return attributes
 
     def __setstate__(self, value):
         self.__dict__ = value
+        # Data files saved before the compression support do not contain the codec
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__codec", "none")
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__file_format", "binary")
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__batch", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__listeners", [])
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__observers", [])
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__replaying", False)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__rendered_lines", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__upcoming_birthdays_report", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__birthday_index", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__phone_index", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__email_index", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__name_index", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__content_index", None)
+        # Data files saved before the version stamps have the stamp 0
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__version_stamp", 0)
+        self.__changed = {}
+        self.__sequence = 0
+        # Data files saved before the statistics support do not contain it
+        if f"_{self.__class__.__name__}__statistics" not in self.__dict__:
+            self.__statistics = BookStatistics(self.data.values())
+        if self.__dict__.get(f"_{self.__class__.__name__}__history") is None:
+            self.__history = MutationHistory()
+        # Attach the records to the Address Book to receive their mutations
+        for contact in self.data.values():
+            contact.attach(self)
+
+    @staticmethod
+    def congratulation_day(birthday: datetime.date) -> datetime.date:
+        """Calculate the congratulation date of the birthday.
+        If the birthday falls on a weekend, the congratulation date is shifted to the following Monday.
+
+        :param birthday: the birthday anniversary (date, mandatory)
+        :return: Congratulation date (date)
+        """
+        # Verify if the birthday falls on a weekend
+        if birthday.isoweekday() in {6, 7, }:
+            # Shift the congratulation date to the following Monday, as it falls on a weekend
+            birthday += datetime.timedelta(days=((7 - birthday.isoweekday()) + 1))
+        return birthday
 
     def __congratulation_date(self, contact: Record, today: Optional[datetime.date] = None) -> Optional[datetime.date]:
         """Private method for calculation the congratulation date.
@@ -65,65 +214,425 @@ class AddressBook(UserDict):
                 # including today, return None
                 return None
 
-            # Verify if the birthday falls on a weekend
-            if next_birthday.isoweekday() in {6, 7, }:
-                # Shift the congratulation date to the following Monday, as it falls on a weekend
-                next_birthday += datetime.timedelta(days=((7 - next_birthday.isoweekday()) + 1))
-
-            # Return congratulation date as string in 'YYYY.MM.DD' format
-            return next_birthday
+            # Return congratulation date, shifted from a weekend
+            return self.congratulation_day(next_birthday)
         except Exception as e:
             # An unexpected error occurred
             # Raise an exception to the upper level
             raise Exception("An unexpected error occurred: {error}.".format(error=repr(e)))
 
+    def __names(self) -> NameIndex:
+        """ Private method for returning the name index, building it on the first lookup.
+        The index is maintained by the mutations afterwards.
+
+        :return: the name index (NameIndex)
+        """
+        if self.__name_index is None:
+            self.__name_index = NameIndex()
+            self.__name_index.extend(self.data.keys())
+        return self.__name_index
+
+    def name_variants(self, name: str) -> list[str]:
+        """ Return the names of the contacts, which differ from the name only by the case or the Unicode
+        normalization form, for example, "John" and "john"
+
+        :param name: contact name (string, mandatory)
+        :return: contact names, in the order of adding (list of strings)
+        """
+        return self.__names().variants(name)
+
+    def __resolve(self, name: str) -> str:
+        """ Private method for returning the name of the existing contact: the exact match,
+        or the only variant differing by the case or the Unicode normalization form.
+        If there are many variants and none of them is the exact match, raise the ambiguous name exception.
+
+        :param name: contact name (string, mandatory)
+        :return: the existing contact name (string)
+        """
+        if name in self.data:
+            return name
+        variants: list[str] = self.name_variants(name)
+        if not variants:
+            # Contact not found - raise the contact not found exception
+            raise ContactNotFound()
+        if len(variants) > 1:
+            raise ContactNameAmbiguous(name, variants)
+        return variants[0]
+
     def find(self, name: str) -> Record:
-        """ Search and return the contact record, or raise the contact not found exception
+        """ Search and return the contact record, or raise the contact not found exception.
+        The name is case-insensitive and normalization-insensitive, the exact match is preferred,
+        the name matching many contacts only by the case raises the ambiguous name exception.
 
         :param name: contact name (string, mandatory)
         :return: contact record, if found (Record)
         """
-        if name not in self:
-            # Contact found - raise the contact not found exception
-            raise ContactNotFound
         # Return the contact
-        return self.get(name, None)
+        return self.data[self.__resolve(name)]
 
-    def add_record(self, contact: Record) -> None:
+    def add_record(self, contact: Record, allow_variants: bool = True) -> None:
         """ Add the contact record, or raise the contact already exists exception
 
         :param contact: contact record (Record, mandatory)
+        :param allow_variants: determines whether the contact can be added, if another contact name differs
+                               only by the case or the Unicode normalization form (bool, optional)
         """
-        if str(contact.name) in self:
+        if str(contact.name) in self or not allow_variants and self.name_variants(str(contact.name)):
             # Contact found - raise the contact already exists exception
             raise ContactAlreadyExist()
         # Add the contact
         self.data[str(contact.name)] = contact
+        contact.attach(self)
+        self.__publish(Mutation("add_record", str(contact.name), None, contact))
 
     def delete_record(self, name: str) -> None:
         """ Remove the contact record, or raise the contact not found exception
 
+        :param name: contact name, case-insensitive and normalization-insensitive (string, mandatory)
+        """
+        self.__delete(self.__resolve(name))
+
+    def __delete(self, name: str) -> None:
+        """ Private method for removing the contact record by the exact name, or raising the contact not found exception
+
         :param name: contact name (string, mandatory)
         """
-        if name not in self:
-            # Contact found - raise the contact not found exception
+        if name not in self.data:
+            # Contact not found - raise the contact not found exception
             raise ContactNotFound()
         # Remove the contact
-        self.pop(name, None)
+        contact: Record = self.data.pop(name)
+        contact.detach()
+        self.__publish(Mutation("delete_record", name, contact, None))
+
+    def notify(self, contact: Record, mutation: Mutation) -> None:
+        """ Receive the mutation of the contact record, which belongs to the Address Book
+
+        :param contact: the changed contact record (Record, mandatory)
+        :param mutation: the record mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "edit_name" and mutation.before != mutation.after:
+            # The contact name is the key - move the contact to the new key
+            self.data.pop(mutation.before, None)
+            self.data[mutation.after] = contact
+        elif isinstance(self.data, RecordCache):
+            # The changed record is written to the dbm file, when it is evicted
+            self.data.touch(mutation.name, contact)
+        self.__publish(mutation)
+
+    def subscribe(self, listener: Callable[[list[Mutation]], None], immediate: bool = False) -> None:
+        """ Subscribe the listener to the mutations of the Address Book and its records.
+        The listener receives the mutations once per batch, or one by one outside of a batch.
+        The immediate listener receives each mutation at once, when it is applied, including the mutations
+        of the batch, which is rolled back afterwards, and their inverse mutations.
+
+        :param listener: the listener (Callable, mandatory)
+        :param immediate: determines whether the listener receives each mutation at once (bool, optional)
+        """
+        (self.__observers if immediate else self.__listeners).append(listener)
+
+    def unsubscribe(self, listener: Callable[[list[Mutation]], None]) -> None:
+        """ Unsubscribe the listener from the mutations
+
+        :param listener: the listener (Callable, mandatory)
+        """
+        for listeners in (self.__listeners, self.__observers, ):
+            if listener in listeners:
+                listeners.remove(listener)
+
+    def __publish(self, mutation: Mutation) -> None:
+        """ Private method for collecting the mutation into the current batch, or dispatching it at once
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        # The derived data is updated at once, so it is consistent inside the batch as well
+        self.__rendered_lines = None
+        if mutation.operation in {"add_record", "delete_record", "edit_birthday", "remove_birthday", }:
+            self.__upcoming_birthdays_report = None
+        if self.__birthday_index is not None:
+            self.__update_birthday_index(mutation)
+        if self.__phone_index is not None:
+            self.__update_phone_index(mutation)
+        if self.__email_index is not None:
+            self.__update_email_index(mutation)
+        if self.__name_index is not None:
+            self.__update_name_index(mutation)
+        if self.__content_index is not None:
+            self.__update_content_index(mutation)
+        self.__statistics.update(mutation, self.data.get(mutation.name))
+        # Both the old and the new name of the renamed contact are changed
+        self.__sequence += 1
+        self.__changed[mutation.name] = self.__sequence
+        if mutation.operation == "edit_name":
+            self.__changed[mutation.after] = self.__sequence
+        for observer in list(self.__observers):
+            observer([mutation])
+
+        if self.__batch is not None:
+            self.__batch.append(mutation)
+        else:
+            self.__dispatch([mutation])
+
+    def __update_birthday_index(self, mutation: Mutation) -> None:
+        """ Private method for updating the birthday index by the mutation
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "add_record" and mutation.after.birthday is not None:
+            self.__birthday_index.add(mutation.name, mutation.after.birthday.date_of_birth())
+        elif mutation.operation == "delete_record" and mutation.before.birthday is not None:
+            self.__birthday_index.remove(mutation.name, mutation.before.birthday.date_of_birth())
+        elif mutation.operation in {"edit_birthday", "remove_birthday", }:
+            if mutation.before is not None:
+                self.__birthday_index.remove(mutation.name, mutation.before)
+            if mutation.after is not None:
+                self.__birthday_index.add(mutation.name, mutation.after)
+        elif mutation.operation == "edit_name" and (birthday := self.data[mutation.after].birthday) is not None:
+            self.__birthday_index.remove(mutation.before, birthday.date_of_birth())
+            self.__birthday_index.add(mutation.after, birthday.date_of_birth())
+
+    def __update_phone_index(self, mutation: Mutation) -> None:
+        """ Private method for updating the phone index by the mutation
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "add_record":
+            for phone in mutation.after.phones:
+                self.__phone_index.add(mutation.name, phone.value)
+        elif mutation.operation == "delete_record":
+            for phone in mutation.before.phones:
+                self.__phone_index.remove(mutation.name, phone.value)
+        elif mutation.operation in {"add_phone", "remove_phone", "edit_phone", }:
+            if mutation.before is not None:
+                self.__phone_index.remove(mutation.name, mutation.before)
+            if mutation.after is not None:
+                self.__phone_index.add(mutation.name, mutation.after)
+        elif mutation.operation == "edit_name":
+            for phone in self.data[mutation.after].phones:
+                self.__phone_index.remove(mutation.before, phone.value)
+                self.__phone_index.add(mutation.after, phone.value)
+
+    def __update_email_index(self, mutation: Mutation) -> None:
+        """ Private method for updating the email index by the mutation
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "add_record":
+            for email in mutation.after.emails:
+                self.__email_index.add(mutation.name, email.value)
+        elif mutation.operation == "delete_record":
+            for email in mutation.before.emails:
+                self.__email_index.remove(mutation.name, email.value)
+        elif mutation.operation in {"add_email", "remove_email", "edit_email", }:
+            if mutation.before is not None:
+                self.__email_index.remove(mutation.name, mutation.before)
+            if mutation.after is not None:
+                self.__email_index.add(mutation.name, mutation.after)
+        elif mutation.operation == "edit_name":
+            for email in self.data[mutation.after].emails:
+                self.__email_index.remove(mutation.before, email.value)
+                self.__email_index.add(mutation.after, email.value)
+
+    def __update_name_index(self, mutation: Mutation) -> None:
+        """ Private method for updating the name index by the mutation
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "add_record":
+            self.__name_index.add(mutation.name)
+        elif mutation.operation == "delete_record":
+            self.__name_index.remove(mutation.name)
+        elif mutation.operation == "edit_name":
+            self.__name_index.remove(mutation.before)
+            self.__name_index.add(mutation.after)
+
+    def __update_content_index(self, mutation: Mutation) -> None:
+        """ Private method for updating the content index by the mutation
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "add_record":
+            self.__content_index.add(mutation.name, mutation.after.content_hash())
+        elif mutation.operation == "delete_record":
+            self.__content_index.remove(mutation.name)
+        elif mutation.operation == "edit_name":
+            self.__content_index.remove(mutation.before)
+            self.__content_index.add(mutation.after, self.data[mutation.after].content_hash())
+        else:
+            self.__content_index.add(mutation.name, self.data[mutation.name].content_hash())
+
+    def __dispatch(self, mutations: list[Mutation]) -> None:
+        """ Private method for dispatching the applied mutations to the subscribers
 
-    def upcoming_birthdays(self) -> Iterator[tuple[Record, datetime.date]]:
+        :param mutations: the applied mutations (list of Mutation, mandatory)
+        """
+        if not self.__replaying:
+            self.__history.record(mutations)
+        for listener in list(self.__listeners):
+            listener(mutations)
+
+    @contextmanager
+    def batch(self):
+        """ Context manager for the transactional batch of the mutations.
+        The mutations are applied at once, but dispatched to the subscribers once at the end of the batch.
+        If the batch fails, all its mutations are rolled back, and nothing is dispatched.
+        The nested batches are rolled back to their beginning and are dispatched with the outer batch.
+        """
+        outer: bool = self.__batch is None
+        if outer:
+            self.__batch = []
+        savepoint: int = len(self.__batch)
+        try:
+            yield self
+        except BaseException:
+            self.__rollback(savepoint)
+            if outer:
+                self.__batch = None
+            raise
+        if outer:
+            mutations, self.__batch = self.__batch, None
+            if mutations:
+                self.__dispatch(mutations)
+
+    def __rollback(self, savepoint: int) -> None:
+        """ Private method for reverting the mutations of the current batch, applied after the savepoint
+
+        :param savepoint: the number of the batch mutations to keep (int, mandatory)
+        """
+        mutations: list[Mutation] = self.__batch[savepoint:]
+        journal: list[Mutation] = self.__batch[:savepoint]
+        # The inverse mutations are collected separately and discarded
+        self.__batch = []
+        try:
+            for mutation in reversed(mutations):
+                self.apply_mutation(invert(mutation))
+        finally:
+            self.__batch = journal
+
+    def undo(self) -> list[Mutation]:
+        """ Undo the last batch of the mutations (or the last single mutation outside of a batch),
+        applying the inverse mutations. The cost is proportional to the size of the change.
+
+        :return: the undone mutations, empty if there is nothing to undo (list of Mutation)
+        """
+        return self.__replay(self.__history.pop_undo, self.__history.push_undo, self.__history.push_redo, True)
+
+    def redo(self) -> list[Mutation]:
+        """ Redo the last undone batch of the mutations
+
+        :return: the redone mutations, empty if there is nothing to redo (list of Mutation)
+        """
+        return self.__replay(self.__history.pop_redo, self.__history.push_redo, self.__history.push_undo, False)
+
+    def __replay(
+            self,
+            pop: Callable[[], Optional[tuple[Mutation, ...]]],
+            restore: Callable[[tuple[Mutation, ...]], None],
+            push: Callable[[tuple[Mutation, ...]], None],
+            inverse: bool,
+    ) -> list[Mutation]:
+        """ Private method for undoing or redoing the history step as a single batch
+
+        :param pop: the function returning the step to replay (Callable, mandatory)
+        :param restore: the function returning the step back, if the replay fails (Callable, mandatory)
+        :param push: the function saving the replayed step for the opposite direction (Callable, mandatory)
+        :param inverse: determines whether to apply the inverse mutations in reverse order (bool, mandatory)
+        :return: the replayed mutations (list of Mutation)
+        """
+        if self.__batch is not None:
+            raise RuntimeError("The history can not be replayed inside a batch")
+
+        step: Optional[tuple[Mutation, ...]] = pop()
+        if step is None:
+            return []
+
+        self.__replaying = True
+        try:
+            with self.batch():
+                for mutation in (reversed(step) if inverse else step):
+                    self.apply_mutation(invert(mutation) if inverse else mutation)
+        except Exception:
+            # The batch is rolled back - keep the step in the history
+            restore(step)
+            raise
+        finally:
+            self.__replaying = False
+        push(step)
+        return list(step)
+
+    def apply_mutation(self, mutation: Mutation) -> None:
+        """ Apply the mutation to the Address Book, for example, the inverse one.
+        The contact is looked up by the exact name of the mutation.
+
+        :param mutation: the mutation (Mutation, mandatory)
+        """
+        if mutation.operation == "add_record":
+            self.add_record(mutation.after)
+        elif mutation.operation == "delete_record":
+            self.__delete(mutation.name)
+        else:
+            if mutation.name not in self.data:
+                # Contact not found - raise the contact not found exception
+                raise ContactNotFound()
+            contact: Record = self.data[mutation.name]
+            if mutation.operation == "edit_name":
+                contact.edit_name(mutation.after)
+            elif mutation.operation == "add_phone":
+                contact.add_phone(mutation.after)
+            elif mutation.operation == "remove_phone":
+                contact.remove_phone(mutation.before)
+            elif mutation.operation == "edit_phone":
+                contact.edit_phone(mutation.before, mutation.after)
+            elif mutation.operation == "add_email":
+                contact.add_email(mutation.after)
+            elif mutation.operation == "remove_email":
+                contact.remove_email(mutation.before)
+            elif mutation.operation == "edit_email":
+                contact.edit_email(mutation.before, mutation.after)
+            elif mutation.operation == "edit_birthday":
+                contact.edit_birthday(mutation.after.strftime("%d.%m.%Y"))
+            elif mutation.operation == "remove_birthday":
+                contact.remove_birthday()
+            else:
+                raise ValueError(f"Unknown mutation operation \"{mutation.operation}\"")
+
+    @property
+    def statistics(self) -> BookStatistics:
+        """ Return the aggregate statistics of the contacts, maintained by the mutations
+
+        :return: the statistics (BookStatistics)
+        """
+        return self.__statistics
+
+    def cache_info(self) -> Optional[CacheInfo]:
+        """ Return the hit and miss counters of the records cache, if the number of the records in memory is limited
+
+        :return: the cache statistics, None if all the records are kept in memory (CacheInfo, optional)
+        """
+        return self.data.cache_info() if isinstance(self.data, RecordCache) else None
+
+    def rendered_lines(self) -> list[str]:
+        """ Return the readable strings of all contacts. The strings are cached by the contacts
+        and the list is cached by the Address Book until the next mutation.
+
+        :return: readable strings of the contacts (list of strings)
+        """
+        if self.__rendered_lines is None:
+            self.__rendered_lines = [str(contact) for contact in self.values()]
+        return self.__rendered_lines
+
+    def upcoming_birthdays(self, today: Optional[datetime.date] = None) -> Iterator[tuple[Record, datetime.date]]:
         """Return all contacts whose birthday is within the next period, including today,
         along with the congratulation date. If the birthday falls on a weekend, the congratulation date
         is moved to the following Monday.
 
+        :param today: Today's date, if not specified, is calculated as the current date (date, optional)
         :return: The next contacts whose birthday is within the next period, including today,
         along with the congratulation date (Iterator of tuple)
         """
 
-        # Named tuple creation
-        UpcomingBirthday = namedtuple('UpcomingBirthday', ['contact', 'congratulation_date'])
-
-        today: datetime.date = datetime.datetime.today().date()
+        if today is None:
+            today = datetime.datetime.today().date()
         for contact in self.values():
             if (congratulation_date := self.__congratulation_date(contact, today=today)) is not None:
                 # Return the upcoming birthday contact and the congratulation date
@@ -134,35 +643,497 @@ class AddressBook(UserDict):
         along with the congratulation date. If the birthday falls on a weekend, the congratulation date
         is moved to the following Monday.
 
+        The report is cached until the date rolls over or a contact or a birthday is added, changed or removed,
+        so the returned dictionary must not be modified.
+
         :return: contacts whose birthday is within the next period, grouped by date (dictionary)
         """
 
+        today: datetime.date = datetime.datetime.today().date()
+        report_key: tuple = (today, self.__congratulation_range_days)
+        if self.__upcoming_birthdays_report is not None and self.__upcoming_birthdays_report[0] == report_key:
+            # Return the cached report
+            return self.__upcoming_birthdays_report[1]
+
         # Collect contacts whose birthday is within the next period with the congratulation date
         upcoming_birthdays: dict[datetime.date, list[Record]] = defaultdict(list)
-        for record, congratulation_date in self.upcoming_birthdays():
+        for record, congratulation_date in self.upcoming_birthdays(today=today):
             upcoming_birthdays[congratulation_date].append(record)
 
-        # Sort and return contacts birthdays by date
-        return dict(sorted(upcoming_birthdays.items()))
+        # Sort, cache and return contacts birthdays by date
+        self.__upcoming_birthdays_report = (report_key, dict(sorted(upcoming_birthdays.items())))
+        return self.__upcoming_birthdays_report[1]
+
+    def __birthdays(self) -> BirthdayIndex:
+        """ Private method for returning the birthday index, building it on the first query.
+        The index is maintained by the mutations afterwards.
+
+        :return: the birthday index (BirthdayIndex)
+        """
+        if self.__birthday_index is None:
+            self.__birthday_index = BirthdayIndex()
+            self.__birthday_index.extend(
+                (name, contact.birthday.date_of_birth())
+                for name, contact in self.data.items() if contact.birthday is not None
+            )
+        return self.__birthday_index
+
+    def __phones(self) -> PhoneIndex:
+        """ Private method for returning the phone index, building it on the first query.
+        The index is maintained by the mutations afterwards.
+
+        :return: the phone index (PhoneIndex)
+        """
+        if self.__phone_index is None:
+            self.__phone_index = PhoneIndex()
+            self.__phone_index.extend(
+                (name, phone.value) for name, contact in self.data.items() for phone in contact.phones
+            )
+        return self.__phone_index
+
+    def __emails(self) -> EmailIndex:
+        """ Private method for returning the email index, building it on the first query.
+        The index is maintained by the mutations afterwards.
+
+        :return: the email index (EmailIndex)
+        """
+        if self.__email_index is None:
+            self.__email_index = EmailIndex()
+            self.__email_index.extend(
+                (name, email.value) for name, contact in self.data.items() for email in contact.emails
+            )
+        return self.__email_index
+
+    def __query_indexes(self) -> QueryIndexes:
+        """ Private method for returning the indexes available to the query planner
+
+        :return: the indexes (QueryIndexes)
+        """
+        return QueryIndexes(self.data, self.__phones, self.__birthdays, self.__emails, self.__names)
+
+    def query(self, predicate: Predicate, limit: Optional[int] = None) -> list[Record]:
+        """ Return the contacts satisfying the query, for example,
+        EmailDomain("example.com") & BirthdayInMonth(5) & ~HasField("phone").
+        The candidates are read from the most selective index and filtered by the whole query,
+        the full scan is used only if no index applies.
+
+        :param predicate: the query (Predicate, mandatory)
+        :param limit: maximum number of the contacts (int, optional)
+        :return: contact records (list of Record)
+        """
+        return list(execute(predicate, self.__query_indexes(), limit=limit))
+
+    def explain(self, predicate: Predicate) -> QueryPlan:
+        """ Return the plan of the query: the chosen index and the estimated number of the candidates
+
+        :param predicate: the query (Predicate, mandatory)
+        :return: the plan (QueryPlan)
+        """
+        return plan(predicate, self.__query_indexes())[0]
+
+    def query_explained(self, predicate: Predicate, limit: Optional[int] = None) -> tuple[list[Record], QueryPlan]:
+        """ Return the contacts satisfying the query along with its plan, the query is planned once
+
+        :param predicate: the query (Predicate, mandatory)
+        :param limit: maximum number of the contacts (int, optional)
+        :return: contact records and the plan (tuple)
+        """
+        indexes: QueryIndexes = self.__query_indexes()
+        planned: tuple[QueryPlan, Iterable[str]] = plan(predicate, indexes)
+        return list(execute(predicate, indexes, limit=limit, planned=planned)), planned[0]
+
+    def find_by_phone_prefix(self, prefix: str, limit: Optional[int] = None) -> list[tuple[str, Record]]:
+        """ Return the phone numbers starting with the prefix, for example, the area code, along with the contacts.
+        The phone numbers are found by the sorted index in O(log n + k).
+
+        :param prefix: phone number prefix, the formatting symbols are ignored (string, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contacts, in ascending order (list of tuples)
+        """
+        # Clear the prefix from formatting symbols and whitespaces
+        prefix = re.sub(Phone.value_clear_pattern, '', prefix or '')
+        if not prefix.isdigit():
+            raise ContactPhoneValueError()
+        return [(phone, self.data[name]) for phone, name in self.__phones().prefix(prefix, limit=limit)]
+
+    def find_by_phone_range(self, low: str, high: str, limit: Optional[int] = None) -> list[tuple[str, Record]]:
+        """ Return the phone numbers from the low to the high one, inclusive, along with the contacts
+
+        :param low: the lowest phone number (string, mandatory)
+        :param high: the highest phone number (string, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contacts, in ascending order (list of tuples)
+        """
+        return [
+            (phone, self.data[name])
+            for phone, name in self.__phones().between(Phone.prepare(low), Phone.prepare(high), limit=limit)
+        ]
+
+    def birthdays_between(self, start: datetime.date, end: datetime.date) -> list[UpcomingBirthday]:
+        """Return all contacts whose birthday anniversary is within the dates range, inclusive, ordered by the
+        anniversary, along with the congratulation date. The range can wrap around the year.
+        If the birthday is on February 29 and the year is not a leap year, the anniversary is on March 1.
+        If the anniversary falls on a weekend, the congratulation date is moved to the following Monday.
+        The contacts are found by the sorted index in O(log n + k).
+
+        :param start: the first date of the range (date, mandatory)
+        :param end: the last date of the range (date, mandatory)
+        :return: contacts with the congratulation dates (list of UpcomingBirthday)
+        """
+        if start > end:
+            raise ValueError("The start date of the range must not be after the end date")
+
+        birthdays: list[UpcomingBirthday] = []
+        for name, year in self.__birthdays().between(start, end):
+            contact: Record = self.data[name]
+            birthdays.append(UpcomingBirthday(contact, self.congratulation_day(contact.birthday.birthday(year))))
+        return birthdays
+
+    def birthdays_in_month(self, month: int, year: Optional[int] = None) -> list[UpcomingBirthday]:
+        """Return all contacts whose birthday anniversary is in the month, along with the congratulation date
+
+        :param month: the month number, from 1 to 12 (int, mandatory)
+        :param year: the year, if not specified, the current year is used (int, optional)
+        :return: contacts with the congratulation dates (list of UpcomingBirthday)
+        """
+        if not 1 <= month <= 12:
+            raise ValueError("The month must be a number from 1 to 12")
+        if year is None:
+            year = datetime.datetime.today().year
+        return self.birthdays_between(
+            datetime.date(year, month, 1),
+            datetime.date(year, month, calendar.monthrange(year, month)[1]),
+        )
+
+    def find_duplicates(self, by_name_birthday: bool = False) -> list[list[Record]]:
+        """ Return the clusters of the duplicate contacts, which share a phone number or an email,
+        and optionally the name (case-insensitive) with the birthday
+
+        :param by_name_birthday: determines whether the name with the birthday identifies the contact (bool, optional)
+        :return: clusters of the duplicate contacts (list of lists of Record)
+        """
+        return [
+            [self.data[name] for name in cluster]
+            for cluster in duplicate_clusters(self.values(), by_name_birthday=by_name_birthday)
+        ]
+
+    def merge_duplicates(self, by_name_birthday: bool = False) -> list[tuple[Record, list[str]]]:
+        """ Merge each cluster of the duplicate contacts into its first added contact, deleting the others
+
+        :param by_name_birthday: determines whether the name with the birthday identifies the contact (bool, optional)
+        :return: surviving contacts with the names of the merged contacts (list of tuples)
+        """
+        merged: list[tuple[Record, list[str]]] = []
+        with self.batch():
+            for survivor, *duplicates in self.find_duplicates(by_name_birthday=by_name_birthday):
+                for duplicate in duplicates:
+                    survivor.merge(duplicate)
+                    self.delete_record(str(duplicate.name))
+                merged.append((survivor, [str(duplicate.name) for duplicate in duplicates]))
+        return merged
+
+    def __contents(self) -> ContentIndex:
+        """ Private method for returning the content index, building it on the first comparison.
+        The index is maintained by the mutations afterwards. It is not stored with the Address Book,
+        so the first comparison after the load hashes every contact in O(n).
+
+        :return: the content index (ContentIndex)
+        """
+        if self.__content_index is None:
+            self.__content_index = ContentIndex()
+            for name, contact in self.data.items():
+                self.__content_index.add(name, contact.content_hash())
+        return self.__content_index
+
+    def digest(self) -> str:
+        """ Return the digest of the contacts content, equal for the Address Books with the same contacts
+        regardless of their order
+
+        :return: hexadecimal digest (string)
+        """
+        return self.__contents().root().hex()
+
+    def diff(self, other: "AddressBook") -> BookDiff:
+        """ Return the differences of the other Address Book. Only the contacts in the differing buckets
+        of the content index are compared, so the equal Address Books are compared in O(1), and each difference
+        costs about n / 256 lookups of the stored hashes. Building the content index of the Address Book
+        loaded from the data file is O(n), it is done by the first comparison.
+
+        :param other: the other Address Book (AddressBook, mandatory)
+        :return: names of the contacts added, removed and changed in the other Address Book (BookDiff)
+        """
+        return BookDiff(*self.__contents().diff(other.__contents()))
+
+    def sync(self, other: "AddressBook") -> BookDiff:
+        """ Make the Address Book equal to the other one, applying only the differences as a single batch.
+        The changed contacts are replaced by the copies of the other ones.
+
+        :param other: the other Address Book (AddressBook, mandatory)
+        :return: names of the added, removed and changed contacts (BookDiff)
+        """
+        difference: BookDiff = self.diff(other)
+        with self.batch():
+            for name in difference.removed:
+                self.delete_record(name)
+            for name in difference.changed:
+                self.delete_record(name)
+                self.add_record(other.data[name].copy())
+            for name in difference.added:
+                self.add_record(other.data[name].copy())
+        return difference
+
+    @property
+    def version_stamp(self) -> int:
+        """ Return the version stamp of the data file, as it was loaded or saved the last time
+
+        :return: version stamp (int)
+        """
+        return self.__version_stamp
+
+    @property
+    def congratulation_range_days(self) -> int:
+        """ Return the birthday congratulations days range
+
+        :return: number of days (int)
+        """
+        return self.__congratulation_range_days
+
+    @property
+    def codec(self) -> str:
+        """ Return the data file compression codec
+
+        :return: codec name (string)
+        """
+        return self.__codec
+
+    @codec.setter
+    def codec(self, value: Optional[str]) -> None:
+        """ Set the data file compression codec, or raise the codec not supported exception
+
+        :param value: codec name: "none", "zlib", "bz2" or "lzma" (string, optional)
+        """
+        self.__codec = verify_codec(value)
+
+    @property
+    def file_format(self) -> str:
+        """ Return the data file format
+
+        :return: format name (string)
+        """
+        return self.__file_format
+
+    @file_format.setter
+    def file_format(self, value: Optional[str]) -> None:
+        """ Set the data file format, or raise the format not supported exception
+
+        :param value: format name: "binary" or "pickle" (string, optional)
+        """
+        self.__file_format = verify_format(value)
 
     def save(self) -> bool:
+        """ Save the Address Book to the data file in the selected format, compressed by the selected codec.
+        The data file is locked while it is written. If it has been saved by another process since it was loaded,
+        the contacts changed by this Address Book are merged into the saved ones, the other contacts are taken
+        from the data file.
+
+        :return: True if the Address Book is saved, False if the data file is not specified (bool)
+        """
         if self.__datafile:
             # Verify that the specified path is the file if it already exists
             if self.__datafile.exists() and not self.__datafile.is_file():
                 raise AddressBookDataFileWrongFormat(str(self.__datafile))
 
-            # Make the data directory if it does not exist
-            self.__datafile.parent.mkdir(exist_ok=True)
+            with file_lock(self.__datafile):
+                # Merge the changes into the data file saved by another process
+                stored_stamp: int = self.__stored_stamp(self.__datafile)
+                if stored_stamp != self.__version_stamp and self.__datafile.exists():
+                    cache_info: Optional[CacheInfo] = self.cache_info()
+                    self.__merge(self.__read(self.__datafile, cache_size=cache_info and cache_info.maxsize)[0])
+                self.__version_stamp = stored_stamp
 
-            # Save the Address Book to a file
-            with open(self.__datafile, "wb") as fh:
-                pickle.dump(self, fh)
+                # Save the Address Book to a temporary file, which replaces the data file
+                with atomic_writer(self.__datafile) as fh:
+                    self.__dump(fh, stored_stamp + 1)
+            self.__saved(stored_stamp + 1, self.__sequence)
             return True
         else:
             return False
 
+    def __dump(self, fh, version_stamp: int) -> None:
+        """ Private method for writing the Address Book in the selected format, compressed by the selected codec
+
+        :param fh: binary file opened for writing (BinaryIO, mandatory)
+        :param version_stamp: the version stamp of the written data (int, mandatory)
+        """
+        with compressed_writer(fh, self.__codec) as stream:
+            if self.__file_format == "binary":
+                binary.dump(
+                    self.values(),
+                    len(self),
+                    self.__congratulation_range_days,
+                    stream,
+                    version_stamp=version_stamp,
+                )
+            else:
+                # The version stamp is pickled with the Address Book
+                current_stamp: int = self.__version_stamp
+                self.__version_stamp = version_stamp
+                try:
+                    pickle.dump(self, stream)
+                finally:
+                    self.__version_stamp = current_stamp
+
+    def __saved(self, version_stamp: int, sequence: int) -> None:
+        """ Private method for marking the mutations up to the sequence number as saved
+
+        :param version_stamp: the version stamp of the saved data (int, mandatory)
+        :param sequence: the number of the saved mutations (int, mandatory)
+        """
+        self.__version_stamp = version_stamp
+        self.__changed = {name: number for name, number in self.__changed.items() if number > sequence}
+
+    def snapshot(self) -> Optional[Snapshot]:
+        """ Serialize the Address Book in memory to be written to the data file later, without blocking on disk.
+        The Address Book must not be changed during the serialization.
+
+        :return: the snapshot, None if the data file is not specified or nothing is changed since the last save
+                 (Snapshot, optional)
+        """
+        if not self.__datafile or not self.__changed:
+            return None
+        buffer = io.BytesIO()
+        self.__dump(buffer, self.__version_stamp + 1)
+        return Snapshot(buffer.getvalue(), self.__version_stamp + 1, self.__sequence)
+
+    def write_snapshot(self, snapshot: Snapshot) -> bool:
+        """ Write the snapshot to the data file, while the Address Book can be changed in another thread.
+        The snapshot is not written, if the data file has been saved since the snapshot was taken,
+        then the Address Book has to be saved with the merge.
+
+        :param snapshot: the snapshot (Snapshot, mandatory)
+        :return: True if the snapshot is written (bool)
+        """
+        with file_lock(self.__datafile):
+            if self.__stored_stamp(self.__datafile) != snapshot.version_stamp - 1:
+                return False
+            with atomic_writer(self.__datafile) as fh:
+                fh.write(snapshot.data)
+            # The following save does not merge the written snapshot, which contains only the contacts of this book
+            self.__version_stamp = max(self.__version_stamp, snapshot.version_stamp)
+        return True
+
+    def commit_snapshot(self, snapshot: Snapshot) -> None:
+        """ Mark the changes serialized into the written snapshot as saved.
+        The version stamp is not lowered, if the Address Book has been saved since the snapshot was written.
+
+        :param snapshot: the written snapshot (Snapshot, mandatory)
+        """
+        self.__saved(max(self.__version_stamp, snapshot.version_stamp), snapshot.sequence)
+
+    def __merge(self, stored: "AddressBook") -> None:
+        """ Private method for rebasing the changed contacts onto the Address Book saved by another process.
+        The changed contacts replace the saved ones, the deleted contacts are removed, the other contacts
+        are taken from the saved Address Book. The undo/redo history is cleared, as it refers to the previous contacts.
+
+        :param stored: the saved Address Book (AddressBook, mandatory)
+        """
+        # Keep the memory bound, the merged records are evicted to a new dbm file
+        cache_info: Optional[CacheInfo] = self.cache_info()
+        merged: MutableMapping[str, Record] = RecordCache(cache_info.maxsize, owner=self) if cache_info else {}
+        # Keep the order of the saved contacts, the changed contacts take their place
+        for name, contact in stored.data.items():
+            if name not in self.__changed:
+                merged[name] = contact
+            elif name in self.data:
+                merged[name] = self.data[name]
+        # Add the contacts created by this Address Book
+        for name in self.__changed:
+            if name in self.data and name not in merged:
+                merged[name] = self.data[name]
+
+        for contact in self.data.values():
+            contact.detach()
+        if isinstance(self.data, RecordCache):
+            self.data.close()
+        self.data = merged
+        for contact in self.data.values():
+            contact.attach(self)
+
+        # Rebuild the derived data
+        self.__rendered_lines = None
+        self.__upcoming_birthdays_report = None
+        self.__birthday_index = None
+        self.__phone_index = None
+        self.__email_index = None
+        self.__name_index = None
+        self.__content_index = None
+        self.__statistics = BookStatistics(self.data.values())
+        self.__history.clear()
+
+    @classmethod
+    def __stored_stamp(cls, datafile: Path) -> int:
+        """ Private method for reading the version stamp of the data file, 0 if it does not exist.
+        Only the header of the data file in the binary format is read.
+
+        :param datafile: the data file path (Path, mandatory)
+        :return: version stamp (int)
+        """
+        if not datafile.exists():
+            return 0
+        with open(datafile, "rb") as fh:
+            try:
+                with decompressed_reader(fh) as (stream, _):
+                    if binary.is_binary(stream.peek(len(binary.MAGIC))):
+                        return binary.stamp(memoryview(stream.read(binary.header_size(binary.VERSION))))
+            except Exception:
+                raise AddressBookDataFileWrongFormat(datafile)
+        return cls.__read(datafile)[0].__version_stamp
+
     @classmethod
-    def load(cls, datafile: Union[Path, str]):
+    def __read(cls, datafile: Path, cache_size: Optional[int] = None):
+        """ Private method for reading the Address Book from the existing data file, detecting its format
+        and compression codec
+
+        :param datafile: the data file path (Path, mandatory)
+        :param cache_size: the maximum number of the contact records kept in memory (int, optional)
+        :return: the Address Book and the detected codec (tuple)
+        """
+        with open(datafile, "rb") as fh:
+            try:
+                with decompressed_reader(fh) as (stream, detected_codec):
+                    if binary.is_binary(stream.peek(len(binary.MAGIC))):
+                        book = cls.__load_binary(
+                            fh if detected_codec == "none" else stream, detected_codec, cache_size=cache_size
+                        )
+                    else:
+                        book = pickle.load(stream)
+                        if cache_size:
+                            # The pickle is loaded into memory as a whole, then the records are evicted
+                            cache = RecordCache(cache_size, owner=book)
+                            cache.update(book.data)
+                            book.data = cache
+            except Exception:
+                raise AddressBookDataFileWrongFormat(datafile)
+        return book, detected_codec
+
+    @classmethod
+    def load(
+            cls,
+            datafile: Union[Path, str],
+            codec: Optional[str] = None,
+            file_format: Optional[str] = None,
+            cache_size: Optional[int] = None,
+    ):
+        """ Load the Address Book from the data file, detecting its format and compression codec,
+        or create an empty one. Data files in the pickle format are migrated to the binary format on the next save,
+        unless the pickle format is requested. The data file is locked for reading while it is loaded.
+
+        :param datafile: the data file path (string, Path, mandatory)
+        :param codec: the codec for the following saves, if not specified, the detected one is kept (string, optional)
+        :param file_format: the format for the following saves, "binary" by default (string, optional)
+        :param cache_size: the maximum number of the contact records kept in memory, all by default (int, optional)
+        :return: the Address Book (AddressBook)
+        """
         # Check whether the specified data file exists
         if datafile.exists():
             # Check whether the specified path is a file
@@ -170,14 +1141,81 @@ class AddressBook(UserDict):
                 raise AddressBookDataFileWrongFormat(datafile)
 
             # Load the Address Book from a file
-            with open(datafile, "rb") as fh:
-                try:
-                    book = pickle.load(fh)
-                except Exception:
-                    raise AddressBookDataFileWrongFormat(datafile)
-                # Set the Address Book data file to the current file
-                setattr(book, f"_{cls.__name__}__datafile", datafile)
-                return book
+            with file_lock(datafile, exclusive=False):
+                book, detected_codec = cls.__read(datafile, cache_size=cache_size)
+            # Set the Address Book data file to the current file
+            setattr(book, f"_{cls.__name__}__datafile", datafile)
+            # Keep the detected codec, unless another one is requested
+            book.codec = codec or detected_codec
+            book.file_format = file_format
+            return book
         else:
             # File does not exist - create an empty Address Book
-            return cls(datafile=datafile)
+            return cls(datafile=datafile, codec=codec, file_format=file_format, cache_size=cache_size)
+
+    @staticmethod
+    def __restored(book: "AddressBook", contacts: Iterator[Record]) -> Iterator[tuple[str, Record]]:
+        """ Private method for attaching the loaded contact records to the Address Book and counting them
+        in its statistics in a single pass
+
+        :param book: the Address Book (AddressBook, mandatory)
+        :param contacts: the contact records (Iterator of Record, mandatory)
+        :return: the contact names with the records (Iterator of tuples)
+        """
+        for contact in contacts:
+            contact.attach(book)
+            book.__statistics.add(contact)
+            yield str(contact.name), contact
+
+    @classmethod
+    def __load_binary(cls, stream, codec: str, cache_size: Optional[int] = None):
+        """ Private method for loading the Address Book in the binary format.
+        The uncompressed data file is memory-mapped, the compressed one is decompressed into memory.
+
+        :param stream: the data file or the decompressed stream (BinaryIO, mandatory)
+        :param codec: the detected codec (string, mandatory)
+        :param cache_size: the maximum number of the contact records kept in memory (int, optional)
+        :return: the Address Book (AddressBook)
+        """
+        data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) if codec == "none" else stream.read()
+        try:
+            with memoryview(data) as view:
+                return cls.__from_view(view, cache_size=cache_size)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    @classmethod
+    def __from_view(cls, view: memoryview, cache_size: Optional[int] = None):
+        """ Private method for creating the Address Book from the data in the binary format
+
+        :param view: the data in the binary format (memoryview, mandatory)
+        :param cache_size: the maximum number of the contact records kept in memory (int, optional)
+        :return: the Address Book (AddressBook)
+        """
+        _, congratulation_range_days, _ = binary.header(view)
+        book = cls(congratulation_range_days=congratulation_range_days, cache_size=cache_size)
+        book.__version_stamp = binary.stamp(view)
+        # The contact names are unique in the data file, so the records are added in bulk
+        book.data.update(cls.__restored(book, binary.load(view)))
+        return book
+
+    def to_bytes(self) -> bytes:
+        """ Serialize the contacts in the uncompressed binary format, without the data file settings
+
+        :return: the serialized contacts (bytes)
+        """
+        buffer = io.BytesIO()
+        binary.dump(self.values(), len(self), self.__congratulation_range_days, buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, cache_size: Optional[int] = None):
+        """ Create the Address Book without the data file from the contacts serialized by to_bytes
+
+        :param data: the serialized contacts (bytes, mandatory)
+        :param cache_size: the maximum number of the contact records kept in memory, all by default (int, optional)
+        :return: the Address Book (AddressBook)
+        """
+        with memoryview(data) as view:
+            return cls.__from_view(view, cache_size=cache_size)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Memory-bounded store of the contact records: the hot records are kept in memory,
+the cold ones are evicted to a temporary dbm file
+"""
+
+import os
+import pickle
+import shelve
+import weakref
+import tempfile
+from typing import Optional
+from collections import OrderedDict, namedtuple
+from collections.abc import MutableMapping, Iterator
+
+
+from .record import Record
+
+
+# Hit and miss counters of the record cache, the maximum and current number of the records in memory
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class RecordCache(MutableMapping):
+    def __init__(self, size: int, owner: Optional[MutableMapping] = None):
+        """ Initialize an empty store, keeping at most the specified number of the records in memory
+
+        :param size: the maximum number of the records in memory (int, mandatory)
+        :param owner: the address book, which the paged in records are attached to (AddressBook, optional)
+        """
+        if size < 1:
+            raise ValueError("The record cache size must be a positive number")
+        self.__size = size
+        self.__owner = owner
+        # Contact names in the insertion order, the records are either hot or cold
+        self.__names: dict[str, None] = {}
+        # Hot records, from the least to the most recently used
+        self.__hot: OrderedDict[str, Record] = OrderedDict()
+        # Hot records, which are changed since they were paged in, they are written to the cold store on eviction
+        self.__dirty: set[str] = set()
+        # Records referenced outside of the cache, including the evicted ones, so there is a single live instance
+        # of each record, which receives all the mutations
+        self.__resident: weakref.WeakValueDictionary[str, Record] = weakref.WeakValueDictionary()
+        self.__directory = tempfile.TemporaryDirectory(prefix="address_book_")
+        self.__cold = shelve.open(
+            os.path.join(self.__directory.name, "records"), flag="n", protocol=pickle.HIGHEST_PROTOCOL
+        )
+        # The cold store is removed, when the cache is closed or collected
+        self.__finalizer = weakref.finalize(self, self.__release, self.__cold, self.__directory)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def __release(cold: shelve.Shelf, directory: tempfile.TemporaryDirectory) -> None:
+        """ Private method for closing and removing the cold store
+
+        :param cold: the cold store (Shelf, mandatory)
+        :param directory: the temporary directory of the cold store (TemporaryDirectory, mandatory)
+        """
+        cold.close()
+        directory.cleanup()
+
+    def close(self) -> None:
+        """ Close and remove the cold store, the records are not available afterwards
+        """
+        self.__finalizer()
+
+    def __admit(self, name: str, record: Record, dirty: bool) -> None:
+        """ Private method for keeping the record in memory, evicting the least recently used records
+
+        :param name: contact name (string, mandatory)
+        :param record: the contact record (Record, mandatory)
+        :param dirty: True, if the cold copy of the record is outdated (bool, mandatory)
+        """
+        self.__hot[name] = record
+        self.__hot.move_to_end(name)
+        self.__resident[name] = record
+        if dirty:
+            self.__dirty.add(name)
+        while len(self.__hot) > self.__size:
+            evicted_name, evicted_record = self.__hot.popitem(last=False)
+            if evicted_name in self.__dirty:
+                self.__cold[evicted_name] = evicted_record
+                self.__dirty.discard(evicted_name)
+
+    def touch(self, name: str, record: Record) -> None:
+        """ Mark the changed record as outdated in the cold store, keeping the changed instance in memory
+
+        :param name: contact name (string, mandatory)
+        :param record: the changed contact record (Record, mandatory)
+        """
+        if name in self.__names:
+            self.__admit(name, record, dirty=True)
+
+    def cache_info(self) -> CacheInfo:
+        """ Return the hit and miss counters and the number of the records in memory
+
+        :return: cache statistics (CacheInfo)
+        """
+        return CacheInfo(self.hits, self.misses, self.__size, len(self.__hot))
+
+    def __getitem__(self, name: str) -> Record:
+        record: Optional[Record] = self.__hot.get(name)
+        if record is not None:
+            self.hits += 1
+            self.__hot.move_to_end(name)
+            return record
+        if name not in self.__names:
+            raise KeyError(name)
+        # The evicted record, which is still referenced, is the current one, its changes are not lost
+        record = self.__resident.get(name)
+        if record is not None:
+            self.hits += 1
+        else:
+            # Page in the cold record
+            self.misses += 1
+            record = self.__cold[name]
+            if self.__owner is not None:
+                record.attach(self.__owner)
+        self.__admit(name, record, dirty=False)
+        return record
+
+    def __setitem__(self, name: str, record: Record) -> None:
+        self.__names[name] = None
+        self.__admit(name, record, dirty=True)
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self.__names:
+            raise KeyError(name)
+        del self.__names[name]
+        self.__hot.pop(name, None)
+        self.__resident.pop(name, None)
+        self.__dirty.discard(name)
+        if name in self.__cold:
+            del self.__cold[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.__names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__names)
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def clear(self) -> None:
+        self.__names.clear()
+        self.__hot.clear()
+        self.__resident.clear()
+        self.__dirty.clear()
+        self.__cold.clear()
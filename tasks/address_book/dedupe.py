@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Hash-based duplicate contacts detection
+"""
+
+from collections.abc import Iterable, Hashable
+
+
+from .record import Record
+from .index import fold_name
+
+
+class DisjointSet:
+    def __init__(self):
+        """ Initialize an empty disjoint set (union-find) of the contact names
+        """
+        self.__parent: dict[str, str] = {}
+
+    def add(self, item: str) -> None:
+        """ Add the item as a separate set, if it is not added yet
+
+        :param item: contact name (string, mandatory)
+        """
+        self.__parent.setdefault(item, item)
+
+    def find(self, item: str) -> str:
+        """ Return the representative item of the set, compressing the path
+
+        :param item: contact name (string, mandatory)
+        :return: representative contact name (string)
+        """
+        root: str = item
+        while self.__parent[root] != root:
+            root = self.__parent[root]
+        while self.__parent[item] != root:
+            self.__parent[item], item = root, self.__parent[item]
+        return root
+
+    def union(self, first: str, second: str) -> None:
+        """ Merge the sets of the given items
+
+        :param first: contact name (string, mandatory)
+        :param second: contact name (string, mandatory)
+        """
+        first_root, second_root = self.find(first), self.find(second)
+        if first_root != second_root:
+            self.__parent[second_root] = first_root
+
+    def groups(self) -> list[list[str]]:
+        """ Return the sets with more than one item, the items keep the order they were added in
+
+        :return: sets of contact names (list of lists of strings)
+        """
+        groups: dict[str, list[str]] = {}
+        for item in self.__parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return [group for group in groups.values() if len(group) > 1]
+
+
+def record_keys(record: Record, by_name_birthday: bool = False) -> Iterable[Hashable]:
+    """ Return the hash keys identifying the contact: normalized phones, emails, and optionally name with birthday
+
+    :param record: contact record (Record, mandatory)
+    :param by_name_birthday: determines whether the name with the birthday identifies the contact (bool, optional)
+    :return: hash keys (Iterable)
+    """
+    for phone in record.phones:
+        yield "phone", phone.value
+    for email in record.emails:
+        yield "email", fold_name(email.value)
+    if by_name_birthday and record.birthday is not None:
+        yield "name-birthday", fold_name(str(record.name)), record.birthday.date_of_birth()
+
+
+def duplicate_clusters(records: Iterable[Record], by_name_birthday: bool = False) -> list[list[str]]:
+    """ Return the clusters of contacts sharing a phone number or an email, and optionally name with birthday.
+    Each key is hashed once, so the search time is linear in the number of phones and emails.
+
+    :param records: contact records (Iterable of Record, mandatory)
+    :param by_name_birthday: determines whether the name with the birthday identifies the contact (bool, optional)
+    :return: clusters of contact names (list of lists of strings)
+    """
+    clusters = DisjointSet()
+    # The first contact name seen for each key
+    buckets: dict[Hashable, str] = {}
+    for record in records:
+        name: str = str(record.name)
+        clusters.add(name)
+        for key in record_keys(record, by_name_birthday):
+            if (owner := buckets.setdefault(key, name)) != name:
+                clusters.union(owner, name)
+    return clusters.groups()
@@ -9,6 +9,7 @@ from .exceptions import *
 __all__ = [
     'ContactNotFound',
     'ContactAlreadyExist',
+    'ContactNameAmbiguous',
     'ContactNameMandatory',
     'ContactPhoneNotFound',
     'ContactPhoneAlreadyExist',
@@ -17,7 +18,12 @@ __all__ = [
     'ContactEmailAlreadyExist',
     'ContactEmailValueError',
     'ContactBirthdayAlreadyExist',
+    'ContactBirthdayNotFound',
     'ContactBirthdayValueError',
     'AddressBookDataFileNotFound',
     'AddressBookDataFileWrongFormat',
+    'AddressBookCodecNotSupported',
+    'AddressBookFormatNotSupported',
+    'AddressBookTenantValueError',
+    'AddressBookSaveError',
 ]
@@ -30,6 +30,13 @@ class ContactAlreadyExist(ObjectAlreadyExist):
         super().__init__("The contact already exists")
 
 
+class ContactNameAmbiguous(ObjectValueError):
+    def __init__(self, name: str, variants: list[str]):
+        super().__init__(
+            f"The contact name \"{name}\" is ambiguous, specify one of: {', '.join(variants)}"
+        )
+
+
 class ContactNameMandatory(ObjectValueError):
     def __init__(self):
         super().__init__("The contact name is required")
@@ -74,6 +81,11 @@ class ContactBirthdayAlreadyExist(ObjectAlreadyExist):
         super().__init__("The contact birthday already exists")
 
 
+class ContactBirthdayNotFound(ObjectNotFound):
+    def __init__(self):
+        super().__init__("The contact birthday not found")
+
+
 class ContactBirthdayValueError(ObjectValueError):
     def __init__(self):
         super().__init__("The contact birthday must be in \"DD.MM.YYYY\" format")
@@ -87,3 +99,25 @@ class AddressBookDataFileNotFound(FileNotFoundError):
 class AddressBookDataFileWrongFormat(FileExistsError):
     def __init__(self, filename: str):
         super().__init__(f"The address book data file \"{filename}\" not a file or corrupted")
+
+
+class AddressBookCodecNotSupported(ObjectValueError):
+    def __init__(self, codec: str):
+        super().__init__(f"The address book data file codec \"{codec}\" is not supported")
+
+
+class AddressBookFormatNotSupported(ObjectValueError):
+    def __init__(self, file_format: str):
+        super().__init__(f"The address book data file format \"{file_format}\" is not supported")
+
+
+class AddressBookTenantValueError(ObjectValueError):
+    def __init__(self, tenant: str):
+        super().__init__(
+            f"The tenant ID \"{tenant}\" must consist of letters, digits, dots, underscores or hyphens"
+        )
+
+
+class AddressBookSaveError(OSError):
+    def __init__(self, tenant: str, error: Exception):
+        super().__init__(f"The address book of the tenant \"{tenant}\" could not be saved: {error}")
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Undo/redo history of the address book mutations
+"""
+
+from typing import Optional
+from collections import deque
+
+
+from .mutation import Mutation
+
+
+class MutationHistory:
+    def __init__(self, size: int = 100):
+        """ Initialize an empty history with the specified number of the steps
+
+        :param size: maximum number of the undo and redo steps, the oldest steps are dropped (int, optional)
+        """
+        self.__undo: deque[tuple[Mutation, ...]] = deque(maxlen=size)
+        self.__redo: deque[tuple[Mutation, ...]] = deque(maxlen=size)
+
+    def record(self, mutations: list[Mutation]) -> None:
+        """ Record the applied mutations as a single undo step, clearing the redo steps
+
+        :param mutations: the applied mutations (list of Mutation, mandatory)
+        """
+        self.__undo.append(tuple(mutations))
+        self.__redo.clear()
+
+    def pop_undo(self) -> Optional[tuple[Mutation, ...]]:
+        """ Remove and return the last undo step
+
+        :return: the mutations of the step, if any (tuple of Mutation, optional)
+        """
+        return self.__undo.pop() if self.__undo else None
+
+    def pop_redo(self) -> Optional[tuple[Mutation, ...]]:
+        """ Remove and return the last redo step
+
+        :return: the mutations of the step, if any (tuple of Mutation, optional)
+        """
+        return self.__redo.pop() if self.__redo else None
+
+    def push_undo(self, mutations: tuple[Mutation, ...]) -> None:
+        """ Add the undo step, keeping the redo steps
+
+        :param mutations: the mutations of the step (tuple of Mutation, mandatory)
+        """
+        self.__undo.append(mutations)
+
+    def push_redo(self, mutations: tuple[Mutation, ...]) -> None:
+        """ Add the redo step
+
+        :param mutations: the mutations of the step (tuple of Mutation, mandatory)
+        """
+        self.__redo.append(mutations)
+
+    def clear(self) -> None:
+        """ Remove all the steps
+        """
+        self.__undo.clear()
+        self.__redo.clear()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-"
+
+__title__ = 'Address book indexes'
+__author__ = 'Roman'
+
+
+from .birthday import BirthdayIndex
+from .phone import PhoneIndex
+from .content import ContentIndex
+from .email import EmailIndex
+from .name import NameIndex, fold_name
+
+__all__ = ['BirthdayIndex', 'PhoneIndex', 'ContentIndex', 'EmailIndex', 'NameIndex', 'fold_name']
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Sorted day-of-year index of the contact birthdays
+"""
+
+import bisect
+import calendar
+import datetime
+from collections.abc import Iterable, Iterator
+
+
+def day_ranges(start: datetime.date, end: datetime.date) -> Iterator[tuple[tuple[int, int], tuple[int, int], int]]:
+    """ Split the dates range into the ranges of the birthday days within each year, inclusive.
+    If the year is not a leap year, the range starting on March 1 includes the February 29 birthdays.
+
+    :param start: the first date of the range (date, mandatory)
+    :param end: the last date of the range (date, mandatory)
+    :return: the first and the last month and day with the year (Iterator of tuples)
+    """
+    for year in range(start.year, end.year + 1):
+        first: datetime.date = max(start, datetime.date(year, 1, 1))
+        last: datetime.date = min(end, datetime.date(year, 12, 31))
+        first_day: tuple[int, int] = (first.month, first.day)
+        last_day: tuple[int, int] = (last.month, last.day)
+        if not calendar.isleap(year) and first_day == (3, 1):
+            # February 29 birthdays are celebrated on March 1 in a non-leap year
+            first_day = (2, 29)
+        yield first_day, last_day, year
+
+
+class BirthdayIndex:
+    def __init__(self):
+        """ Initialize an empty index
+        """
+        # Sorted (month, day, name) keys, February 29 is kept between February 28 and March 1
+        self.__keys: list[tuple[int, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def add(self, name: str, date_of_birth: datetime.date) -> None:
+        """ Add the contact birthday to the index
+
+        :param name: contact name (string, mandatory)
+        :param date_of_birth: date of birth (date, mandatory)
+        """
+        bisect.insort(self.__keys, (date_of_birth.month, date_of_birth.day, name))
+
+    def extend(self, entries: Iterable[tuple[str, datetime.date]]) -> None:
+        """ Add many contact birthdays at once, sorting the index a single time
+
+        :param entries: contact names with the dates of birth (Iterable of tuples, mandatory)
+        """
+        self.__keys.extend((date_of_birth.month, date_of_birth.day, name) for name, date_of_birth in entries)
+        self.__keys.sort()
+
+    def remove(self, name: str, date_of_birth: datetime.date) -> None:
+        """ Remove the contact birthday from the index, if it exists
+
+        :param name: contact name (string, mandatory)
+        :param date_of_birth: date of birth (date, mandatory)
+        """
+        key: tuple[int, int, str] = (date_of_birth.month, date_of_birth.day, name)
+        index: int = bisect.bisect_left(self.__keys, key)
+        if index < len(self.__keys) and self.__keys[index] == key:
+            del self.__keys[index]
+
+    def __bounds(self, start: tuple[int, int], end: tuple[int, int]) -> tuple[int, int]:
+        """ Private method for returning the index bounds of the birthdays from the start to the end day, inclusive
+
+        :param start: start month and day (tuple of int, mandatory)
+        :param end: end month and day (tuple of int, mandatory)
+        :return: the first and the next after the last positions (tuple of int)
+        """
+        first: int = bisect.bisect_left(self.__keys, (*start, ""))
+        # The upper bound of the end day is the next day key
+        last: int = bisect.bisect_left(self.__keys, (end[0], end[1] + 1, ""))
+        return first, last
+
+    def __between_days(self, start: tuple[int, int], end: tuple[int, int]) -> Iterator[str]:
+        """ Private method for returning the names with the birthdays from the start to the end day, inclusive
+
+        :param start: start month and day (tuple of int, mandatory)
+        :param end: end month and day (tuple of int, mandatory)
+        :return: contact names (Iterator of strings)
+        """
+        first, last = self.__bounds(start, end)
+        for _, _, name in self.__keys[first:last]:
+            yield name
+
+    def count_between(self, start: datetime.date, end: datetime.date) -> int:
+        """ Return the number of the birthday anniversaries within the dates range, inclusive, in O(log n)
+        for each year of the range
+
+        :param start: the first date of the range (date, mandatory)
+        :param end: the last date of the range (date, mandatory)
+        :return: number of the anniversaries (int)
+        """
+        count: int = 0
+        for first_day, last_day, _ in day_ranges(start, end):
+            first, last = self.__bounds(first_day, last_day)
+            count += last - first
+        return count
+
+    def between(self, start: datetime.date, end: datetime.date) -> Iterator[tuple[str, int]]:
+        """ Return the names of the contacts, whose birthday anniversary is within the dates range, inclusive.
+        The range can wrap around the year. If the birthday is on February 29 and the year is not a leap year,
+        the anniversary is on March 1.
+
+        :param start: the first date of the range (date, mandatory)
+        :param end: the last date of the range (date, mandatory)
+        :return: contact names with the year of the anniversary, ordered by the anniversary (Iterator of tuples)
+        """
+        for first_day, last_day, year in day_ranges(start, end):
+            for name in self.__between_days(first_day, last_day):
+                yield name, year
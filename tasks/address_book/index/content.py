@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Merkle-style index of the contact content hashes, partitioned into the buckets by the contact name
+"""
+
+import hashlib
+from typing import Optional
+
+
+# Number of the buckets, the differing buckets are compared record by record
+BUCKETS: int = 256
+# Size of the content hash in bytes
+HASH_SIZE: int = 16
+
+
+class ContentIndex:
+    def __init__(self):
+        """ Initialize an empty index
+        """
+        # Content hashes by the contact name, in the buckets by the name hash
+        self.__buckets: list[dict[str, bytes]] = [{} for _ in range(BUCKETS)]
+        # Digest of each bucket: XOR of its content hashes, updated in O(1) by each change
+        self.__digests: list[int] = [0] * BUCKETS
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.__buckets)
+
+    @staticmethod
+    def bucket(name: str) -> int:
+        """ Return the bucket of the contact name, stable between the processes
+
+        :param name: contact name (string, mandatory)
+        :return: bucket number (int)
+        """
+        return hashlib.blake2b(name.encode("utf-8"), digest_size=1).digest()[0] % BUCKETS
+
+    def add(self, name: str, content_hash: bytes) -> None:
+        """ Add or replace the content hash of the contact
+
+        :param name: contact name (string, mandatory)
+        :param content_hash: the content hash of the contact record (bytes, mandatory)
+        """
+        bucket: int = self.bucket(name)
+        previous: Optional[bytes] = self.__buckets[bucket].get(name)
+        if previous is not None:
+            self.__digests[bucket] ^= int.from_bytes(previous, "little")
+        self.__buckets[bucket][name] = content_hash
+        self.__digests[bucket] ^= int.from_bytes(content_hash, "little")
+
+    def remove(self, name: str) -> None:
+        """ Remove the content hash of the contact, if it exists
+
+        :param name: contact name (string, mandatory)
+        """
+        bucket: int = self.bucket(name)
+        previous: Optional[bytes] = self.__buckets[bucket].pop(name, None)
+        if previous is not None:
+            self.__digests[bucket] ^= int.from_bytes(previous, "little")
+
+    def root(self) -> bytes:
+        """ Return the digest of all the buckets, equal for the indexes of the same contacts
+
+        :return: the root digest (bytes)
+        """
+        return hashlib.blake2b(
+            b"".join(digest.to_bytes(HASH_SIZE, "little") for digest in self.__digests), digest_size=HASH_SIZE
+        ).digest()
+
+    def diff(self, other: "ContentIndex") -> tuple[list[str], list[str], list[str]]:
+        """ Compare the index with the other one, only the differing buckets are compared record by record.
+        Each differing bucket holds about 1 / BUCKETS of the names, which are compared by the stored hashes.
+
+        :param other: the other index (ContentIndex, mandatory)
+        :return: names only in the other index, names only in this index and names with the different content
+                 (tuple of lists of strings)
+        """
+        added: list[str] = []
+        removed: list[str] = []
+        changed: list[str] = []
+        for bucket, (digest, other_digest) in enumerate(zip(self.__digests, other.__digests)):
+            if digest == other_digest:
+                continue
+            hashes: dict[str, bytes] = self.__buckets[bucket]
+            other_hashes: dict[str, bytes] = other.__buckets[bucket]
+            for name, content_hash in other_hashes.items():
+                if name not in hashes:
+                    added.append(name)
+                elif hashes[name] != content_hash:
+                    changed.append(name)
+            removed.extend(name for name in hashes if name not in other_hashes)
+        return added, removed, changed
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Index of the contact emails by the email and by the email domain
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+
+class EmailIndex:
+    def __init__(self):
+        """ Initialize an empty index
+        """
+        # Contact names with the emails by the lowercase domain
+        self.__domains: defaultdict[str, set[tuple[str, str]]] = defaultdict(set)
+        # Contact names by the email
+        self.__emails: defaultdict[str, set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.__domains.values())
+
+    @staticmethod
+    def domain(email: str) -> str:
+        """ Return the lowercase domain of the email, the index key
+
+        :param email: email (string, mandatory)
+        :return: email domain (string)
+        """
+        return email.rpartition("@")[2].lower()
+
+    def add(self, name: str, email: str) -> None:
+        """ Add the contact email to the index
+
+        :param name: contact name (string, mandatory)
+        :param email: sanitized email (string, mandatory)
+        """
+        self.__domains[self.domain(email)].add((name, email))
+        self.__emails[email].add(name)
+
+    def extend(self, entries: Iterable[tuple[str, str]]) -> None:
+        """ Add many contact emails at once
+
+        :param entries: contact names with the sanitized emails (Iterable of tuples, mandatory)
+        """
+        for name, email in entries:
+            self.add(name, email)
+
+    def remove(self, name: str, email: str) -> None:
+        """ Remove the contact email from the index, if it exists
+
+        :param name: contact name (string, mandatory)
+        :param email: sanitized email (string, mandatory)
+        """
+        domain: str = self.domain(email)
+        entries: set[tuple[str, str]] = self.__domains.get(domain, set())
+        entries.discard((name, email))
+        if not entries:
+            self.__domains.pop(domain, None)
+        names: set[str] = self.__emails.get(email, set())
+        names.discard(name)
+        if not names:
+            self.__emails.pop(email, None)
+
+    def count(self, domain: str) -> int:
+        """ Return the number of the emails in the domain
+
+        :param domain: email domain (string, mandatory)
+        :return: number of the emails (int)
+        """
+        return len(self.__domains.get(domain.lower(), ()))
+
+    def count_email(self, email: str) -> int:
+        """ Return the number of the contacts with the email
+
+        :param email: sanitized email (string, mandatory)
+        :return: number of the contacts (int)
+        """
+        return len(self.__emails.get(email, ()))
+
+    def by_domain(self, domain: str) -> Iterator[tuple[str, str]]:
+        """ Return the emails in the domain
+
+        :param domain: email domain (string, mandatory)
+        :return: contact names with the emails (Iterator of tuples)
+        """
+        yield from self.__domains.get(domain.lower(), ())
+
+    def by_email(self, email: str) -> Iterator[str]:
+        """ Return the names of the contacts with the email
+
+        :param email: sanitized email (string, mandatory)
+        :return: contact names (Iterator of strings)
+        """
+        yield from self.__emails.get(email, ())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Index of the contact names by the caseless key: the NFC-normalized, casefolded name
+"""
+
+import unicodedata
+from collections.abc import Iterable
+
+
+def fold_name(name: str) -> str:
+    """ Return the caseless key of the name, equal for the case variants and the composed and decomposed forms
+
+    :param name: contact name (string, mandatory)
+    :return: the caseless key (string)
+    """
+    # Casefolding can produce the decomposed characters, so the result is normalized again
+    return unicodedata.normalize("NFC", unicodedata.normalize("NFC", name).casefold())
+
+
+class NameIndex:
+    def __init__(self):
+        """ Initialize an empty index
+        """
+        # Contact names by the caseless key, in the order of adding
+        self.__names: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(names) for names in self.__names.values())
+
+    def add(self, name: str) -> None:
+        """ Add the contact name to the index
+
+        :param name: contact name (string, mandatory)
+        """
+        self.__names.setdefault(fold_name(name), []).append(name)
+
+    def extend(self, names: Iterable[str]) -> None:
+        """ Add many contact names at once
+
+        :param names: contact names (Iterable of strings, mandatory)
+        """
+        for name in names:
+            self.add(name)
+
+    def remove(self, name: str) -> None:
+        """ Remove the contact name from the index, if it exists
+
+        :param name: contact name (string, mandatory)
+        """
+        key: str = fold_name(name)
+        names: list[str] = self.__names.get(key, [])
+        if name in names:
+            names.remove(name)
+        if not names:
+            self.__names.pop(key, None)
+
+    def variants(self, name: str) -> list[str]:
+        """ Return the contact names with the same caseless key in O(1), in the order of adding
+
+        :param name: contact name in any case and normalization form (string, mandatory)
+        :return: contact names (list of strings)
+        """
+        return list(self.__names.get(fold_name(name), ()))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Sorted index of the normalized contact phone numbers
+"""
+
+import bisect
+from typing import Optional
+from collections.abc import Iterable, Iterator
+
+
+class PhoneIndex:
+    def __init__(self):
+        """ Initialize an empty index
+        """
+        # Sorted (phone, name) keys
+        self.__keys: list[tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    @staticmethod
+    def __phone(key: tuple[str, str]) -> str:
+        """ Private method for returning the phone number of the index key
+
+        :param key: the index key (tuple, mandatory)
+        :return: phone number (string)
+        """
+        return key[0]
+
+    def add(self, name: str, phone: str) -> None:
+        """ Add the contact phone number to the index
+
+        :param name: contact name (string, mandatory)
+        :param phone: normalized phone number (string, mandatory)
+        """
+        bisect.insort(self.__keys, (phone, name))
+
+    def extend(self, entries: Iterable[tuple[str, str]]) -> None:
+        """ Add many contact phone numbers at once, sorting the index a single time
+
+        :param entries: contact names with the normalized phone numbers (Iterable of tuples, mandatory)
+        """
+        self.__keys.extend((phone, name) for name, phone in entries)
+        self.__keys.sort()
+
+    def remove(self, name: str, phone: str) -> None:
+        """ Remove the contact phone number from the index, if it exists
+
+        :param name: contact name (string, mandatory)
+        :param phone: normalized phone number (string, mandatory)
+        """
+        index: int = bisect.bisect_left(self.__keys, (phone, name))
+        if index < len(self.__keys) and self.__keys[index] == (phone, name):
+            del self.__keys[index]
+
+    def count_prefix(self, prefix: str) -> int:
+        """ Return the number of the phone numbers starting with the prefix in O(log n)
+
+        :param prefix: phone number prefix (string, mandatory)
+        :return: number of the phone numbers (int)
+        """
+        return (
+            bisect.bisect_left(self.__keys, prefix + "\uffff", key=self.__phone)
+            - bisect.bisect_left(self.__keys, prefix, key=self.__phone)
+        )
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> Iterator[tuple[str, str]]:
+        """ Return the phone numbers starting with the prefix, in ascending order
+
+        :param prefix: phone number prefix (string, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contact names (Iterator of tuples)
+        """
+        index: int = bisect.bisect_left(self.__keys, prefix, key=self.__phone)
+        count: int = 0
+        while index < len(self.__keys) and self.__keys[index][0].startswith(prefix):
+            if limit is not None and count >= limit:
+                return
+            yield self.__keys[index]
+            index += 1
+            count += 1
+
+    def between(self, low: str, high: str, limit: Optional[int] = None) -> Iterator[tuple[str, str]]:
+        """ Return the phone numbers from the low to the high one, inclusive, in ascending order
+
+        :param low: the lowest phone number (string, mandatory)
+        :param high: the highest phone number (string, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contact names (Iterator of tuples)
+        """
+        first: int = bisect.bisect_left(self.__keys, low, key=self.__phone)
+        last: int = bisect.bisect_right(self.__keys, high, key=self.__phone)
+        if limit is not None:
+            last = min(last, first + limit)
+        yield from self.__keys[first:last]
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Manager of the address books of many tenants, opened on demand and kept in the LRU order
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Optional, Union
+from contextlib import contextmanager
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+
+from .book import AddressBook
+from .autosave import save_snapshot
+from .cache import RecordCache
+from .error import AddressBookTenantValueError, AddressBookSaveError
+from .mutation import Mutation
+
+
+logger = logging.getLogger(__name__)
+
+
+class _OpenBook:
+    def __init__(self, wake: threading.Event, mutations: int):
+        """ Initialize the slot of the tenant's address book, the book is loaded by the first user
+
+        :param wake: the event waking the background thread (Event, mandatory)
+        :param mutations: the number of the mutations, which triggers the background save (int, mandatory)
+        """
+        # Serializes the commands and the saves of the book
+        self.lock = threading.RLock()
+        self.book: Optional[AddressBook] = None
+        # Number of the users, the book in use is not evicted
+        self.users: int = 0
+        self.dirty: bool = False
+        self.last_used: float = time.monotonic()
+        self.__wake = wake
+        self.__mutations = mutations
+        # Number of the mutations since the last save
+        self.pending: int = 0
+        # The last error of the background save, reported to the next user of the book
+        self.error: Optional[Exception] = None
+
+    def changed(self, mutations: list[Mutation]) -> None:
+        """ Mark the book as changed since it was loaded or saved, waking the background thread,
+        if there are enough mutations
+
+        :param mutations: the applied mutations (list of Mutation, mandatory)
+        """
+        self.dirty = True
+        self.pending += len(mutations)
+        if self.pending >= self.__mutations:
+            self.__wake.set()
+
+
+class BookManager:
+    tenant_pattern = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+    def __init__(
+            self,
+            directory: Union[Path, str],
+            max_open: int = 64,
+            idle_seconds: float = 300.0,
+            interval: float = 30.0,
+            mutations: int = 100,
+            codec: Optional[str] = None,
+            file_format: Optional[str] = None,
+            cache_size: Optional[int] = None,
+    ):
+        """ Initialize the manager of the address books stored in the directory, one data file per tenant
+
+        :param directory: the directory of the data files (string, Path, mandatory)
+        :param max_open: the maximum number of the address books kept in memory (int, optional)
+        :param idle_seconds: the address books unused for this number of seconds are saved and evicted
+                             in the background (float, optional)
+        :param interval: the number of seconds between the background saves (float, optional)
+        :param mutations: the number of the mutations of a book, which triggers the background save before
+                          the interval ends (int, optional)
+        :param codec: the data file compression codec (string, optional)
+        :param file_format: the data file format (string, optional)
+        :param cache_size: the maximum number of the contact records of each book kept in memory (int, optional)
+        """
+        if max_open < 1:
+            raise ValueError("The maximum number of the open address books must be a positive number")
+        self.__directory = Path(directory)
+        self.__max_open = max_open
+        self.__idle_seconds = idle_seconds
+        self.__interval = interval
+        self.__mutations = mutations
+        self.__codec = codec
+        self.__file_format = file_format
+        self.__cache_size = cache_size
+        # Guards the open books, the book itself is guarded by its own lock
+        self.__lock = threading.Lock()
+        # Open books by the tenant ID, from the least to the most recently used
+        self.__books: OrderedDict[str, _OpenBook] = OrderedDict()
+        # Serializes the background saves and evictions, so the saved book is not evicted meanwhile
+        self.__maintenance = threading.Lock()
+        self.__stop = threading.Event()
+        self.__wake = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "BookManager":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__books)
+
+    def datafile(self, tenant: str) -> Path:
+        """ Return the data file path of the tenant, or raise the tenant value error exception
+
+        :param tenant: tenant ID (string, mandatory)
+        :return: the data file path (Path)
+        """
+        if not tenant or not re.match(self.tenant_pattern, tenant):
+            raise AddressBookTenantValueError(tenant)
+        return self.__directory / f"{tenant}.pkl"
+
+    @contextmanager
+    def book(self, tenant: str) -> Iterator[AddressBook]:
+        """ Open the address book of the tenant, loading it on the first use, and hold it for the exclusive use.
+        The least recently used books over the limit are saved and evicted by the background thread afterwards.
+        If the last background save of the book has failed, raise the save error once, the book stays changed
+        and the save is retried by the next run.
+
+        :param tenant: tenant ID (string, mandatory)
+        :return: the address book (AddressBook)
+        """
+        datafile: Path = self.datafile(tenant)
+        with self.__lock:
+            entry: Optional[_OpenBook] = self.__books.get(tenant)
+            if entry is None:
+                entry = self.__books[tenant] = _OpenBook(self.__wake, self.__mutations)
+            self.__books.move_to_end(tenant)
+            entry.users += 1
+        try:
+            with entry.lock:
+                if entry.book is None:
+                    entry.book = AddressBook.load(
+                        datafile, codec=self.__codec, file_format=self.__file_format, cache_size=self.__cache_size
+                    )
+                    entry.book.subscribe(entry.changed)
+                if entry.error is not None:
+                    error, entry.error = entry.error, None
+                    raise AddressBookSaveError(tenant, error) from error
+                try:
+                    yield entry.book
+                finally:
+                    entry.last_used = time.monotonic()
+        finally:
+            with self.__lock:
+                entry.users -= 1
+                over_limit: bool = len(self.__books) > self.__max_open
+            if over_limit:
+                self.__wake.set()
+
+    def __save(self, entry: _OpenBook) -> None:
+        """ Private method for saving the changed book, the caller holds the book lock
+
+        :param entry: the open book (_OpenBook, mandatory)
+        """
+        if entry.book is not None and entry.dirty:
+            # Reset the flag first, the book is changed again only by the lock holder
+            entry.dirty = False
+            entry.pending = 0
+            try:
+                entry.book.save()
+            except Exception:
+                entry.dirty = True
+                raise
+            entry.error = None
+
+    def __evict(self, tenant: str, entry: _OpenBook) -> None:
+        """ Private method for saving and evicting the unused book. The book lock is held only while the book
+        is serialized in memory, the book changed while it was written is evicted by the next run.
+
+        :param tenant: tenant ID (string, mandatory)
+        :param entry: the open book (_OpenBook, mandatory)
+        """
+        self.__save_snapshot(tenant, entry)
+        with entry.lock:
+            with self.__lock:
+                # The book could be taken again while it was saved
+                if entry.users or entry.dirty or self.__books.get(tenant) is not entry:
+                    return
+                del self.__books[tenant]
+            if entry.book is not None and isinstance(entry.book.data, RecordCache):
+                entry.book.data.close()
+            entry.book = None
+
+    def __evict_over_limit(self) -> None:
+        """ Private method for evicting the least recently used books over the limit
+        """
+        with self.__lock:
+            excess: int = len(self.__books) - self.__max_open
+            victims: list[tuple[str, _OpenBook]] = [
+                (tenant, entry) for tenant, entry in self.__books.items() if not entry.users
+            ][:max(excess, 0)]
+        for tenant, entry in victims:
+            try:
+                self.__evict(tenant, entry)
+            except Exception as e:
+                self.__failed(tenant, entry, e)
+
+    @staticmethod
+    def __failed(tenant: str, entry: _OpenBook, error: Exception) -> None:
+        """ Private method for keeping and logging the error of the background save, the save is retried
+        by the next run
+
+        :param tenant: tenant ID (string, mandatory)
+        :param entry: the open book (_OpenBook, mandatory)
+        :param error: the save error (Exception, mandatory)
+        """
+        entry.error = error
+        logger.error("The address book of the tenant \"%s\" could not be saved", tenant, exc_info=error)
+
+    def save_all(self) -> None:
+        """ Save all the changed open books, or raise the save error of the first failed book,
+        after the other books are saved
+        """
+        with self.__lock:
+            entries: list[tuple[str, _OpenBook]] = list(self.__books.items())
+        errors: list[tuple[str, Exception]] = []
+        for tenant, entry in entries:
+            with entry.lock:
+                try:
+                    self.__save(entry)
+                except Exception as e:
+                    self.__failed(tenant, entry, e)
+                    errors.append((tenant, e))
+        if errors:
+            tenant, error = errors[0]
+            raise AddressBookSaveError(tenant, error) from error
+
+    def maintain(self) -> None:
+        """ Save and evict the idle books and the least recently used books over the limit, save the other
+        changed books. The users of the book are not blocked while it is written, the lock is held only while
+        the book is serialized in memory.
+        """
+        now: float = time.monotonic()
+        with self.__lock:
+            entries: list[tuple[str, _OpenBook]] = list(self.__books.items())
+        with self.__maintenance:
+            for tenant, entry in entries:
+                try:
+                    if not entry.users and now - entry.last_used >= self.__idle_seconds:
+                        self.__evict(tenant, entry)
+                    else:
+                        self.__save_snapshot(tenant, entry)
+                except Exception as e:
+                    # The failed save is retried by the next run
+                    self.__failed(tenant, entry, e)
+            self.__evict_over_limit()
+
+    def __save_snapshot(self, tenant: str, entry: _OpenBook) -> None:
+        """ Private method for saving the changed book, holding the book lock only while it is serialized in memory.
+        The book is verified to be still open under its lock, and it is marked as changed again, if the save fails.
+
+        :param tenant: tenant ID (string, mandatory)
+        :param entry: the open book (_OpenBook, mandatory)
+        """
+        with entry.lock:
+            book: Optional[AddressBook] = entry.book
+            with self.__lock:
+                if book is None or not entry.dirty or self.__books.get(tenant) is not entry:
+                    return
+            # The following changes mark the book again
+            entry.dirty = False
+            entry.pending = 0
+        try:
+            save_snapshot(book, entry.lock)
+        except Exception:
+            with entry.lock:
+                if entry.book is book:
+                    entry.dirty = True
+            raise
+        entry.error = None
+
+    def __run(self) -> None:
+        """ Private method of the background thread, maintaining the books until the manager is closed
+        """
+        while not self.__stop.is_set():
+            self.__wake.wait(self.__interval)
+            self.__wake.clear()
+            self.maintain()
+
+    def start(self) -> None:
+        """ Start saving and evicting the books in the background
+        """
+        if self.__thread is None:
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__run, name="address-book-manager", daemon=True)
+            self.__thread.start()
+
+    def close(self) -> None:
+        """ Stop the background thread, save and evict all the books, or raise the save error of the first book,
+        which could not be saved
+        """
+        self.__stop.set()
+        self.__wake.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        with self.__lock:
+            entries: list[tuple[str, _OpenBook]] = list(self.__books.items())
+        with self.__maintenance:
+            for tenant, entry in entries:
+                try:
+                    self.__evict(tenant, entry)
+                except Exception as e:
+                    self.__failed(tenant, entry, e)
+        # The books in use or changed while they were written are saved holding their locks
+        self.save_all()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Mutations of the address book and the contact records
+"""
+
+from collections import namedtuple
+
+
+# A single change of the address book:
+#   operation - the name of the AddressBook or Record method, which made the change
+#   name - the contact name (the book key) at the moment of the change
+#   before, after - the changed value before and after the change: the contact record for "add_record"
+#                   and "delete_record", the field value for the Record mutations, None if there is no value
+Mutation = namedtuple('Mutation', ['operation', 'name', 'before', 'after'])
+
+# Inverse operations, the values are swapped
+INVERSE_OPERATIONS: dict[str, str] = {
+    "add_record": "delete_record",
+    "delete_record": "add_record",
+    "edit_name": "edit_name",
+    "add_phone": "remove_phone",
+    "remove_phone": "add_phone",
+    "edit_phone": "edit_phone",
+    "add_email": "remove_email",
+    "remove_email": "add_email",
+    "edit_email": "edit_email",
+    "edit_birthday": "edit_birthday",
+    "remove_birthday": "edit_birthday",
+}
+
+
+def invert(mutation: Mutation) -> Mutation:
+    """ Return the mutation reverting the given one
+
+    :param mutation: the mutation (Mutation, mandatory)
+    :return: the inverse mutation (Mutation)
+    """
+    operation: str = INVERSE_OPERATIONS[mutation.operation]
+    if mutation.operation == "edit_birthday" and mutation.before is None:
+        # The birthday has been added - remove it
+        operation = "remove_birthday"
+    # The renamed contact is found by the new name
+    name: str = mutation.after if mutation.operation == "edit_name" else mutation.name
+    return Mutation(operation, name, mutation.after, mutation.before)
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Composable queries of the address book. The planner reads the candidates from the most selective index
+and filters them by the whole query, the full scan is used only if no index applies.
+"""
+
+import re
+import abc
+import calendar
+import datetime
+from typing import Optional, Callable
+from collections import namedtuple
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import chain
+
+
+from .error import ContactPhoneValueError
+from .record import Record
+from .record.record import Phone, Email
+from .index import BirthdayIndex, PhoneIndex, EmailIndex, NameIndex, fold_name
+
+
+# The indexes available to the planner:
+#   contacts - the contact records by the name
+#   phones, birthdays, emails, names - the functions returning the indexes, which are built on the first use
+QueryIndexes = namedtuple("QueryIndexes", ["contacts", "phones", "birthdays", "emails", "names"])
+
+# The index access of the predicate:
+#   index - description of the index and the looked up value
+#   estimate - the number of the candidates, the upper bound
+#   names - the function returning the names of the candidates, possibly repeated
+Access = namedtuple("Access", ["index", "estimate", "names"])
+
+# The plan of the query: the chosen index, the estimated number of the candidates and the number of the contacts
+QueryPlan = namedtuple("QueryPlan", ["index", "estimate", "total"])
+
+# Description of the full scan plan
+FULL_SCAN: str = "full scan"
+
+
+class Predicate(abc.ABC):
+    """ Condition on the contact record, combined with the others by the &, | and ~ operators
+    """
+
+    @abc.abstractmethod
+    def matches(self, contact: Record) -> bool:
+        """ Check whether the contact satisfies the condition
+
+        :param contact: contact record (Record, mandatory)
+        :return: True if the contact satisfies the condition (bool)
+        """
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        """ Return the index access, which finds all the contacts satisfying the condition
+
+        :param indexes: the indexes of the address book (QueryIndexes, mandatory)
+        :return: the index access, None if the condition needs the full scan (Access, optional)
+        """
+        return None
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+class And(Predicate):
+    def __init__(self, *predicates: Predicate):
+        """ Conjunction of the conditions, the candidates are read from the most selective index
+
+        :param predicates: the conditions (Predicate, mandatory)
+        """
+        self.predicates = predicates
+
+    def matches(self, contact: Record) -> bool:
+        return all(predicate.matches(contact) for predicate in self.predicates)
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        accesses: list[Access] = [
+            access for predicate in self.predicates if (access := predicate.access(indexes)) is not None
+        ]
+        return min(accesses, key=lambda access: access.estimate, default=None)
+
+
+class Or(Predicate):
+    def __init__(self, *predicates: Predicate):
+        """ Disjunction of the conditions, the candidates are the union of the indexes,
+        if each condition has an index
+
+        :param predicates: the conditions (Predicate, mandatory)
+        """
+        self.predicates = predicates
+
+    def matches(self, contact: Record) -> bool:
+        return any(predicate.matches(contact) for predicate in self.predicates)
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        accesses: list[Optional[Access]] = [predicate.access(indexes) for predicate in self.predicates]
+        if not accesses or None in accesses:
+            return None
+        return Access(
+            " or ".join(access.index for access in accesses),
+            sum(access.estimate for access in accesses),
+            lambda: chain.from_iterable(access.names() for access in accesses),
+        )
+
+
+class Not(Predicate):
+    def __init__(self, predicate: Predicate):
+        """ Negation of the condition, it needs the full scan
+
+        :param predicate: the condition (Predicate, mandatory)
+        """
+        self.predicate = predicate
+
+    def matches(self, contact: Record) -> bool:
+        return not self.predicate.matches(contact)
+
+
+class NameIs(Predicate):
+    def __init__(self, name: str):
+        """ The contact name is equal to the value, case-insensitive and normalization-insensitive,
+        found by the name index
+
+        :param name: contact name (string, mandatory)
+        """
+        self.name = name
+        self.key = fold_name(name)
+
+    def matches(self, contact: Record) -> bool:
+        return fold_name(str(contact.name)) == self.key
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        index: NameIndex = indexes.names()
+        names: list[str] = index.variants(self.name)
+        return Access(f"name {self.name}", len(names), lambda: names)
+
+
+class NameContains(Predicate):
+    def __init__(self, text: str):
+        """ The contact name contains the text, case-insensitive and normalization-insensitive
+
+        :param text: the text (string, mandatory)
+        """
+        self.text = fold_name(text)
+
+    def matches(self, contact: Record) -> bool:
+        return self.text in fold_name(str(contact.name))
+
+
+class PhonePrefix(Predicate):
+    def __init__(self, prefix: str):
+        """ A phone number of the contact starts with the prefix, found by the phone index.
+        The whole phone number is a prefix as well.
+
+        :param prefix: phone number prefix, the formatting symbols are ignored (string, mandatory)
+        """
+        # Clear the prefix from formatting symbols and whitespaces
+        self.prefix = re.sub(Phone.value_clear_pattern, '', prefix or '')
+        if not self.prefix.isdigit():
+            raise ContactPhoneValueError()
+
+    def matches(self, contact: Record) -> bool:
+        return any(phone.value.startswith(self.prefix) for phone in contact.phones)
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        index: PhoneIndex = indexes.phones()
+        return Access(
+            f"phone prefix {self.prefix}",
+            index.count_prefix(self.prefix),
+            lambda: (name for _, name in index.prefix(self.prefix)),
+        )
+
+
+class EmailIs(Predicate):
+    def __init__(self, email: str):
+        """ An email of the contact is equal to the value, found by the email index
+
+        :param email: email (string, mandatory)
+        """
+        self.email = Email.prepare(email)
+
+    def matches(self, contact: Record) -> bool:
+        return any(email.value == self.email for email in contact.emails)
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        index: EmailIndex = indexes.emails()
+        return Access(
+            f"email {self.email}",
+            index.count_email(self.email),
+            lambda: index.by_email(self.email),
+        )
+
+
+class EmailDomain(Predicate):
+    def __init__(self, domain: str):
+        """ An email of the contact is in the domain, case-insensitive, found by the email index
+
+        :param domain: email domain, with or without "@" (string, mandatory)
+        """
+        self.domain = domain.strip().lstrip("@").lower()
+
+    def matches(self, contact: Record) -> bool:
+        return any(EmailIndex.domain(email.value) == self.domain for email in contact.emails)
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        index: EmailIndex = indexes.emails()
+        return Access(
+            f"email domain {self.domain}",
+            index.count(self.domain),
+            lambda: (name for name, _ in index.by_domain(self.domain)),
+        )
+
+
+class BirthdayBetween(Predicate):
+    def __init__(self, start: datetime.date, end: datetime.date):
+        """ The birthday anniversary of the contact is within the dates range, inclusive, found by the birthday index.
+        If the birthday is on February 29 and the year is not a leap year, the anniversary is on March 1.
+
+        :param start: the first date of the range (date, mandatory)
+        :param end: the last date of the range (date, mandatory)
+        """
+        if start > end:
+            raise ValueError("The start date of the range must not be after the end date")
+        self.start = start
+        self.end = end
+
+    def matches(self, contact: Record) -> bool:
+        if contact.birthday is None:
+            return False
+        return any(
+            self.start <= contact.birthday.birthday(year) <= self.end for year in range(self.start.year, self.end.year + 1)
+        )
+
+    def access(self, indexes: QueryIndexes) -> Optional[Access]:
+        index: BirthdayIndex = indexes.birthdays()
+        return Access(
+            f"birthdays {self.start.strftime('%d.%m.%Y')}-{self.end.strftime('%d.%m.%Y')}",
+            index.count_between(self.start, self.end),
+            lambda: (name for name, _ in index.between(self.start, self.end)),
+        )
+
+
+class BirthdayInMonth(BirthdayBetween):
+    def __init__(self, month: int, year: Optional[int] = None):
+        """ The birthday anniversary of the contact is in the month, found by the birthday index
+
+        :param month: the month number, from 1 to 12 (int, mandatory)
+        :param year: the year, if not specified, the current year is used (int, optional)
+        """
+        if not 1 <= month <= 12:
+            raise ValueError("The month must be a number from 1 to 12")
+        if year is None:
+            year = datetime.datetime.today().year
+        super().__init__(
+            datetime.date(year, month, 1),
+            datetime.date(year, month, calendar.monthrange(year, month)[1]),
+        )
+
+
+class HasField(Predicate):
+    # Fields of the contact, which can be empty
+    FIELDS: dict[str, Callable[[Record], bool]] = {
+        "phone": lambda contact: contact.phone_count > 0,
+        "email": lambda contact: contact.email_count > 0,
+        "birthday": lambda contact: contact.birthday is not None,
+    }
+
+    def __init__(self, field: str):
+        """ The contact has the field: a phone number, an email or a birthday
+
+        :param field: "phone", "email" or "birthday" (string, mandatory)
+        """
+        if field not in self.FIELDS:
+            raise ValueError(f"The field must be one of: {', '.join(self.FIELDS)}")
+        self.field = field
+
+    def matches(self, contact: Record) -> bool:
+        return self.FIELDS[self.field](contact)
+
+
+def plan(predicate: Predicate, indexes: QueryIndexes) -> tuple[QueryPlan, Iterable[str]]:
+    """ Choose the index access of the query, the full scan is used if there is no index access,
+    or the index is not more selective than the full scan
+
+    :param predicate: the query (Predicate, mandatory)
+    :param indexes: the indexes of the address book (QueryIndexes, mandatory)
+    :return: the plan and the names of the candidates (tuple)
+    """
+    total: int = len(indexes.contacts)
+    access: Optional[Access] = predicate.access(indexes)
+    if access is None or access.estimate >= total:
+        return QueryPlan(FULL_SCAN, total, total), indexes.contacts.keys()
+    # The candidates are deduplicated, keeping the index order
+    return QueryPlan(access.index, access.estimate, total), dict.fromkeys(access.names())
+
+
+def execute(
+        predicate: Predicate,
+        indexes: QueryIndexes,
+        limit: Optional[int] = None,
+        planned: Optional[tuple[QueryPlan, Iterable[str]]] = None,
+) -> Iterator[Record]:
+    """ Return the contacts satisfying the query, reading the candidates by the plan
+
+    :param predicate: the query (Predicate, mandatory)
+    :param indexes: the indexes of the address book (QueryIndexes, mandatory)
+    :param limit: maximum number of the contacts (int, optional)
+    :param planned: the plan with the candidates returned by plan, the query is planned if not given (tuple, optional)
+    :return: contact records (Iterator of Record)
+    """
+    contacts: Mapping[str, Record] = indexes.contacts
+    count: int = 0
+    for name in (planned or plan(predicate, indexes))[1]:
+        if limit is not None and count >= limit:
+            return
+        contact: Optional[Record] = contacts.get(name)
+        if contact is not None and predicate.matches(contact):
+            count += 1
+            yield contact
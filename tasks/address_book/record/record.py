@@ -5,11 +5,14 @@ Record class for address book implementation
 """
 
 import re
+import hashlib
 import datetime
 from typing import Optional, Any
+from collections.abc import MutableMapping, Iterable, Iterator
 
 
 from ..error import (
+    ContactAlreadyExist,
     ContactNameMandatory,
     ContactPhoneNotFound,
     ContactPhoneAlreadyExist,
@@ -19,7 +22,9 @@ from ..error import (
     ContactEmailValueError,
     ContactBirthdayAlreadyExist,
     ContactBirthdayValueError,
+    ContactBirthdayNotFound,
 )
+from ..mutation import Mutation
 
 
 class Field:
@@ -30,6 +35,17 @@ class Field:
         """
         self.value = value
 
+    @classmethod
+    def restore(cls, value: Any) -> "Field":
+        """ Create the field with the already validated value, skipping the validation
+
+        :param value: the validated value (mandatory)
+        :return: the field (Field)
+        """
+        field = cls.__new__(cls)
+        field.value = value
+        return field
+
     def __str__(self) -> str:
         """ Create a readable string for the class instance
 
@@ -159,6 +175,70 @@ class Email(Field):
         return value
 
 
+class _FieldSlots:
+    def __init__(self, fields: Iterable[Field] = ()):
+        """ Initialize the fields by the value in the insertion order. The field is found, added, removed
+        and replaced keeping its position in O(1), the removed fields leave the empty slots, which are compacted,
+        when they are the majority.
+
+        :param fields: the fields with the unique values (Iterable of Field, optional)
+        """
+        # Fields in the insertion order, None in the slots of the removed fields
+        self.__slots: list[Optional[Field]] = []
+        # Slot number by the field value
+        self.__positions: dict[str, int] = {}
+        for field in fields:
+            self[field.value] = field
+
+    def __len__(self) -> int:
+        return len(self.__positions)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self.__positions
+
+    def __setitem__(self, value: str, field: Field) -> None:
+        if value in self.__positions:
+            self.__slots[self.__positions[value]] = field
+        else:
+            self.__positions[value] = len(self.__slots)
+            self.__slots.append(field)
+
+    def __delitem__(self, value: str) -> None:
+        self.__slots[self.__positions.pop(value)] = None
+        # The trailing empty slots are dropped at once, the others are compacted in bulk
+        while self.__slots and self.__slots[-1] is None:
+            self.__slots.pop()
+        if len(self.__slots) > 2 * len(self.__positions) + 8:
+            self.__slots = [field for field in self.__slots if field is not None]
+            self.__positions = {field.value: position for position, field in enumerate(self.__slots)}
+
+    def get(self, value: str) -> Optional[Field]:
+        """ Return the field by the value
+
+        :param value: field value (string, mandatory)
+        :return: the field, if found (Field, optional)
+        """
+        position: Optional[int] = self.__positions.get(value)
+        return self.__slots[position] if position is not None else None
+
+    def replace(self, existing_value: str, field: Field) -> None:
+        """ Replace the field keeping its position
+
+        :param existing_value: the replaced field value (string, mandatory)
+        :param field: the new field (Field, mandatory)
+        """
+        position: int = self.__positions.pop(existing_value)
+        self.__slots[position] = field
+        self.__positions[field.value] = position
+
+    def values(self) -> Iterator[Field]:
+        """ Return the fields in the insertion order
+
+        :return: the fields (Iterator of Field)
+        """
+        return (field for field in self.__slots if field is not None)
+
+
 class Record:
     def __init__(
             self,
@@ -176,8 +256,14 @@ class Record:
         """
         self.name = Name(name)
         self.birthday = None
-        self.phones = []
-        self.emails = []
+        # Phone numbers and emails by the sanitized value, in the insertion order
+        self.__phones: _FieldSlots = _FieldSlots()
+        self.__emails: _FieldSlots = _FieldSlots()
+        # The address book, which owns the record and is notified about the record mutations
+        self.__owner = None
+        # The cached readable string and content hash, invalidated by each mutation
+        self.__rendered: Optional[str] = None
+        self.__content_hash: Optional[bytes] = None
         # Add birthday if given
         if isinstance(birthday, str):
             self.edit_birthday(birthday)
@@ -192,16 +278,130 @@ class Record:
                 if self.__find_email(email) is None:
                     self.add_email(email)
 
+    @classmethod
+    def restore(
+            cls,
+            name: str,
+            birthday: Optional[datetime.date] = None,
+            phones: Optional[list[str]] = None,
+            emails: Optional[list[str]] = None,
+    ) -> "Record":
+        """ Create the Contact record from the already validated values, for example, loaded from the data file
+
+        :param name: the name value (string, mandatory)
+        :param birthday: the date of birth (date, optional)
+        :param phones: the sanitized phone numbers without duplicates (list of strings, optional)
+        :param emails: the sanitized emails without duplicates (list of strings, optional)
+        :return: the Contact record (Record)
+        """
+        record = cls.__new__(cls)
+        record.name = Name.restore(name)
+        record.birthday = Birthday.restore(birthday) if birthday is not None else None
+        record.__phones = _FieldSlots(Phone.restore(phone) for phone in phones or ())
+        record.__emails = _FieldSlots(Email.restore(email) for email in emails or ())
+        record.__owner = None
+        record.__rendered = None
+        record.__content_hash = None
+        return record
+
+    def __getstate__(self):
+        attributes = self.__dict__.copy()
+        # The phone numbers and emails are stored as the lists, as before the indexing
+        attributes["phones"] = list(attributes.pop(f"_{self.__class__.__name__}__phones").values())
+        attributes["emails"] = list(attributes.pop(f"_{self.__class__.__name__}__emails").values())
+        # The owner is not stored with the record, it is attached again by the address book
+        attributes[f"_{self.__class__.__name__}__owner"] = None
+        # The readable string is rendered again after loading
+        attributes[f"_{self.__class__.__name__}__rendered"] = None
+        attributes[f"_{self.__class__.__name__}__content_hash"] = None
+        return attributes
+
+    def __setstate__(self, value):
+        self.__dict__ = value
+        # Records saved before the mutation notifications do not contain the owner
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__owner", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__rendered", None)
+        self.__dict__.setdefault(f"_{self.__class__.__name__}__content_hash", None)
+        # Index the phone numbers and emails by the sanitized value
+        self.__phones = _FieldSlots(self.__dict__.pop("phones"))
+        self.__emails = _FieldSlots(self.__dict__.pop("emails"))
+
+    @property
+    def phones(self) -> list[Phone]:
+        """ Return the phone numbers in the insertion order. The list is a copy, the phone numbers are changed
+        by the record methods.
+
+        :return: phone fields (list of Phone)
+        """
+        return list(self.__phones.values())
+
+    @property
+    def emails(self) -> list[Email]:
+        """ Return the emails in the insertion order. The list is a copy, the emails are changed
+        by the record methods.
+
+        :return: email fields (list of Email)
+        """
+        return list(self.__emails.values())
+
+    @property
+    def phone_count(self) -> int:
+        """ Return the number of the phone numbers in O(1), without copying them
+
+        :return: number of the phone numbers (int)
+        """
+        return len(self.__phones)
+
+    @property
+    def email_count(self) -> int:
+        """ Return the number of the emails in O(1), without copying them
+
+        :return: number of the emails (int)
+        """
+        return len(self.__emails)
+
+    @property
+    def owner(self) -> Optional[MutableMapping]:
+        """ Return the address book, which owns the record
+
+        :return: the address book (AddressBook, optional)
+        """
+        return self.__owner
+
+    def attach(self, owner: MutableMapping) -> None:
+        """ Attach the record to the address book, which will be notified about the record mutations
+
+        :param owner: the address book (AddressBook, mandatory)
+        """
+        self.__owner = owner
+
+    def detach(self) -> None:
+        """ Detach the record from the address book
+        """
+        self.__owner = None
+
+    def __notify(self, operation: str, before: Any, after: Any, name: Optional[str] = None) -> None:
+        """ Private method for notifying the owner about the record mutation
+
+        :param operation: the mutation operation (string, mandatory)
+        :param before: the value before the mutation (optional)
+        :param after: the value after the mutation (optional)
+        :param name: the contact name before the mutation, the current one by default (string, optional)
+        """
+        # The record is changed - invalidate the readable string and the content hash
+        self.__rendered = None
+        self.__content_hash = None
+        if self.__owner is not None:
+            self.__owner.notify(self, Mutation(operation, name or str(self.name), before, after))
+
     def __find_phone(self, phone: str) -> Optional[Phone]:
         """ Private method for searching the phone number
 
         :param phone: phone number (string, mandatory)
         :return: phone field, if found (Phone, optional)
         """
-        # Clear the phone number from formatting symbols and whitespaces
-        phone = Phone.prepare(phone)
-        # Find and return by phone number
-        return next((p for p in self.phones if p.value == phone), None)
+        # Clear the phone number from formatting symbols and whitespaces, and find by the phone number
+        return self.__phones.get(Phone.prepare(phone))
 
     def __find_email(self, email: str) -> Optional[Email]:
         """ Private method for searching the email
@@ -209,17 +409,21 @@ class Record:
         :param email: email (string, mandatory)
         :return: email field, if found (Email, optional)
         """
-        # Clear the email fom whitespaces
-        email = Email.prepare(email)
-        # Find and return by email
-        return next((p for p in self.emails if p.value == email), None)
+        # Clear the email fom whitespaces, and find by the email
+        return self.__emails.get(Email.prepare(email))
 
     def edit_name(self, name: str) -> None:
         """ Edit the name, or raise the name value mandatory exception
 
         :param name: contact`s name (string, mandatory)
         """
-        self.name = Name(name)
+        new_name: Name = Name(name)
+        existing_name: str = str(self.name)
+        # The name is the address book key, so it must be unique within the owner
+        if self.__owner is not None and str(new_name) != existing_name and str(new_name) in self.__owner:
+            raise ContactAlreadyExist()
+        self.name = new_name
+        self.__notify("edit_name", existing_name, str(new_name), name=existing_name)
 
     def add_birthday(self, birthday: str) -> None:
         """ Add the birthday, or raise the birthday already exists exception
@@ -236,7 +440,18 @@ class Record:
 
         :param birthday: birthday (string, mandatory)
         """
+        existing_birthday: Optional[datetime.date] = self.birthday.value if self.birthday is not None else None
         self.birthday = Birthday(birthday)
+        self.__notify("edit_birthday", existing_birthday, self.birthday.value)
+
+    def remove_birthday(self) -> None:
+        """ Remove the birthday, or raise the birthday not found exception
+        """
+        if self.birthday is None:
+            raise ContactBirthdayNotFound()
+        existing_birthday: datetime.date = self.birthday.value
+        self.birthday = None
+        self.__notify("remove_birthday", existing_birthday, None)
 
     def next_birthday(self, today: datetime.date) -> Optional[datetime.date]:
         """Return the next birthday of contact. If the birthday is on February 29 and today's year is not a leap year,
@@ -274,26 +489,36 @@ class Record:
 
         :param phone: phone number (string, mandatory)
         """
-        if self.__find_phone(phone):
+        phone_object: Phone = Phone(phone)
+        if phone_object.value in self.__phones:
             # Phone number found - raise the phone number already exists exception
             raise ContactPhoneAlreadyExist()
         # Add the phone number
-        self.phones.append(Phone(phone))
+        self.__phones[phone_object.value] = phone_object
+        self.__notify("add_phone", None, phone_object.value)
 
     def remove_phone(self, phone: str) -> None:
         """ Remove the phone number, or raise the phone number not found exception
 
         :param phone: phone number (string, mandatory)
         """
-        self.phones.remove(self.find_phone(phone))
+        phone_object: Phone = self.find_phone(phone)
+        del self.__phones[phone_object.value]
+        self.__notify("remove_phone", phone_object.value, None)
 
     def edit_phone(self, existing_phone: str, phone: str) -> None:
-        """ Edit the phone number, or raise the phone number not found exception
+        """ Edit the phone number keeping its position in O(1), or raise the phone number not found exception
 
         :param existing_phone: phone number (string, mandatory)
         :param phone: new phone number (string, mandatory)
         """
-        self.phones[self.phones.index(self.find_phone(existing_phone))] = Phone(phone)
+        existing_value: str = self.find_phone(existing_phone).value
+        phone_object: Phone = Phone(phone)
+        if phone_object.value != existing_value and phone_object.value in self.__phones:
+            # The new phone number already exists - raise the phone number already exists exception
+            raise ContactPhoneAlreadyExist()
+        self.__phones.replace(existing_value, phone_object)
+        self.__notify("edit_phone", existing_value, phone_object.value)
 
     def find_email(self, email: str) -> Phone:
         """ Search and return the email, or raise the email not found exception
@@ -313,39 +538,95 @@ class Record:
 
         :param email: email (string, mandatory)
         """
-        if self.__find_email(email):
+        email_object: Email = Email(email)
+        if email_object.value in self.__emails:
             # Email found - raise the email already exists exception
             raise ContactEmailAlreadyExist()
         # Add the email
-        self.emails.append(Email(email))
+        self.__emails[email_object.value] = email_object
+        self.__notify("add_email", None, email_object.value)
 
     def remove_email(self, email: str) -> None:
         """ Remove the email, or raise the email not found exception
 
         :param email: email (string, mandatory)
         """
-        self.emails.remove(self.find_email(email))
+        email_object: Email = self.find_email(email)
+        del self.__emails[email_object.value]
+        self.__notify("remove_email", email_object.value, None)
 
     def edit_email(self, existing_email: str, email: str) -> None:
-        """ Edit the email, or raise the email not found exception
+        """ Edit the email keeping its position in O(1), or raise the email not found exception
 
         :param existing_email: email (string, mandatory)
         :param email: new email (string, mandatory)
         """
-        self.emails[self.emails.index(self.find_email(existing_email))] = Email(email)
+        existing_value: str = self.find_email(existing_email).value
+        email_object: Email = Email(email)
+        if email_object.value != existing_value and email_object.value in self.__emails:
+            # The new email already exists - raise the email already exists exception
+            raise ContactEmailAlreadyExist()
+        self.__emails.replace(existing_value, email_object)
+        self.__notify("edit_email", existing_value, email_object.value)
+
+    def merge(self, other: "Record") -> None:
+        """ Merge the phone numbers, emails and birthday of the other contact record, skipping the existing ones.
+        The birthday is taken only if the contact does not have one.
 
+        :param other: the other contact record (Record, mandatory)
+        """
+        for phone in other.phones:
+            if self.__find_phone(phone.value) is None:
+                self.add_phone(phone.value)
+        for email in other.emails:
+            if self.__find_email(email.value) is None:
+                self.add_email(email.value)
+        if self.birthday is None and other.birthday is not None:
+            self.edit_birthday(str(other.birthday))
+
+    def copy(self) -> "Record":
+        """ Return the copy of the record, which is not attached to any address book
+
+        :return: the contact record (Record)
+        """
+        return Record.restore(
+            str(self.name),
+            self.birthday.value if self.birthday is not None else None,
+            [phone.value for phone in self.phones],
+            [email.value for email in self.emails],
+        )
+
+    def content_hash(self) -> bytes:
+        """ Return the hash of the name, birthday, phone numbers and emails, stable between the processes.
+        The hash is cached until the record is changed.
+
+        :return: the content hash (bytes)
+        """
+        if self.__content_hash is None:
+            content: str = "\x1e".join((
+                str(self.name),
+                self.birthday.value.isoformat() if self.birthday is not None else "",
+                "\x1f".join(phone.value for phone in self.phones),
+                "\x1f".join(email.value for email in self.emails),
+            ))
+            self.__content_hash = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        return self.__content_hash
 
     def __str__(self) -> str:
         """ Create a readable string for the class instance
 
         :return: readable string (string)
         """
+        # Return the cached readable string, if the record is not changed since the last rendering
+        if self.__rendered is not None:
+            return self.__rendered
 
         readable_string: str = f"Contact name: {str(self.name)}"
         if self.birthday is not None:
             readable_string += f", birthday: {str(self.birthday)}"
-        if self.phones:
-            readable_string += ", phones: {phones}".format(phones="; ".join(str(p) for p in self.phones))
-        if self.emails:
-            readable_string += ", emails: {emails}".format(emails="; ".join(str(p) for p in self.emails))
+        if self.__phones:
+            readable_string += ", phones: {phones}".format(phones="; ".join(str(p) for p in self.__phones.values()))
+        if self.__emails:
+            readable_string += ", emails: {emails}".format(emails="; ".join(str(p) for p in self.__emails.values()))
+        self.__rendered = readable_string
         return readable_string
@@ -0,0 +1,634 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Primary/replica replication of the address book by shipping the journal of its mutations
+over a local socket or a file.
+
+The journal is a stream of the length-prefixed pickled entries:
+    snapshot  - all the contacts in the binary format, the replica replaces its address book
+    mutations - the mutations of a single batch, pickled when they are applied
+    heartbeat - the digest of the primary address book, the replica verifies its own one
+The journal is trusted as the data file is, so it must be shipped only between the local processes.
+"""
+
+import os
+import time
+import logging
+import queue
+import pickle
+import socket
+import struct
+import threading
+from typing import Optional, Union, Callable, BinaryIO
+from contextlib import AbstractContextManager, suppress
+from collections import namedtuple, deque
+from pathlib import Path
+
+
+from .book import AddressBook
+from .mutation import Mutation
+from .storage import atomic_writer
+
+
+logger = logging.getLogger(__name__)
+
+# A single entry of the journal:
+#   kind - "snapshot", "mutations" or "heartbeat"
+#   sequence - the number of the last mutations entry, included into the state of the entry
+#   created - the time of the entry creation on the primary (float)
+#   payload - the serialized contacts, the list of the pickled mutations or the digest of the address book
+JournalEntry = namedtuple("JournalEntry", ["kind", "sequence", "created", "payload"])
+
+# Lag of the replica: the number of the received, but not applied mutations entries,
+# and the seconds since the oldest of them was created
+ReplicaLag = namedtuple("ReplicaLag", ["entries", "seconds"])
+
+# Length of the pickled entry
+FRAME = struct.Struct("<I")
+
+
+def encode_entry(entry: JournalEntry) -> bytes:
+    """ Return the entry framed for the journal
+
+    :param entry: the journal entry (JournalEntry, mandatory)
+    :return: the length-prefixed pickled entry (bytes)
+    """
+    data: bytes = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+    return FRAME.pack(len(data)) + data
+
+
+def read_entry(stream: BinaryIO) -> Optional[JournalEntry]:
+    """ Read the next entry of the journal
+
+    :param stream: binary stream opened for reading (BinaryIO, mandatory)
+    :return: the journal entry, None if the stream ends before the entry is complete (JournalEntry, optional)
+    """
+    header: bytes = stream.read(FRAME.size)
+    if len(header) < FRAME.size:
+        return None
+    size: int = FRAME.unpack(header)[0]
+    data: bytes = stream.read(size)
+    if len(data) < size:
+        return None
+    return pickle.loads(data)
+
+
+class Primary:
+    def __init__(
+            self,
+            book: AddressBook,
+            lock: Optional[AbstractContextManager] = None,
+            heartbeat: float = 1.0,
+    ):
+        """ Initialize the journal of the primary address book. The users hold the lock while they change
+        the address book, the journal entries are shipped to the sinks holding it too.
+
+        :param book: the address book (AddressBook, mandatory)
+        :param lock: the lock, which the users hold while they change the address book (Lock, optional)
+        :param heartbeat: the number of seconds between the heartbeats (float, optional)
+        """
+        self.__book = book
+        self.lock = lock or threading.RLock()
+        self.__heartbeat = heartbeat
+        # Number of the last mutations entry
+        self.__sequence: int = 0
+        # Pickled mutations of the current batch, the payload is fixed before the later changes of the batch
+        self.__pending: list[bytes] = []
+        # Receivers of the journal entries and their frames
+        self.__sinks: list[Callable[[JournalEntry, bytes], None]] = []
+        # Digest of the address book as it is journaled, the other changes, for example, the merge on save,
+        # are shipped as a new snapshot
+        self.__digest: Optional[str] = None
+        # The error of the last failed heartbeat, None if the last heartbeat succeeded
+        self.__error: Optional[Exception] = None
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Primary":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def sequence(self) -> int:
+        """ Return the number of the last mutations entry
+
+        :return: sequence number (int)
+        """
+        return self.__sequence
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """ Return the error of the last failed heartbeat, the replicas are not verified until a heartbeat succeeds
+
+        :return: the heartbeat error, None if the last heartbeat succeeded (Exception, optional)
+        """
+        return self.__error
+
+    def __observe(self, mutations: list[Mutation]) -> None:
+        """ Private method for pickling each mutation, when it is applied
+
+        :param mutations: the applied mutation (list of Mutation, mandatory)
+        """
+        self.__pending.extend(pickle.dumps(mutation, protocol=pickle.HIGHEST_PROTOCOL) for mutation in mutations)
+
+    def __changed(self, mutations: list[Mutation]) -> None:
+        """ Private method for shipping the mutations of the batch as a single entry
+
+        :param mutations: the applied mutations (list of Mutation, mandatory)
+        """
+        self.__flush()
+
+    def __flush(self) -> None:
+        """ Private method for shipping the pending mutations, including the ones of the rolled back batches
+        """
+        if not self.__pending:
+            return
+        self.__sequence += 1
+        entry = JournalEntry("mutations", self.__sequence, time.time(), self.__pending)
+        self.__pending = []
+        self.__send(entry, self.__sinks)
+        self.__digest = self.__book.digest()
+
+    def __send(self, entry: JournalEntry, sinks: list[Callable[[JournalEntry, bytes], None]]) -> None:
+        """ Private method for shipping the entry to the sinks, the failed sinks are detached
+
+        :param entry: the journal entry (JournalEntry, mandatory)
+        :param sinks: the receivers of the entry (list of Callable, mandatory)
+        """
+        frame: bytes = encode_entry(entry)
+        for sink in list(sinks):
+            try:
+                sink(entry, frame)
+            except Exception:
+                if sink in self.__sinks:
+                    self.__sinks.remove(sink)
+
+    def __snapshot(self) -> JournalEntry:
+        """ Private method for creating the snapshot entry of the current contacts
+
+        :return: the journal entry (JournalEntry)
+        """
+        self.__flush()
+        self.__digest = self.__book.digest()
+        return JournalEntry("snapshot", self.__sequence, time.time(), self.__book.to_bytes())
+
+    def attach(self, sink: Callable[[JournalEntry, bytes], None]) -> None:
+        """ Ship the snapshot and then all the following entries to the sink
+
+        :param sink: the receiver of the entries and their frames (Callable, mandatory)
+        """
+        with self.lock:
+            snapshot: JournalEntry = self.__snapshot()
+            self.__sinks.append(sink)
+            self.__send(snapshot, [sink])
+
+    def detach(self, sink: Callable[[JournalEntry, bytes], None]) -> None:
+        """ Stop shipping the entries to the sink
+
+        :param sink: the receiver of the entries (Callable, mandatory)
+        """
+        with self.lock:
+            if sink in self.__sinks:
+                self.__sinks.remove(sink)
+
+    def checkpoint(self) -> None:
+        """ Ship the snapshot of the current contacts to all the sinks, for example, to compact the journal file
+        """
+        with self.lock:
+            self.__send(self.__snapshot(), self.__sinks)
+
+    def heartbeat(self) -> None:
+        """ Ship the pending mutations and the digest of the address book, the changes, which are not journaled,
+        are shipped as a new snapshot, or raise the heartbeat error
+        """
+        with self.lock:
+            try:
+                self.__flush()
+                digest: str = self.__book.digest()
+                if digest != self.__digest:
+                    self.__send(self.__snapshot(), self.__sinks)
+                self.__send(JournalEntry("heartbeat", self.__sequence, time.time(), digest), self.__sinks)
+            except Exception as e:
+                self.__error = e
+                raise
+            self.__error = None
+
+    def __run(self) -> None:
+        """ Private method of the background thread, shipping the heartbeats until the journal is closed.
+        The failed heartbeats are logged and retried by the next run.
+        """
+        while not self.__stop.wait(self.__heartbeat):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error("The heartbeat of the address book journal could not be shipped", exc_info=e)
+
+    def start(self) -> None:
+        """ Start journaling the mutations of the address book and shipping the heartbeats
+        """
+        if self.__thread is None:
+            with self.lock:
+                self.__digest = self.__book.digest()
+                self.__book.subscribe(self.__observe, immediate=True)
+                self.__book.subscribe(self.__changed)
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__run, name="address-book-primary", daemon=True)
+            self.__thread.start()
+
+    def close(self) -> None:
+        """ Stop journaling the mutations, or raise the error of the last heartbeat, if it has failed
+        """
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+            with self.lock:
+                try:
+                    self.__flush()
+                finally:
+                    self.__book.unsubscribe(self.__observe)
+                    self.__book.unsubscribe(self.__changed)
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+
+class JournalFile:
+    def __init__(self, path: Path):
+        """ Initialize the sink writing the journal to the file. Each snapshot replaces the file,
+        so the file starts with the snapshot, and the replicas following it see the complete journal.
+
+        :param path: the journal file path (Path, mandatory)
+        """
+        self.path = path
+        self.__fh: Optional[BinaryIO] = None
+        # The last written heartbeat, the unchanged heartbeats are not written
+        self.__heartbeat: Optional[tuple[int, str]] = None
+
+    def __call__(self, entry: JournalEntry, frame: bytes) -> None:
+        """ Write the journal entry to the file
+
+        :param entry: the journal entry (JournalEntry, mandatory)
+        :param frame: the framed entry (bytes, mandatory)
+        """
+        if entry.kind == "snapshot":
+            self.close()
+            with atomic_writer(self.path) as fh:
+                fh.write(frame)
+            self.__fh = open(self.path, "ab")
+            self.__heartbeat = None
+            return
+        if entry.kind == "heartbeat":
+            if self.__heartbeat == (entry.sequence, entry.payload):
+                return
+            self.__heartbeat = (entry.sequence, entry.payload)
+        if self.__fh is None:
+            raise RuntimeError("The journal file does not start with the snapshot")
+        self.__fh.write(frame)
+        self.__fh.flush()
+
+    def close(self) -> None:
+        """ Close the journal file
+        """
+        if self.__fh is not None:
+            self.__fh.close()
+            self.__fh = None
+
+
+class ReplicationServer:
+    def __init__(self, primary: Primary, host: str = "127.0.0.1", port: int = 0, backlog: int = 10000):
+        """ Initialize the server shipping the journal of the primary address book to the replicas over TCP.
+        Each replica receives the snapshot on connect, the slow replica is disconnected and resynchronized.
+
+        :param primary: the journal of the primary address book (Primary, mandatory)
+        :param host: the local address to listen on (string, optional)
+        :param port: the port to listen on, any free port by default (int, optional)
+        :param backlog: the maximum number of the entries queued for a replica (int, optional)
+        """
+        self.__primary = primary
+        self.__backlog = backlog
+        self.__server: socket.socket = socket.create_server((host, port))
+        self.__connections: list[tuple[socket.socket, queue.Queue, threading.Thread]] = []
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ReplicationServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """ Return the address the server listens on
+
+        :return: the host and the port (tuple)
+        """
+        return self.__server.getsockname()[:2]
+
+    def __accept(self) -> None:
+        """ Private method of the background thread, accepting the replicas until the server is closed
+        """
+        while True:
+            try:
+                connection, _ = self.__server.accept()
+            except OSError:
+                return
+            frames: queue.Queue = queue.Queue(self.__backlog)
+
+            def sink(entry: JournalEntry, frame: bytes, frames: queue.Queue = frames) -> None:
+                try:
+                    frames.put_nowait(frame)
+                except queue.Full:
+                    # Disconnect the slow replica, it reconnects and receives the snapshot
+                    with frames.mutex:
+                        frames.queue.clear()
+                    frames.put_nowait(None)
+                    raise
+
+            # Forget the disconnected replicas
+            self.__connections = [item for item in self.__connections if item[2].is_alive()]
+            thread = threading.Thread(
+                target=self.__ship, args=(connection, frames, sink), name="address-book-replication", daemon=True
+            )
+            self.__connections.append((connection, frames, thread))
+            thread.start()
+            self.__primary.attach(sink)
+
+    def __ship(self, connection: socket.socket, frames: queue.Queue, sink: Callable) -> None:
+        """ Private method of the connection thread, sending the queued frames to the replica
+
+        :param connection: the replica connection (socket, mandatory)
+        :param frames: the queued frames, None stops the thread (Queue, mandatory)
+        :param sink: the sink of the connection, detached when the replica disconnects (Callable, mandatory)
+        """
+        with connection:
+            while (frame := frames.get()) is not None:
+                try:
+                    connection.sendall(frame)
+                except OSError:
+                    break
+        self.__primary.detach(sink)
+
+    def start(self) -> None:
+        """ Start accepting the replicas
+        """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__accept, name="address-book-replication", daemon=True)
+            self.__thread.start()
+
+    def close(self) -> None:
+        """ Stop the server and disconnect the replicas
+        """
+        with suppress(OSError):
+            self.__server.shutdown(socket.SHUT_RDWR)
+        self.__server.close()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        for connection, frames, thread in self.__connections:
+            with suppress(OSError):
+                connection.shutdown(socket.SHUT_RDWR)
+            with suppress(queue.Full):
+                frames.put_nowait(None)
+            thread.join()
+        self.__connections.clear()
+
+
+class Replica:
+    def __init__(
+            self,
+            source: Union[Path, tuple[str, int]],
+            lock: Optional[AbstractContextManager] = None,
+            poll: float = 0.1,
+            timeout: float = 10.0,
+            cache_size: Optional[int] = None,
+    ):
+        """ Initialize the read-only replica, following the journal file or the replication server.
+        The readers hold the lock while they read the address book, the entries are applied holding it too.
+        The replica is resynchronized from the snapshot, if it diverges from the primary.
+
+        :param source: the journal file path or the address of the replication server (Path, tuple, mandatory)
+        :param lock: the lock, which the readers hold while they read the address book (Lock, optional)
+        :param poll: the number of seconds between the checks of the journal file or the reconnects (float, optional)
+        :param timeout: the number of seconds without the entries, after which the server is reconnected
+                        (float, optional)
+        :param cache_size: the maximum number of the contact records kept in memory, all by default (int, optional)
+        """
+        self.__source = source
+        self.lock = lock or threading.RLock()
+        self.__poll = poll
+        self.__timeout = timeout
+        self.__cache_size = cache_size
+        self.__book: AddressBook = AddressBook()
+        # Sequence numbers of the last received and the last applied entries
+        self.__head: int = 0
+        self.__applied: int = 0
+        # Creation times of the received, but not applied mutations entries
+        self.__received: deque[tuple[int, float]] = deque()
+        # Number of the applied snapshots
+        self.__snapshots: int = 0
+        self.__entries: queue.Queue = queue.Queue()
+        self.__applied_changed = threading.Condition()
+        # Set, when the replica waits for the snapshot, the received mutations are skipped
+        self.__resync = threading.Event()
+        self.__resync.set()
+        # Set, when the journal file has to be read again from its snapshot
+        self.__restart = threading.Event()
+        self.__connection: Optional[socket.socket] = None
+        self.__stop = threading.Event()
+        self.__threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "Replica":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def book(self) -> AddressBook:
+        """ Return the replicated address book, which is replaced by each snapshot and must not be changed
+
+        :return: the address book (AddressBook)
+        """
+        return self.__book
+
+    @property
+    def applied(self) -> int:
+        """ Return the sequence number of the last applied entry
+
+        :return: sequence number (int)
+        """
+        return self.__applied
+
+    @property
+    def snapshots(self) -> int:
+        """ Return the number of the applied snapshots, the first one and the resynchronizations
+
+        :return: number of the snapshots (int)
+        """
+        return self.__snapshots
+
+    def lag(self) -> ReplicaLag:
+        """ Return the lag of the replica behind the primary, as it is known by the received entries
+
+        :return: the number of the not applied entries and the age of the oldest of them in seconds (ReplicaLag)
+        """
+        entries: int = max(self.__head - self.__applied, 0)
+        try:
+            created: Optional[float] = self.__received[0][1] if entries else None
+        except IndexError:
+            created = None
+        return ReplicaLag(entries, max(time.time() - created, 0.0) if created is not None else 0.0)
+
+    def wait(self, sequence: int, timeout: Optional[float] = None) -> bool:
+        """ Wait until the entries up to the sequence number are applied
+
+        :param sequence: sequence number (int, mandatory)
+        :param timeout: the maximum number of seconds to wait (float, optional)
+        :return: True if the entries are applied (bool)
+        """
+        with self.__applied_changed:
+            return self.__applied_changed.wait_for(
+                lambda: self.__applied >= sequence and not self.__resync.is_set(), timeout
+            )
+
+    def __follow_file(self, path: Path) -> None:
+        """ Private method for reading the journal file, the file is reopened, when it is replaced by the snapshot
+
+        :param path: the journal file path (Path, mandatory)
+        """
+        fh: Optional[BinaryIO] = None
+        try:
+            while not self.__stop.is_set():
+                if fh is None or self.__restart.is_set():
+                    self.__restart.clear()
+                    if fh is not None:
+                        fh.close()
+                    try:
+                        fh = open(path, "rb")
+                    except FileNotFoundError:
+                        fh = None
+                        self.__stop.wait(self.__poll)
+                        continue
+                position: int = fh.tell()
+                entry: Optional[JournalEntry] = read_entry(fh)
+                if entry is not None:
+                    self.__receive(entry)
+                    continue
+                fh.seek(position)
+                # The file is replaced by the writer of the snapshot
+                with suppress(FileNotFoundError):
+                    if path.stat().st_ino != os.fstat(fh.fileno()).st_ino:
+                        fh.close()
+                        fh = None
+                        continue
+                self.__stop.wait(self.__poll)
+        finally:
+            if fh is not None:
+                fh.close()
+
+    def __follow_server(self, address: tuple[str, int]) -> None:
+        """ Private method for reading the journal from the replication server, the server is reconnected,
+        when the connection is lost or the replica needs the snapshot
+
+        :param address: the address of the replication server (tuple, mandatory)
+        """
+        while not self.__stop.is_set():
+            try:
+                with socket.create_connection(address, timeout=self.__timeout) as connection:
+                    self.__connection = connection
+                    with connection.makefile("rb") as stream:
+                        while not self.__stop.is_set() and (entry := read_entry(stream)) is not None:
+                            self.__receive(entry)
+            except OSError:
+                pass
+            finally:
+                self.__connection = None
+            self.__stop.wait(self.__poll)
+
+    def __receive(self, entry: JournalEntry) -> None:
+        """ Private method for queueing the received entry to be applied
+
+        :param entry: the journal entry (JournalEntry, mandatory)
+        """
+        if entry.kind == "mutations":
+            self.__received.append((entry.sequence, entry.created))
+        self.__head = max(self.__head, entry.sequence) if entry.kind != "snapshot" else entry.sequence
+        self.__entries.put(entry)
+
+    def __apply(self, entry: JournalEntry) -> None:
+        """ Private method for applying the journal entry to the address book
+
+        :param entry: the journal entry (JournalEntry, mandatory)
+        """
+        if entry.kind == "snapshot":
+            book: AddressBook = AddressBook.from_bytes(entry.payload, cache_size=self.__cache_size)
+            with self.lock:
+                self.__book = book
+            self.__snapshots += 1
+            self.__received.clear()
+            self.__resync.clear()
+        elif self.__resync.is_set():
+            return
+        elif entry.kind == "mutations":
+            if entry.sequence != self.__applied + 1:
+                raise ValueError(f"The journal entry {self.__applied + 1} is missing")
+            with self.lock:
+                with self.__book.batch():
+                    for mutation in entry.payload:
+                        self.__book.apply_mutation(pickle.loads(mutation))
+            while self.__received and self.__received[0][0] <= entry.sequence:
+                self.__received.popleft()
+        elif entry.kind == "heartbeat":
+            with self.lock:
+                if entry.sequence == self.__applied and self.__book.digest() != entry.payload:
+                    raise ValueError("The replica differs from the primary")
+        with self.__applied_changed:
+            self.__applied = entry.sequence
+            self.__applied_changed.notify_all()
+
+    def __run(self) -> None:
+        """ Private method of the background thread, applying the received entries until the replica is closed.
+        If the entry can not be applied, the replica is resynchronized from the snapshot.
+        """
+        while (entry := self.__entries.get()) is not None:
+            try:
+                self.__apply(entry)
+            except Exception:
+                self.__resync.set()
+                # Read the file from its snapshot or reconnect to the server to receive it
+                self.__restart.set()
+                if self.__connection is not None:
+                    with suppress(OSError):
+                        self.__connection.shutdown(socket.SHUT_RDWR)
+
+    def start(self) -> None:
+        """ Start following the primary address book
+        """
+        if not self.__threads:
+            self.__stop.clear()
+            follow = (self.__follow_file, self.__follow_server)[isinstance(self.__source, tuple)]
+            self.__threads = [
+                threading.Thread(target=follow, args=(self.__source, ), name="address-book-replica", daemon=True),
+                threading.Thread(target=self.__run, name="address-book-replica", daemon=True),
+            ]
+            for thread in self.__threads:
+                thread.start()
+
+    def close(self) -> None:
+        """ Stop following the primary address book
+        """
+        if self.__threads:
+            self.__stop.set()
+            if self.__connection is not None:
+                with suppress(OSError):
+                    self.__connection.shutdown(socket.SHUT_RDWR)
+            self.__threads[0].join()
+            self.__entries.put(None)
+            self.__threads[1].join()
+            self.__threads = []
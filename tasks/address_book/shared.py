@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Read-only snapshot of the address book in the shared memory, queried by many processes without unpickling
+
+Layout of the snapshot segment (the arrays are in the native byte order of the machine):
+    header:            magic (4s), version (H), flags (H), congratulation range days (I), number of records (I),
+                       number of phones (I), number of birthdays (I), version stamp of the data file (Q)
+    record offsets:    offset of each record (Q), ordered by the caseless key of the contact name, then by the name
+    phone keys:        sorted phone numbers as 64-bit integers (q)
+    phone records:     record number of each phone number (I)
+    birthday keys:     sorted birthdays as month * 100 + day (I)
+    birthday records:  record number of each birthday (I)
+    records:           contact records in the binary data file format, in the order of the record offsets
+The control segment holds the generation of the current snapshot segment, named "<name>-<generation>".
+"""
+
+import re
+import array
+import bisect
+import calendar
+import struct
+import datetime
+import threading
+from typing import Optional
+from contextlib import AbstractContextManager
+from collections.abc import Iterator
+from multiprocessing import shared_memory, resource_tracker
+
+
+from .book import AddressBook, UpcomingBirthday
+from .error import ContactNotFound, ContactNameAmbiguous, ContactPhoneValueError
+from .record import Record
+from .record.record import Phone
+from .index import fold_name
+from .index.birthday import day_ranges
+from .storage import binary
+
+
+MAGIC: bytes = b"ABS\x00"
+VERSION: int = 2
+
+HEADER = struct.Struct("<4sHHIIIIQ")
+CONTROL = struct.Struct("<Q")
+
+
+def _aligned(size: int) -> int:
+    """ Return the size rounded up to 8 bytes, so the arrays of the snapshot are aligned
+
+    :param size: size in bytes (int, mandatory)
+    :return: aligned size in bytes (int)
+    """
+    return (size + 7) & ~7
+
+
+def _sections(count: int, phones: int, birthdays: int) -> tuple[int, int, int, int, int, int]:
+    """ Return the offsets of the snapshot sections
+
+    :param count: number of the records (int, mandatory)
+    :param phones: number of the phone numbers (int, mandatory)
+    :param birthdays: number of the birthdays (int, mandatory)
+    :return: offsets of the record offsets, phone keys, phone records, birthday keys, birthday records
+             and records (tuple of int)
+    """
+    offsets: int = HEADER.size
+    phone_keys: int = offsets + 8 * count
+    phone_records: int = phone_keys + 8 * phones
+    birthday_keys: int = _aligned(phone_records + 4 * phones)
+    birthday_records: int = birthday_keys + 4 * birthdays
+    records: int = _aligned(birthday_records + 4 * birthdays)
+    return offsets, phone_keys, phone_records, birthday_keys, birthday_records, records
+
+
+def encode_snapshot(book: AddressBook) -> bytearray:
+    """ Flatten the contacts and their lookup indexes into the snapshot
+
+    :param book: the address book (AddressBook, mandatory)
+    :return: the snapshot (bytearray)
+    """
+    records = bytearray()
+    offsets = array.array("Q")
+    phones: list[tuple[int, int]] = []
+    birthdays: list[tuple[int, int]] = []
+    # The variants of the name differing by the case or the Unicode normalization form are adjacent
+    for number, name in enumerate(sorted(book.data.keys(), key=lambda name: (fold_name(name), name))):
+        contact: Record = book.data[name]
+        offsets.append(len(records))
+        binary.encode_record(contact, records)
+        phones.extend((int(phone.value), number) for phone in contact.phones)
+        if contact.birthday is not None:
+            date_of_birth: datetime.date = contact.birthday.date_of_birth()
+            birthdays.append((date_of_birth.month * 100 + date_of_birth.day, number))
+    phones.sort()
+    birthdays.sort()
+
+    sections = _sections(len(offsets), len(phones), len(birthdays))
+    # The record offsets are absolute in the snapshot
+    offsets = array.array("Q", (offset + sections[5] for offset in offsets))
+    snapshot = bytearray(sections[5] + len(records))
+    HEADER.pack_into(
+        snapshot, 0, MAGIC, VERSION, 0, book.congratulation_range_days, len(offsets), len(phones), len(birthdays),
+        book.version_stamp,
+    )
+    for start, values in zip(sections, (
+            offsets,
+            array.array("q", (key for key, _ in phones)),
+            array.array("I", (number for _, number in phones)),
+            array.array("I", (key for key, _ in birthdays)),
+            array.array("I", (number for _, number in birthdays)),
+            records,
+    )):
+        data: bytes = values if isinstance(values, bytearray) else values.tobytes()
+        snapshot[start:start + len(data)] = data
+    return snapshot
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """ Attach to the existing shared memory segment without keeping it in the resource tracker,
+    which would remove the segment, when the attached process exits
+
+    :param name: the segment name (string, mandatory)
+    :return: the shared memory segment (SharedMemory)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python before 3.13 always registers the segment, the registration is withdrawn at once
+    memory = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+def _unlink(memory: shared_memory.SharedMemory) -> None:
+    """ Remove the segment created by this process. The segment is registered again first, as the reader forked
+    from this process shares its resource tracker and withdraws the registration, when it attaches.
+
+    :param memory: the shared memory segment (SharedMemory, mandatory)
+    """
+    resource_tracker.register(memory._name, "shared_memory")
+    memory.unlink()
+
+
+class SharedSnapshot:
+    def __init__(self, memory: shared_memory.SharedMemory):
+        """ Initialize the read-only view of the snapshot in the shared memory, nothing is copied
+
+        :param memory: the shared memory segment with the snapshot (SharedMemory, mandatory)
+        """
+        self.__memory = memory
+        self.__view: memoryview = memory.buf
+        magic, version, _, _, count, phones, birthdays, version_stamp = (
+            HEADER.unpack_from(self.__view, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"The shared memory segment \"{memory.name}\" is not the address book snapshot")
+        self.__version_stamp = version_stamp
+        offsets, phone_keys, phone_records, birthday_keys, birthday_records, _ = _sections(count, phones, birthdays)
+        self.__offsets: memoryview = self.__view[offsets:offsets + 8 * count].cast("Q")
+        self.__phone_keys: memoryview = self.__view[phone_keys:phone_keys + 8 * phones].cast("q")
+        self.__phone_records: memoryview = self.__view[phone_records:phone_records + 4 * phones].cast("I")
+        self.__birthday_keys: memoryview = self.__view[birthday_keys:birthday_keys + 4 * birthdays].cast("I")
+        self.__birthday_records: memoryview = self.__view[birthday_records:birthday_records + 4 * birthdays].cast("I")
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedSnapshot":
+        """ Attach to the snapshot published by another process
+
+        :param name: the snapshot segment name (string, mandatory)
+        :return: the snapshot (SharedSnapshot)
+        """
+        return cls(_attach(name))
+
+    def __enter__(self) -> "SharedSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    def __contains__(self, name: str) -> bool:
+        return self.__number(name) is not None
+
+    @property
+    def name(self) -> str:
+        """ Return the name of the snapshot segment
+
+        :return: segment name (string)
+        """
+        return self.__memory.name
+
+    @property
+    def version_stamp(self) -> int:
+        """ Return the version stamp of the data file, as it was when the snapshot was published
+
+        :return: version stamp (int)
+        """
+        return self.__version_stamp
+
+    def __bound(self, key: str, upper: bool) -> int:
+        """ Private method for the binary search of the first record number, which caseless key of the name
+        is not less (or greater, if upper) than the key
+
+        :param key: the caseless key of the name (string, mandatory)
+        :param upper: determines whether to search for the upper bound (bool, mandatory)
+        :return: the record number (int)
+        """
+        low, high = 0, len(self.__offsets)
+        while low < high:
+            middle: int = (low + high) // 2
+            middle_key: str = fold_name(binary.decode_name(self.__view, self.__offsets[middle]))
+            if middle_key < key or upper and middle_key == key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __variants(self, name: str) -> range:
+        """ Private method for returning the record numbers of the contacts, which names differ from the name
+        only by the case or the Unicode normalization form, in O(log n)
+
+        :param name: contact name (string, mandatory)
+        :return: the record numbers (range)
+        """
+        key: str = fold_name(name)
+        return range(self.__bound(key, False), self.__bound(key, True))
+
+    def __number(self, name: str) -> Optional[int]:
+        """ Private method for the search of the record number by the exact contact name
+
+        :param name: contact name (string, mandatory)
+        :return: the record number, None if the contact does not exist (int, optional)
+        """
+        for number in self.__variants(name):
+            if binary.decode_name(self.__view, self.__offsets[number]) == name:
+                return number
+        return None
+
+    def __resolve(self, name: str) -> int:
+        """ Private method for returning the record number of the contact as AddressBook.find does: the exact match,
+        or the only variant differing by the case or the Unicode normalization form
+
+        :param name: contact name (string, mandatory)
+        :return: the record number (int)
+        """
+        variants: range = self.__variants(name)
+        if not variants:
+            raise ContactNotFound()
+        names: list[str] = [binary.decode_name(self.__view, self.__offsets[number]) for number in variants]
+        if name in names:
+            return variants[names.index(name)]
+        if len(variants) > 1:
+            raise ContactNameAmbiguous(name, names)
+        return variants[0]
+
+    def __record(self, number: int) -> Record:
+        """ Private method for decoding the contact record, the record is a copy, not attached to an address book
+
+        :param number: the record number (int, mandatory)
+        :return: contact record (Record)
+        """
+        return binary.decode_record(self.__view, self.__offsets[number])[0]
+
+    def names(self) -> Iterator[str]:
+        """ Return the contact names ordered by their caseless keys
+
+        :return: contact names (Iterator of strings)
+        """
+        for offset in self.__offsets:
+            yield binary.decode_name(self.__view, offset)
+
+    def find(self, name: str) -> Record:
+        """ Search and return the contact record in O(log n), or raise the contact not found exception.
+        The name is case-insensitive and normalization-insensitive, as in AddressBook.find.
+
+        :param name: contact name (string, mandatory)
+        :return: contact record, if found (Record)
+        """
+        return self.__record(self.__resolve(name))
+
+    def __phones_between(self, low: int, high: int, limit: Optional[int]) -> list[tuple[str, Record]]:
+        """ Private method for returning the phone numbers from the low to the high one, inclusive
+
+        :param low: the lowest phone number (int, mandatory)
+        :param high: the highest phone number (int, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contacts, in ascending order (list of tuples)
+        """
+        first: int = bisect.bisect_left(self.__phone_keys, low)
+        last: int = bisect.bisect_right(self.__phone_keys, high)
+        if limit is not None:
+            last = min(last, first + limit)
+        return [
+            (f"{self.__phone_keys[index]:010d}", self.__record(self.__phone_records[index]))
+            for index in range(first, last)
+        ]
+
+    def find_by_phone_prefix(self, prefix: str, limit: Optional[int] = None) -> list[tuple[str, Record]]:
+        """ Return the phone numbers starting with the prefix, for example, the area code, along with the contacts
+
+        :param prefix: phone number prefix, the formatting symbols are ignored (string, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contacts, in ascending order (list of tuples)
+        """
+        # Clear the prefix from formatting symbols and whitespaces
+        prefix = re.sub(Phone.value_clear_pattern, '', prefix or '')
+        if not prefix.isdigit() or len(prefix) > 10:
+            raise ContactPhoneValueError()
+        return self.__phones_between(int(prefix.ljust(10, "0")), int(prefix.ljust(10, "9")), limit)
+
+    def find_by_phone_range(self, low: str, high: str, limit: Optional[int] = None) -> list[tuple[str, Record]]:
+        """ Return the phone numbers from the low to the high one, inclusive, along with the contacts
+
+        :param low: the lowest phone number (string, mandatory)
+        :param high: the highest phone number (string, mandatory)
+        :param limit: maximum number of the phone numbers (int, optional)
+        :return: phone numbers with the contacts, in ascending order (list of tuples)
+        """
+        return self.__phones_between(int(Phone.prepare(low)), int(Phone.prepare(high)), limit)
+
+    def birthdays_between(self, start: datetime.date, end: datetime.date) -> list[UpcomingBirthday]:
+        """Return all contacts whose birthday anniversary is within the dates range, inclusive, ordered by the
+        anniversary, along with the congratulation date, as AddressBook.birthdays_between does
+
+        :param start: the first date of the range (date, mandatory)
+        :param end: the last date of the range (date, mandatory)
+        :return: contacts with the congratulation dates (list of UpcomingBirthday)
+        """
+        if start > end:
+            raise ValueError("The start date of the range must not be after the end date")
+
+        birthdays: list[UpcomingBirthday] = []
+        for first_day, last_day, year in day_ranges(start, end):
+            first: int = bisect.bisect_left(self.__birthday_keys, first_day[0] * 100 + first_day[1])
+            last: int = bisect.bisect_right(self.__birthday_keys, last_day[0] * 100 + last_day[1])
+            for index in range(first, last):
+                contact: Record = self.__record(self.__birthday_records[index])
+                birthdays.append(
+                    UpcomingBirthday(contact, AddressBook.congratulation_day(contact.birthday.birthday(year)))
+                )
+        return birthdays
+
+    def birthdays_in_month(self, month: int, year: Optional[int] = None) -> list[UpcomingBirthday]:
+        """Return all contacts whose birthday anniversary is in the month, along with the congratulation date
+
+        :param month: the month number, from 1 to 12 (int, mandatory)
+        :param year: the year, if not specified, the current year is used (int, optional)
+        :return: contacts with the congratulation dates (list of UpcomingBirthday)
+        """
+        if not 1 <= month <= 12:
+            raise ValueError("The month must be a number from 1 to 12")
+        if year is None:
+            year = datetime.datetime.today().year
+        return self.birthdays_between(
+            datetime.date(year, month, 1),
+            datetime.date(year, month, calendar.monthrange(year, month)[1]),
+        )
+
+    def close(self) -> None:
+        """ Detach from the snapshot, the records found before remain valid
+        """
+        for view in (
+                self.__offsets, self.__phone_keys, self.__phone_records, self.__birthday_keys, self.__birthday_records,
+        ):
+            view.release()
+        self.__view.release()
+        self.__memory.close()
+
+
+class SharedPublisher:
+    def __init__(self, book: AddressBook, name: str, lock: Optional[AbstractContextManager] = None):
+        """ Initialize the publisher of the address book snapshots into the shared memory.
+        The users hold the lock while they change the address book, it is held while the snapshot is encoded.
+
+        :param book: the address book (AddressBook, mandatory)
+        :param name: the name of the control segment, which the readers attach to (string, mandatory)
+        :param lock: the lock, which the users hold while they change the address book (Lock, optional)
+        """
+        self.__book = book
+        self.lock = lock or threading.RLock()
+        self.__name = name
+        self.__control = shared_memory.SharedMemory(name=name, create=True, size=CONTROL.size)
+        CONTROL.pack_into(self.__control.buf, 0, 0)
+        self.__generation: int = 0
+        self.__segment: Optional[shared_memory.SharedMemory] = None
+        # Version stamp of the published address book, None if nothing is published
+        self.__published: Optional[int] = None
+
+    def __enter__(self) -> "SharedPublisher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def name(self) -> str:
+        """ Return the name of the control segment
+
+        :return: segment name (string)
+        """
+        return self.__name
+
+    def publish(self) -> str:
+        """ Publish the snapshot of the address book, replacing the previous one. The readers swap to the new
+        snapshot by their next refresh, the previous one is removed, when all the readers detach from it.
+
+        :return: the snapshot segment name (string)
+        """
+        with self.lock:
+            snapshot: bytearray = encode_snapshot(self.__book)
+            version_stamp: int = self.__book.version_stamp
+        generation: int = self.__generation + 1
+        segment = shared_memory.SharedMemory(
+            name=f"{self.__name}-{generation}", create=True, size=max(len(snapshot), 1)
+        )
+        segment.buf[:len(snapshot)] = snapshot
+        CONTROL.pack_into(self.__control.buf, 0, generation)
+        self.__generation = generation
+        self.__release()
+        self.__segment = segment
+        self.__published = version_stamp
+        return segment.name
+
+    def refresh(self) -> bool:
+        """ Publish the snapshot, if the address book has been saved since the last one, for example,
+        after each save
+
+        :return: True if the snapshot is published (bool)
+        """
+        if self.__published == self.__book.version_stamp:
+            return False
+        self.publish()
+        return True
+
+    def __release(self) -> None:
+        """ Private method for removing the published snapshot segment
+        """
+        if self.__segment is not None:
+            self.__segment.close()
+            _unlink(self.__segment)
+            self.__segment = None
+
+    def close(self) -> None:
+        """ Remove the published snapshot and the control segment
+        """
+        self.__release()
+        self.__control.close()
+        _unlink(self.__control)
+
+
+class SharedReader:
+    def __init__(self, name: str):
+        """ Initialize the reader of the snapshots published by SharedPublisher
+
+        :param name: the name of the control segment (string, mandatory)
+        """
+        self.__control = _attach(name)
+        self.__generation: int = 0
+        self.__snapshot: Optional[SharedSnapshot] = None
+
+    def __enter__(self) -> "SharedReader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def snapshot(self) -> Optional[SharedSnapshot]:
+        """ Return the latest published snapshot, swapping to it if needed. The previous snapshot is closed,
+        so it must not be used after the swap.
+
+        :return: the snapshot, None if nothing is published yet (SharedSnapshot, optional)
+        """
+        self.refresh()
+        return self.__snapshot
+
+    def refresh(self) -> bool:
+        """ Swap to the latest published snapshot
+
+        :return: True if the reader is swapped to the new snapshot (bool)
+        """
+        (generation, ) = CONTROL.unpack_from(self.__control.buf, 0)
+        if generation == self.__generation:
+            return False
+        try:
+            snapshot: SharedSnapshot = SharedSnapshot.attach(f"{self.__control.name}-{generation}")
+        except FileNotFoundError:
+            # The snapshot is replaced meanwhile, the next refresh swaps to the newer one
+            return False
+        if self.__snapshot is not None:
+            self.__snapshot.close()
+        self.__snapshot = snapshot
+        self.__generation = generation
+        return True
+
+    def close(self) -> None:
+        """ Detach from the snapshot and the control segment
+        """
+        if self.__snapshot is not None:
+            self.__snapshot.close()
+            self.__snapshot = None
+        self.__control.close()
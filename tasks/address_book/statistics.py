@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Incrementally maintained statistics of the address book
+"""
+
+from typing import Optional
+from collections import Counter
+from collections.abc import Iterable
+
+
+from .mutation import Mutation
+from .record import Record
+
+
+class BookStatistics:
+    def __init__(self, contacts: Optional[Iterable[Record]] = None):
+        """ Initialize the statistics of the given contacts
+
+        :param contacts: the contact records (Iterable of Record, optional)
+        """
+        self.contacts: int = 0
+        self.with_birthday: int = 0
+        # Number of contacts by the birth month
+        self.by_birth_month: Counter[int] = Counter()
+        # Number of emails by the email domain
+        self.by_email_domain: Counter[str] = Counter()
+        # Number of contacts by the number of their phones
+        self.phones_per_contact: Counter[int] = Counter()
+        for contact in contacts or []:
+            self.__add_contact(contact, 1)
+
+    @property
+    def without_birthday(self) -> int:
+        """ Return the number of contacts without a birthday
+
+        :return: number of contacts (int)
+        """
+        return self.contacts - self.with_birthday
+
+    @staticmethod
+    def __domain(email: str) -> str:
+        """ Private method for extracting the email domain
+
+        :param email: email (string, mandatory)
+        :return: lower-case domain (string)
+        """
+        return email.rpartition("@")[2].lower()
+
+    def __count_birthday(self, month: int, sign: int) -> None:
+        """ Private method for counting the birthday in or out
+
+        :param month: the birth month (int, mandatory)
+        :param sign: 1 to count in, -1 to count out (int, mandatory)
+        """
+        self.with_birthday += sign
+        self.by_birth_month[month] += sign
+        if not self.by_birth_month[month]:
+            del self.by_birth_month[month]
+
+    def __count_email(self, email: str, sign: int) -> None:
+        """ Private method for counting the email in or out
+
+        :param email: email (string, mandatory)
+        :param sign: 1 to count in, -1 to count out (int, mandatory)
+        """
+        domain: str = self.__domain(email)
+        self.by_email_domain[domain] += sign
+        if not self.by_email_domain[domain]:
+            del self.by_email_domain[domain]
+
+    def __count_phones(self, phones: int, sign: int) -> None:
+        """ Private method for counting the contact with the number of phones in or out
+
+        :param phones: number of the contact phones (int, mandatory)
+        :param sign: 1 to count in, -1 to count out (int, mandatory)
+        """
+        self.phones_per_contact[phones] += sign
+        if not self.phones_per_contact[phones]:
+            del self.phones_per_contact[phones]
+
+    def __add_contact(self, contact: Record, sign: int) -> None:
+        """ Private method for counting the whole contact in or out
+
+        :param contact: the contact record (Record, mandatory)
+        :param sign: 1 to count in, -1 to count out (int, mandatory)
+        """
+        self.contacts += sign
+        if contact.birthday is not None:
+            self.__count_birthday(contact.birthday.date_of_birth().month, sign)
+        for email in contact.emails:
+            self.__count_email(email.value, sign)
+        self.__count_phones(contact.phone_count, sign)
+
+    def add(self, contact: Record) -> None:
+        """ Count the contact in, for example, the contact loaded from the data file
+
+        :param contact: the contact record (Record, mandatory)
+        """
+        self.__add_contact(contact, 1)
+
+    def update(self, mutation: Mutation, contact: Optional[Record]) -> None:
+        """ Update the statistics by the applied mutation
+
+        :param mutation: the applied mutation (Mutation, mandatory)
+        :param contact: the changed contact record, None for the deleted one (Record, optional)
+        """
+        if mutation.operation == "add_record":
+            self.__add_contact(mutation.after, 1)
+        elif mutation.operation == "delete_record":
+            self.__add_contact(mutation.before, -1)
+        elif mutation.operation in {"edit_birthday", "remove_birthday", }:
+            if mutation.before is not None:
+                self.__count_birthday(mutation.before.month, -1)
+            if mutation.after is not None:
+                self.__count_birthday(mutation.after.month, 1)
+        elif mutation.operation in {"add_email", "remove_email", "edit_email", }:
+            if mutation.before is not None:
+                self.__count_email(mutation.before, -1)
+            if mutation.after is not None:
+                self.__count_email(mutation.after, 1)
+        elif mutation.operation in {"add_phone", "remove_phone", }:
+            # The contact already has the new number of phones
+            phones: int = contact.phone_count
+            previous: int = phones - 1 if mutation.operation == "add_phone" else phones + 1
+            self.__count_phones(previous, -1)
+            self.__count_phones(phones, 1)
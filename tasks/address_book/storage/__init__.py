@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-"
+
+__title__ = 'Address book storage'
+__author__ = 'Roman'
+
+
+from .compression import CODECS, verify_codec, detect_codec, compressed_writer, decompressed_reader
+from .formats import FORMATS, verify_format
+from .locking import file_lock
+from .atomic import atomic_writer
+from . import binary
+
+__all__ = [
+    'CODECS',
+    'FORMATS',
+    'verify_codec',
+    'verify_format',
+    'detect_codec',
+    'compressed_writer',
+    'decompressed_reader',
+    'file_lock',
+    'atomic_writer',
+    'binary',
+]
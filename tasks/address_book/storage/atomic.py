@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Atomic replacement of the address book data file
+"""
+
+import os
+import stat
+import tempfile
+from typing import BinaryIO
+from contextlib import contextmanager, suppress
+from collections.abc import Iterator
+from pathlib import Path
+
+
+def _fsync_directory(directory: Path) -> None:
+    """ Flush the directory entry changes, for example, the rename, to disk. Not supported on Windows.
+
+    :param directory: the directory path (Path, mandatory)
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd: int = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """ Context manager that returns a temporary file in the same directory, which replaces the file on success.
+    The data is flushed to disk before the rename, so the readers and a crash leave either the previous
+    or the new content, but never a partially written one. On failure the temporary file is removed.
+
+    :param path: the file path (Path, mandatory)
+    :return: binary file opened for writing (BinaryIO)
+    """
+    # Make the directory if it does not exist
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            yield fh
+            fh.flush()
+            os.fsync(fh.fileno())
+        # Keep the permissions of the replaced file
+        with suppress(FileNotFoundError):
+            os.chmod(temp_name, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(temp_name, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp_name)
+        raise
+    _fsync_directory(path.parent)
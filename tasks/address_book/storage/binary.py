@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Schema-versioned compact binary format of the address book data file
+
+Layout (little-endian):
+    header:  magic (4s), version (H), flags (H), congratulation range days (I), number of records (I),
+             version stamp of the data file (Q), since version 2
+    record:  name length (I), birthday ordinal day or 0 (i), number of phones (H), number of emails (H),
+             UTF-8 name, phones as 64-bit integers (q), emails as length (H) prefixed UTF-8 strings
+"""
+
+import struct
+import datetime
+from typing import BinaryIO
+from collections.abc import Iterable, Iterator
+
+
+from ..error import AddressBookDataFileWrongFormat
+from ..record import Record
+
+
+MAGIC: bytes = b"ABK\x00"
+VERSION: int = 2
+
+HEADER = struct.Struct("<4sHHII")
+STAMP = struct.Struct("<Q")
+RECORD = struct.Struct("<IiHH")
+STRING_LENGTH = struct.Struct("<H")
+NAME_LENGTH = struct.Struct("<I")
+
+# Number of records encoded before flushing the buffer to the stream
+FLUSH_RECORDS: int = 1024
+
+
+def is_binary(header: bytes) -> bool:
+    """ Check whether the data file is in the binary format by its first bytes
+
+    :param header: first bytes of the data file (bytes, mandatory)
+    :return: True, if the data file is in the binary format (bool)
+    """
+    return header[:len(MAGIC)] == MAGIC
+
+
+def encode_record(record: Record, buffer: bytearray) -> None:
+    """ Append the encoded contact record to the buffer
+
+    :param record: contact record (Record, mandatory)
+    :param buffer: the buffer (bytearray, mandatory)
+    """
+    name: bytes = str(record.name).encode("utf-8")
+    phones: list[int] = [int(phone.value) for phone in record.phones]
+    emails: list[bytes] = [str(email).encode("utf-8") for email in record.emails]
+
+    buffer += RECORD.pack(
+        len(name),
+        record.birthday.date_of_birth().toordinal() if record.birthday is not None else 0,
+        len(phones),
+        len(emails),
+    )
+    buffer += name
+    if phones:
+        buffer += struct.pack(f"<{len(phones)}q", *phones)
+    for email in emails:
+        buffer += STRING_LENGTH.pack(len(email))
+        buffer += email
+
+
+def dump(
+        records: Iterable[Record],
+        count: int,
+        congratulation_range_days: int,
+        stream: BinaryIO,
+        version_stamp: int = 0,
+) -> None:
+    """ Write the contact records to the binary stream
+
+    :param records: contact records (iterable of Record, mandatory)
+    :param count: number of the contact records (int, mandatory)
+    :param congratulation_range_days: the birthday congratulations days range (int, mandatory)
+    :param stream: binary stream opened for writing (BinaryIO, mandatory)
+    :param version_stamp: version stamp of the data file, incremented by each save (int, optional)
+    """
+    stream.write(HEADER.pack(MAGIC, VERSION, 0, congratulation_range_days, count))
+    stream.write(STAMP.pack(version_stamp))
+
+    buffer = bytearray()
+    for index, record in enumerate(records, start=1):
+        encode_record(record, buffer)
+
+        # Flush the encoded records, keeping the buffer small
+        if index % FLUSH_RECORDS == 0:
+            stream.write(buffer)
+            buffer.clear()
+
+    stream.write(buffer)
+
+
+def header(view: memoryview) -> tuple[int, int, int]:
+    """ Read and verify the header of the binary data
+
+    :param view: binary data (memoryview, mandatory)
+    :return: version, congratulation range days and number of records (tuple of int)
+    """
+    try:
+        magic, version, _, congratulation_range_days, count = HEADER.unpack_from(view, 0)
+    except struct.error:
+        raise AddressBookDataFileWrongFormat("<binary>")
+    if magic != MAGIC or not 1 <= version <= VERSION:
+        raise AddressBookDataFileWrongFormat("<binary>")
+    return version, congratulation_range_days, count
+
+
+def stamp(view: memoryview) -> int:
+    """ Read the version stamp of the binary data, the data written before version 2 has the stamp 0
+
+    :param view: binary data, at least the header (memoryview, mandatory)
+    :return: version stamp (int)
+    """
+    version, _, _ = header(view)
+    if version < 2:
+        return 0
+    try:
+        return STAMP.unpack_from(view, HEADER.size)[0]
+    except struct.error:
+        raise AddressBookDataFileWrongFormat("<binary>")
+
+
+def header_size(version: int) -> int:
+    """ Return the size of the header of the binary data version
+
+    :param version: the binary data version (int, mandatory)
+    :return: size in bytes (int)
+    """
+    return HEADER.size + (STAMP.size if version >= 2 else 0)
+
+
+def load(view: memoryview) -> Iterator[Record]:
+    """ Decode the contact records from the binary data without intermediate copies
+
+    :param view: binary data, for example a memory-mapped data file (memoryview, mandatory)
+    :return: contact records (Iterator of Record)
+    """
+    version, _, count = header(view)
+
+    offset: int = header_size(version)
+    for _ in range(count):
+        record, offset = decode_record(view, offset)
+        yield record
+
+
+def decode_name(view: memoryview, offset: int) -> str:
+    """ Decode only the name of the contact record
+
+    :param view: binary data (memoryview, mandatory)
+    :param offset: offset of the contact record (int, mandatory)
+    :return: contact name (string)
+    """
+    (name_length, ) = NAME_LENGTH.unpack_from(view, offset)
+    return str(view[offset + RECORD.size:offset + RECORD.size + name_length], "utf-8")
+
+
+def decode_record(view: memoryview, offset: int) -> tuple[Record, int]:
+    """ Decode the contact record
+
+    :param view: binary data (memoryview, mandatory)
+    :param offset: offset of the contact record (int, mandatory)
+    :return: the contact record and the offset of the next one (tuple)
+    """
+    name_length, birthday, phones_count, emails_count = RECORD.unpack_from(view, offset)
+    offset += RECORD.size
+
+    name: str = str(view[offset:offset + name_length], "utf-8")
+    offset += name_length
+
+    phones: list[str] = []
+    if phones_count:
+        phones = [f"{phone:010d}" for phone in struct.unpack_from(f"<{phones_count}q", view, offset)]
+        offset += 8 * phones_count
+
+    emails: list[str] = []
+    for _ in range(emails_count):
+        (email_length, ) = STRING_LENGTH.unpack_from(view, offset)
+        offset += STRING_LENGTH.size
+        emails.append(str(view[offset:offset + email_length], "utf-8"))
+        offset += email_length
+
+    return Record.restore(name, datetime.date.fromordinal(birthday) if birthday else None, phones, emails), offset
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Streaming compression codecs for the address book data file
+"""
+
+import io
+import bz2
+import lzma
+import zlib
+from typing import BinaryIO, Optional
+from contextlib import contextmanager
+from collections.abc import Iterator
+
+
+from ..error import AddressBookCodecNotSupported
+
+
+# Supported compression codecs, "none" means the data file is written uncompressed
+CODECS: tuple[str, ...] = ("none", "zlib", "bz2", "lzma", )
+
+# Size of the chunks read from the underlying file
+CHUNK_SIZE: int = 64 * 1024
+
+
+class _ZlibWriter(io.RawIOBase):
+    def __init__(self, fh: BinaryIO, level: int = 6):
+        """ Initialize the streaming zlib compressor over the given binary file
+
+        :param fh: binary file opened for writing (BinaryIO, mandatory)
+        :param level: compression level (int, optional)
+        """
+        super().__init__()
+        self.__fh = fh
+        self.__compressor = zlib.compressobj(level)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.__fh.write(self.__compressor.compress(data))
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            # Write the rest of the compressed stream
+            self.__fh.write(self.__compressor.flush())
+        super().close()
+
+
+class _ZlibReader(io.RawIOBase):
+    def __init__(self, fh: BinaryIO):
+        """ Initialize the streaming zlib decompressor over the given binary file
+
+        :param fh: binary file opened for reading (BinaryIO, mandatory)
+        """
+        super().__init__()
+        self.__fh = fh
+        self.__decompressor = zlib.decompressobj()
+        self.__buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # Decompress the next portion of data, limited by the chunk size, if the buffer is exhausted
+        while not self.__buffer:
+            if self.__decompressor.eof:
+                return 0
+            data: bytes = self.__decompressor.unconsumed_tail or self.__fh.read(CHUNK_SIZE)
+            if not data:
+                raise EOFError("Compressed data ended before the end-of-stream marker was reached")
+            self.__buffer = self.__decompressor.decompress(data, CHUNK_SIZE)
+
+        size: int = min(len(buffer), len(self.__buffer))
+        buffer[:size] = self.__buffer[:size]
+        self.__buffer = self.__buffer[size:]
+        return size
+
+
+def verify_codec(codec: Optional[str]) -> str:
+    """ Verify and return the codec name, or raise the codec not supported exception
+
+    :param codec: codec name, None means "none" (string, optional)
+    :return: codec name (string)
+    """
+    codec = (codec or "none").strip().lower()
+    if codec not in CODECS:
+        raise AddressBookCodecNotSupported(codec)
+    return codec
+
+
+def detect_codec(header: bytes) -> str:
+    """ Detect the codec by the first bytes of the data file
+
+    :param header: first bytes of the data file, at least six (bytes, mandatory)
+    :return: codec name (string)
+    """
+    if header.startswith(b"BZh"):
+        return "bz2"
+    if header.startswith(b"\xfd7zXZ\x00"):
+        return "lzma"
+    # zlib header: the deflate method with a valid check sum of the first two bytes
+    if len(header) >= 2 and header[0] & 0x0f == 8 and (header[0] << 8 | header[1]) % 31 == 0:
+        return "zlib"
+    return "none"
+
+
+@contextmanager
+def compressed_writer(fh: BinaryIO, codec: Optional[str]) -> Iterator[BinaryIO]:
+    """ Context manager that returns a stream compressing everything written to the given binary file
+
+    :param fh: binary file opened for writing (BinaryIO, mandatory)
+    :param codec: codec name (string, optional)
+    :return: binary stream for writing (BinaryIO)
+    """
+    codec = verify_codec(codec)
+    if codec == "none":
+        yield fh
+        return
+
+    if codec == "zlib":
+        stream = io.BufferedWriter(_ZlibWriter(fh), buffer_size=CHUNK_SIZE)
+    elif codec == "bz2":
+        stream = bz2.BZ2File(fh, "wb")
+    else:
+        stream = lzma.LZMAFile(fh, "wb")
+    with stream:
+        yield stream
+
+
+@contextmanager
+def decompressed_reader(fh: BinaryIO) -> Iterator[tuple[BinaryIO, str]]:
+    """ Context manager that detects the codec and returns a stream decompressing the given binary file
+
+    :param fh: binary file opened for reading (BinaryIO, mandatory)
+    :return: binary stream for reading and the detected codec name (tuple)
+    """
+    # Peek the header without consuming it
+    reader = fh if isinstance(fh, io.BufferedReader) else io.BufferedReader(fh, buffer_size=CHUNK_SIZE)
+    codec: str = detect_codec(reader.peek(6)[:6])
+    if codec == "none":
+        yield reader, codec
+        return
+
+    if codec == "zlib":
+        stream = io.BufferedReader(_ZlibReader(reader), buffer_size=CHUNK_SIZE)
+    elif codec == "bz2":
+        stream = bz2.BZ2File(reader, "rb")
+    else:
+        stream = lzma.LZMAFile(reader, "rb")
+    with stream:
+        yield stream, codec
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Address book data file formats
+"""
+
+from typing import Optional
+
+
+from ..error import AddressBookFormatNotSupported
+
+
+# Supported data file formats: the compact binary format and the generic pickle
+FORMATS: tuple[str, ...] = ("binary", "pickle", )
+
+
+def verify_format(file_format: Optional[str]) -> str:
+    """ Verify and return the data file format name, or raise the format not supported exception
+
+    :param file_format: format name, None means "binary" (string, optional)
+    :return: format name (string)
+    """
+    file_format = (file_format or "binary").strip().lower()
+    if file_format not in FORMATS:
+        raise AddressBookFormatNotSupported(file_format)
+    return file_format
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Advisory inter-process locking of the address book data file
+"""
+
+from pathlib import Path
+from contextlib import contextmanager
+from collections.abc import Iterator
+
+try:
+    import fcntl
+except ImportError:
+    # Windows does not have fcntl, msvcrt supports only the exclusive locks
+    fcntl = None
+    import msvcrt
+
+
+def lock_path(datafile: Path) -> Path:
+    """ Return the lock file path of the data file. The data file itself is not locked, as it is rewritten on save.
+
+    :param datafile: the data file path (Path, mandatory)
+    :return: the lock file path (Path)
+    """
+    return datafile.with_name(f"{datafile.name}.lock")
+
+
+@contextmanager
+def file_lock(datafile: Path, exclusive: bool = True) -> Iterator[None]:
+    """ Hold the advisory lock of the data file, waiting until it is released by other processes
+
+    :param datafile: the data file path (Path, mandatory)
+    :param exclusive: True for the writer's exclusive lock, False for the readers' shared lock (bool, optional)
+    """
+    path: Path = lock_path(datafile)
+    # Make the data directory if it does not exist
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
@@ -4,22 +4,62 @@
 Core functions for contacts bot
 """
 
+import os
+import re
 import signal
+import calendar
+import datetime
 import functools
 from typing import Optional, Any, Callable
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
+from collections import defaultdict
 from pathlib import Path
 
 
 from .cutil import console_style_reset, print_error, print_welcome, print_exit, print_help, print_colored
 from .cutil import ERROR_TEXT_COLOR
 from .futil import get_absolute_path
-from .address_book import AddressBook, Record
-from .address_book.error import ContactNotFound, AddressBookDataFileNotFound, AddressBookDataFileWrongFormat
+from .putil import SessionProfiler
+from .address_book import AddressBook, Record, BookManager
+from .address_book.query import (
+    Predicate,
+    And,
+    Or,
+    NameIs,
+    NameContains,
+    PhonePrefix,
+    EmailIs,
+    EmailDomain,
+    BirthdayBetween,
+    BirthdayInMonth,
+    HasField,
+)
+from .address_book.error import (
+    ContactNotFound,
+    AddressBookDataFileNotFound,
+    AddressBookDataFileWrongFormat,
+    AddressBookTenantValueError,
+    AddressBookSaveError,
+)
 from .contacts_bot_help import CONTACTS_BOT_HELP
 
 
 CONTACTS_FILE: Path = get_absolute_path(Path(__file__).parent / "__data__" / "addressbook.pkl")
+# Environment variable that enables the profiling of the whole bot session
+PROFILE_ENV_VARIABLE: str = "CONTACTS_BOT_PROFILE"
+# Environment variable that selects the data file compression codec: none, zlib, bz2 or lzma
+CODEC_ENV_VARIABLE: str = "CONTACTS_BOT_CODEC"
+# Environment variable that selects the data file format: binary or pickle
+FORMAT_ENV_VARIABLE: str = "CONTACTS_BOT_FORMAT"
+# Environment variable that limits the number of the contacts kept in memory, the other ones are kept in a dbm file
+CACHE_SIZE_ENV_VARIABLE: str = "CONTACTS_BOT_CACHE_SIZE"
+# Environment variables that set the number of seconds and the number of changes between the background saves
+AUTOSAVE_INTERVAL_ENV_VARIABLE: str = "CONTACTS_BOT_AUTOSAVE_INTERVAL"
+AUTOSAVE_MUTATIONS_ENV_VARIABLE: str = "CONTACTS_BOT_AUTOSAVE_MUTATIONS"
+# Environment variable that selects the tenant, whose address book is used at the start
+TENANT_ENV_VARIABLE: str = "CONTACTS_BOT_TENANT"
+# The address book of the default tenant is the CONTACTS_FILE, the other tenants' data files are next to it
+DEFAULT_TENANT: str = CONTACTS_FILE.stem
 
 
 def exit_by_terminate_by_signals(number: int, stack: Any) -> None:
@@ -37,13 +77,22 @@ def contacts_bot_data():
     """
 
     print_welcome("Welcome to the assistant bot!")
-    # Read the address book from a file or create a new one, if the file does not exist
-    book = AddressBook.load(CONTACTS_FILE)
+    # The address books are read from the files on demand, or created, if the file does not exist
+    books = BookManager(
+        CONTACTS_FILE.parent,
+        codec=os.environ.get(CODEC_ENV_VARIABLE),
+        file_format=os.environ.get(FORMAT_ENV_VARIABLE),
+        cache_size=int(os.environ.get(CACHE_SIZE_ENV_VARIABLE) or 0) or None,
+        interval=float(os.environ.get(AUTOSAVE_INTERVAL_ENV_VARIABLE) or 30),
+        mutations=int(os.environ.get(AUTOSAVE_MUTATIONS_ENV_VARIABLE) or 100),
+    )
+    # The changed address books are saved in the background, so a crash loses only the latest changes
+    books.start()
     try:
-        yield book
+        yield books
     finally:
-        # Write the address book to a file
-        book.save()
+        # Write the changed address books to the files
+        books.close()
         print_exit("Good bye!")
 
 
@@ -103,7 +152,7 @@ def show_all(args: list[str], book: AddressBook) -> str:
     :return contacts as string (string)
     """
 
-    return "\n".join([f"{contact}" for contact in book.values()]) or "The address book is empty."
+    return "\n".join(book.rendered_lines()) or "The address book is empty."
 
 
 @input_error(index_error_message="Give me the name, please.")
@@ -274,6 +323,56 @@ def show_contact_birthday(args: list[str], book: AddressBook) -> str:
     return str(contact.birthday) if contact.birthday is not None else "The contact does not have a date of birth."
 
 
+def format_birthdays_by_days(birthdays: dict[datetime.date, list[Record]]) -> str:
+    """Return the contacts grouped by the congratulation date as string
+
+    :param birthdays: contacts grouped by the congratulation date (dictionary, mandatory)
+    :return contacts grouped by date (string)
+    """
+
+    birthdays_text: str = ""
+    # Add all the birthdays grouped by days
+    for congratulation_date, records in birthdays.items():
+        birthdays_text += "\n" + 3 * "-" + "\n"
+        birthdays_text += congratulation_date.strftime("%d.%m.%Y")
+        birthdays_text += "\n"
+        birthdays_text += "\n".join([str(record) for record in records])
+    if birthdays_text:
+        birthdays_text += "\n" + 3 * "-" + "\n"
+
+    return birthdays_text
+
+
+def group_birthdays_by_days(birthdays: list[tuple[Record, datetime.date]]) -> dict[datetime.date, list[Record]]:
+    """Group the contacts by the congratulation date
+
+    :param birthdays: contacts with the congratulation dates (list of tuples, mandatory)
+    :return contacts grouped by the congratulation date, sorted by date (dictionary)
+    """
+
+    birthdays_by_days: dict[datetime.date, list[Record]] = defaultdict(list)
+    for record, congratulation_date in birthdays:
+        birthdays_by_days[congratulation_date].append(record)
+    return dict(sorted(birthdays_by_days.items()))
+
+
+def parse_day_month(value: str, year: int) -> datetime.date:
+    """Parse the day and month in "DD.MM" format to the date of the given year.
+    February 29 is moved to March 1 in a non-leap year.
+
+    :param value: day and month (string, mandatory)
+    :param year: year (int, mandatory)
+    :return date (date)
+    """
+
+    try:
+        return datetime.datetime.strptime(f"{value}.{year}", "%d.%m.%Y").date()
+    except ValueError:
+        if value.strip() in {"29.02", "29.2", }:
+            return datetime.date(year, 3, 1)
+        raise ValueError("The date must be in \"DD.MM\" format")
+
+
 def show_upcoming_birthdays(args: list[str], book: AddressBook) -> str:
     """Return all contacts whose birthday is within the next week, including today, grouped by date
 
@@ -282,17 +381,300 @@ def show_upcoming_birthdays(args: list[str], book: AddressBook) -> str:
     :return contacts whose birthday is within the next period (string)
     """
 
-    upcoming_birthdays_text: str = ""
-    # Add all the upcoming birthdays grouped by days
-    for congratulation_date, records in book.upcoming_birthdays_by_days().items():
-        upcoming_birthdays_text += "\n" + 3 * "-" + "\n"
-        upcoming_birthdays_text += congratulation_date.strftime("%d.%m.%Y")
-        upcoming_birthdays_text += "\n"
-        upcoming_birthdays_text += "\n".join([str(record) for record in records])
-    if upcoming_birthdays_text:
-        upcoming_birthdays_text += "\n" + 3 * "-" + "\n"
+    return format_birthdays_by_days(book.upcoming_birthdays_by_days()) or "There are currently no upcoming birthdays."
+
+
+@input_error(index_error_message="Give me the first and the last day of the range in \"DD.MM\" format, please.")
+def show_birthdays_between(args: list[str], book: AddressBook) -> str:
+    """Return all contacts whose birthday is within the range of days, grouped by date.
+    The range starts in the current year and can wrap around the year.
+
+    :param args: arguments with the first and the last day of the range (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return contacts whose birthday is within the range (string)
+    """
+
+    # Verify the number of arguments
+    if len(args) < 2:
+        raise IndexError("Invalid command arguments")
+
+    # Unpack the arguments to the first and the last day
+    first_day, last_day, *_ = args
+
+    year: int = datetime.datetime.today().year
+    start: datetime.date = parse_day_month(first_day, year)
+    end: datetime.date = parse_day_month(last_day, year)
+    if end < start:
+        # The range wraps around the year
+        end = parse_day_month(last_day, year + 1)
+
+    return format_birthdays_by_days(
+        group_birthdays_by_days(book.birthdays_between(start, end))
+    ) or "There are no birthdays within the range."
+
+
+@input_error(
+    index_error_message="Give me the month number, please.",
+    value_error_message="The month must be a number from 1 to 12.",
+)
+def show_birthdays_in_month(args: list[str], book: AddressBook) -> str:
+    """Return all contacts whose birthday is in the month of the current year, grouped by date
+
+    :param args: arguments with the month number (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return contacts whose birthday is in the month (string)
+    """
+
+    # Verify the number of arguments
+    if len(args) < 1:
+        raise IndexError("Invalid command arguments")
+
+    # Unpack the arguments to the month
+    month, *_ = args
+
+    return format_birthdays_by_days(
+        group_birthdays_by_days(book.birthdays_in_month(int(month)))
+    ) or "There are no birthdays in the month."
+
+
+@input_error(
+    index_error_message="Give me the phone number prefix, please.",
+    value_error_message="The phone number prefix must consist of digits and the limit must be a number.",
+)
+def show_phones_by_prefix(args: list[str], book: AddressBook) -> str:
+    """Return the phone numbers starting with the prefix along with the contact names
+
+    :param args: arguments with the prefix and the optional limit (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return phone numbers with the contact names (string)
+    """
+
+    # Verify the number of arguments
+    if len(args) < 1:
+        raise IndexError("Invalid command arguments")
+
+    # Unpack the arguments to the prefix and the limit
+    prefix, *rest = args
+    limit: Optional[int] = int(rest[0]) if rest else None
 
-    return upcoming_birthdays_text or "There are currently no upcoming birthdays."
+    return "\n".join(
+        f"{phone}: {contact.name}" for phone, contact in book.find_by_phone_prefix(prefix, limit=limit)
+    ) or "There are no phone numbers with the prefix."
+
+
+def parse_query_term(term: str) -> Predicate:
+    """Parse the term of the query filter: name:<name>, name~<text>, phone:<prefix>, email:<email>,
+    domain:<domain>, month:<month>, birthday:<DD.MM>..<DD.MM> or has:<phone|email|birthday>,
+    "-" before the term negates it
+
+    :param term: the term (string, mandatory)
+    :return the condition (Predicate)
+    """
+
+    if term.startswith("-") and len(term) > 1:
+        return ~parse_query_term(term[1:])
+
+    match = re.fullmatch(r"(\w+)([:~])(.+)", term)
+    if match is None:
+        raise ValueError(f"Unknown query filter \"{term}\"")
+    field, operator, value = match.groups()
+    field = field.lower()
+
+    if field == "name":
+        return NameIs(value) if operator == ":" else NameContains(value)
+    elif operator != ":":
+        raise ValueError(f"Unknown query filter \"{term}\"")
+    elif field == "phone":
+        return PhonePrefix(value)
+    elif field == "email":
+        return EmailIs(value)
+    elif field == "domain":
+        return EmailDomain(value)
+    elif field == "month":
+        return BirthdayInMonth(int(value))
+    elif field == "birthday":
+        # The range starts in the current year and can wrap around the year
+        first_day, _, last_day = value.partition("..")
+        year: int = datetime.datetime.today().year
+        start: datetime.date = parse_day_month(first_day, year)
+        end: datetime.date = parse_day_month(last_day or first_day, year)
+        if end < start:
+            end = parse_day_month(last_day, year + 1)
+        return BirthdayBetween(start, end)
+    elif field == "has":
+        return HasField(value.lower())
+    raise ValueError(f"Unknown query filter \"{term}\"")
+
+
+def parse_query(args: list[str]) -> Predicate:
+    """Parse the query filter: the terms are combined by AND, the "or" keyword separates the alternatives
+
+    :param args: the terms and the "or" keywords (list of string, mandatory)
+    :return the query (Predicate)
+    """
+
+    alternatives: list[Predicate] = []
+    terms: list[Predicate] = []
+    for arg in [*args, "or"]:
+        if arg.lower() != "or":
+            terms.append(parse_query_term(arg))
+            continue
+        if not terms:
+            raise IndexError("Invalid command arguments")
+        alternatives.append(terms[0] if len(terms) == 1 else And(*terms))
+        terms = []
+    return alternatives[0] if len(alternatives) == 1 else Or(*alternatives)
+
+
+@input_error(index_error_message="Give me the query filter, please.")
+def show_query(args: list[str], book: AddressBook) -> str:
+    """Return the contacts satisfying the query filter, found by the most selective index, along with the plan
+
+    :param args: arguments with the query filter terms (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return contacts satisfying the query (string)
+    """
+
+    # Verify the number of arguments
+    if len(args) < 1:
+        raise IndexError("Invalid command arguments")
+
+    query: Predicate = parse_query(args)
+    contacts, (index, estimate, total) = book.query_explained(query)
+    return "\n".join([
+        *(str(contact) for contact in contacts),
+        "Found {count} contact(s), {index}: {estimate} of {total} checked.".format(
+            count=len(contacts), index=index, estimate=estimate, total=total,
+        ),
+    ])
+
+
+def show_summary(args: list[str], book: AddressBook) -> str:
+    """Return the aggregate statistics of the address book
+
+    :param args: arguments, not used  (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return statistics (string)
+    """
+
+    statistics = book.statistics
+    lines: list[str] = [
+        f"Contacts: {statistics.contacts}",
+        f"With birthday: {statistics.with_birthday}, without birthday: {statistics.without_birthday}",
+        "Contacts by birth month: {months}".format(
+            months=", ".join(
+                f"{calendar.month_abbr[month]}: {count}" for month, count in sorted(statistics.by_birth_month.items())
+            ) or "-"
+        ),
+        "Emails by domain (top 10): {domains}".format(
+            domains=", ".join(
+                f"{domain}: {count}" for domain, count in statistics.by_email_domain.most_common(10)
+            ) or "-"
+        ),
+        "Contacts by number of phones: {phones}".format(
+            phones=", ".join(
+                f"{phones}: {count}" for phones, count in sorted(statistics.phones_per_contact.items())
+            ) or "-"
+        ),
+    ]
+    cache_info = book.cache_info()
+    if cache_info is not None:
+        lines.append(
+            f"Contacts in memory: {cache_info.currsize} of {cache_info.maxsize}, "
+            f"cache hits: {cache_info.hits}, misses: {cache_info.misses}"
+        )
+    return "\n".join(lines)
+
+
+@input_error()
+def dedupe_contacts(args: list[str], book: AddressBook) -> str:
+    """Merge or list the duplicate contacts
+
+    :param args: arguments with the optional "check" and "birthday" flags (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return Operation status string (string)
+    """
+
+    flags: set[str] = {arg.strip().lower() for arg in args}
+    by_name_birthday: bool = "birthday" in flags
+
+    if "check" in flags:
+        # Only list the clusters of the duplicate contacts
+        clusters: list[list[Record]] = book.find_duplicates(by_name_birthday=by_name_birthday)
+        return "\n---\n".join(
+            "\n".join(str(contact) for contact in cluster) for cluster in clusters
+        ) or "There are no duplicate contacts."
+
+    # Merge the duplicate contacts
+    merged: list[tuple[Record, list[str]]] = book.merge_duplicates(by_name_birthday=by_name_birthday)
+    return "\n".join(
+        "{names} merged into {contact}".format(names=", ".join(names), contact=contact) for contact, names in merged
+    ) or "There are no duplicate contacts."
+
+
+@input_error()
+def undo_command(args: list[str], book: AddressBook) -> str:
+    """Undo the last command, which changed the address book
+
+    :param args: arguments, not used  (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return Operation status string (string)
+    """
+
+    return "Undone {count} change(s).".format(count=count) if (count := len(book.undo())) else "Nothing to undo."
+
+
+@input_error()
+def redo_command(args: list[str], book: AddressBook) -> str:
+    """Redo the last undone command
+
+    :param args: arguments, not used  (list of string, mandatory)
+    :param book: address book (AddressBook, mandatory)
+    :return Operation status string (string)
+    """
+
+    return "Redone {count} change(s).".format(count=count) if (count := len(book.redo())) else "Nothing to redo."
+
+
+def select_tenant(args: list[str], books: BookManager, tenant: str) -> str:
+    """Return the tenant selected by the arguments, or the current one, if it is not specified
+
+    :param args: arguments with the optional tenant ID (list of string, mandatory)
+    :param books: address books manager (BookManager, mandatory)
+    :param tenant: the current tenant ID (string, mandatory)
+    :return the selected tenant ID (string)
+    """
+
+    if args:
+        # Verify the tenant ID, it is the name of the tenant's data file
+        books.datafile(args[0])
+        return args[0]
+    return tenant
+
+
+@input_error(index_error_message="Give me the profiling mode (on or off), please.")
+def profile_session(args: list[str], profiler: SessionProfiler) -> str:
+    """Toggle the capture of the CPU and memory allocation statistics
+
+    :param args: arguments with the profiling mode (list of string, mandatory)
+    :param profiler: session profiler (SessionProfiler, mandatory)
+    :return Operation status string (string)
+    """
+
+    # Verify the number of arguments
+    if len(args) < 1:
+        raise IndexError("Invalid command arguments")
+
+    # Unpack the arguments to the mode
+    mode, *_ = args
+    mode = mode.strip().lower()
+
+    if mode == "on":
+        return "Profiling started." if profiler.start() else "Profiling is already running."
+    elif mode == "off":
+        return "Profiling stopped." if profiler.stop() else "Profiling is not running."
+    else:
+        raise ValueError("The profiling mode must be \"on\" or \"off\"")
 
 
 def main() -> None:
@@ -310,13 +692,31 @@ def main() -> None:
         "change-birthday": change_contact_birthday,
         "show-birthday": show_contact_birthday,
         "birthdays": show_upcoming_birthdays,
+        "birthdays-between": show_birthdays_between,
+        "birthdays-month": show_birthdays_in_month,
+        "dedupe": dedupe_contacts,
+        "summary": show_summary,
+        "phone-prefix": show_phones_by_prefix,
+        "query": show_query,
+        "undo": undo_command,
+        "redo": redo_command,
     }
+    # Commands, which replay the history and are not a part of it
+    history_commands = {"undo", "redo", }
+
+    # Profile the whole session, if it is enabled by the environment variable
+    profiler = SessionProfiler()
+    if os.environ.get(PROFILE_ENV_VARIABLE, "").strip().lower() in {"1", "true", "yes", "on", }:
+        profiler.start()
 
     try:
-        with contacts_bot_data() as book:
+        with contacts_bot_data() as books:
 
             print_help("Enter 'help' for a list of built-in commands.")
 
+            # The commands are routed to the address book of the current tenant
+            tenant: str = os.environ.get(TENANT_ENV_VARIABLE) or DEFAULT_TENANT
+
             while True:
                 command: Optional[str] = None
                 args: list[str] = []
@@ -326,7 +726,10 @@ def main() -> None:
                     break
                 try:
                     if command in address_book_commands:
-                        print_colored(address_book_commands[command](args, book))
+                        with books.book(tenant) as book:
+                            # Each command changes the address book as a single batch, which is undone as a whole
+                            with book.batch() if command not in history_commands else nullcontext():
+                                print_colored(address_book_commands[command](args, book))
                     else:
                         if command in {"close", "exit", "quit", }:
                             break
@@ -335,15 +738,34 @@ def main() -> None:
                             print_help("Enter 'help' for a list of built-in commands.")
                         elif  command == "help":
                             print_help(CONTACTS_BOT_HELP)
+                        elif command == "profile":
+                            print_colored(profile_session(args, profiler))
+                        elif command == "tenant":
+                            try:
+                                tenant = select_tenant(args, books, tenant)
+                                print_colored(f"Current tenant: {tenant}.")
+                            except AddressBookTenantValueError as e:
+                                print_error(e)
                         else:
                             print_error("Invalid command.")
+                except (AddressBookDataFileNotFound, AddressBookDataFileWrongFormat, AddressBookSaveError, ) as e:
+                    # The tenant's data file is loaded by its first command, the failed background save is retried
+                    # by the next run
+                    print_error(e)
                 except Exception as e:
                     print_error("An unexpected error occurred: {error}.".format(error=repr(e)))
-    except (AddressBookDataFileNotFound, AddressBookDataFileWrongFormat, ) as e:
+    except (AddressBookDataFileNotFound, AddressBookDataFileWrongFormat, AddressBookSaveError, ) as e:
         print_error(e)
     except Exception as e:
         print_error("An unexpected error occurred: {error}.".format(error=repr(e)))
 
+    # Write the profiling reports next to the data file, if anything was captured
+    try:
+        if (reports := profiler.report(CONTACTS_FILE)) is not None:
+            print_help("Profiling reports: {reports}".format(reports=", ".join(str(r) for r in reports)))
+    except Exception as e:
+        print_error("An unexpected error occurred: {error}.".format(error=repr(e)))
+
     # Reset console styles to default
     console_style_reset()
 
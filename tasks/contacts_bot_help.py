@@ -14,7 +14,8 @@ Output: "How can I help you?"
 
 ---
 
-2. Command "add [name] [phone number]" – adds a contact
+2. Command "add [name] [phone number]" – adds a contact, or the phone number, if the contact already exists.
+The contact names are case-insensitive in all the commands, for example, "john" finds the contact "John"
 
 Example:
 Input: "add John 1234567890"
@@ -89,7 +90,108 @@ Output: all contacts whose birthday is within the next week, including today, gr
 
 ---
 
-11. Command "quit", "exit", or "close" – ends the bot session
+11. Command "birthdays-between [first day] [last day]" – returns the contacts whose birthday is within the range
+of days in "DD.MM" format, grouped by the congratulation date. The range starts in the current year
+and can wrap around the year
+
+Example:
+Input: "birthdays-between 10.12 05.01"
+Output: all contacts whose birthday is from December 10 to January 5, grouped by date
+
+---
+
+12. Command "birthdays-month [month]" – returns the contacts whose birthday is in the month of the current year,
+grouped by the congratulation date
+
+Example:
+Input: "birthdays-month 3"
+Output: all contacts whose birthday is in March, grouped by date
+
+---
+
+13. Command "summary" – returns the address book statistics: the number of contacts, with and without
+a date of birth, by birth month, the emails by domain and the contacts by number of phones. If the number
+of the contacts in memory is limited by the CONTACTS_BOT_CACHE_SIZE environment variable, the cache hits
+and misses are returned as well
+
+Example:
+Input: "summary"
+Output: the address book statistics
+
+---
+
+14. Command "profile [on|off]" – starts or stops capturing the CPU and memory allocation statistics
+for the following commands. At the end of the session the reports (.pstats and the top allocations)
+are written next to the address book data file. The whole session can be profiled
+by setting the CONTACTS_BOT_PROFILE=1 environment variable.
+
+Example:
+Input: "profile on"
+Output: "Profiling started."
+
+---
+
+15. Command "dedupe [check] [birthday]" – merges the duplicate contacts, which share a phone number or an email,
+into the first added contact. With "check" the duplicates are only listed, with "birthday" the contacts
+with the same name (case-insensitive) and date of birth are also considered duplicates
+
+Example:
+Input: "dedupe check"
+Output: the clusters of the duplicate contacts or "There are no duplicate contacts."
+
+---
+
+16. Command "undo" – reverts the last command, which changed the address book
+
+Example:
+Input: "undo"
+Output: "Undone 1 change(s)." or "Nothing to undo."
+
+---
+
+17. Command "redo" – repeats the last undone command
+
+Example:
+Input: "redo"
+Output: "Redone 1 change(s)." or "Nothing to redo."
+
+---
+
+18. Command "phone-prefix [prefix] [limit]" – returns the phone numbers starting with the prefix, for example, the area
+code, in ascending order, along with the contact names; the limit is optional
+
+Example:
+Input: "phone-prefix 050 10"
+Output: the first ten phone numbers starting with 050
+
+---
+
+19. Command "tenant [tenant ID]" – switches the following commands to the address book of the tenant, or returns
+the current tenant. Each tenant's address book is stored in its own data file, the recently used address books
+are kept in memory, the idle ones are saved and unloaded in the background. The initial tenant can be set
+by the CONTACTS_BOT_TENANT environment variable. The changed address books are saved in the background
+every CONTACTS_BOT_AUTOSAVE_INTERVAL seconds (30 by default) or after CONTACTS_BOT_AUTOSAVE_MUTATIONS changes
+(100 by default)
+
+Example:
+Input: "tenant acme"
+Output: "Current tenant: acme."
+
+---
+
+20. Command "query [filter]" – returns the contacts satisfying the filter. The terms of the filter are combined
+by AND, the "or" keyword separates the alternatives, "-" before a term negates it. Terms: "name:<name>",
+"name~<text>" (the name contains the text), "phone:<prefix>", "email:<email>", "domain:<email domain>",
+"month:<month number>", "birthday:<DD.MM>..<DD.MM>" and "has:<phone, email or birthday>". The contacts are
+found by the most selective index, the last line shows the index and the number of the checked contacts
+
+Example:
+Input: "query domain:example.com month:5 -has:phone"
+Output: the contacts with an email at example.com and a birthday in May, but without a phone number
+
+---
+
+21. Command "quit", "exit", or "close" – ends the bot session
 
 Example:
 Input: any of these words
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Synchronization of the address book data files, for example, the staging and the production copies
+"""
+
+import argparse
+from typing import Optional
+from pathlib import Path
+
+
+from .cutil import console_style_reset, print_error, print_help, print_colored
+from .futil import get_absolute_path
+from .address_book import AddressBook
+from .address_book.book import BookDiff
+from .address_book.error import AddressBookDataFileNotFound, AddressBookDataFileWrongFormat
+
+
+def format_difference(difference: BookDiff) -> str:
+    """Return the readable differences of the address books
+
+    :param difference: names of the added, removed and changed contacts (BookDiff, mandatory)
+    :return differences (string)
+    """
+
+    lines: list[str] = []
+    for title, names in zip(("Added", "Removed", "Changed", ), difference):
+        if names:
+            lines.append(f"{title} ({len(names)}): {', '.join(sorted(names))}")
+    return "\n".join(lines) or "The address books are equal."
+
+
+def sync_data_files(source: Path, target: Path, check: bool = False) -> BookDiff:
+    """Apply the differences of the source data file to the target one, only the changed contacts are written.
+    Both data files are loaded and all their contacts are hashed, so the comparison is O(n) in the number
+    of the contacts, only the applied changes are proportional to the number of the differences.
+
+    :param source: the source data file (Path, mandatory)
+    :param target: the target data file, created if it does not exist (Path, mandatory)
+    :param check: only compare the data files, the target one is not changed (bool, optional)
+    :return names of the added, removed and changed contacts (BookDiff)
+    """
+
+    if not source.is_file():
+        raise AddressBookDataFileNotFound(str(source))
+    source_book: AddressBook = AddressBook.load(source)
+    target_book: AddressBook = AddressBook.load(target)
+    if check:
+        return target_book.diff(source_book)
+    difference: BookDiff = target_book.sync(source_book)
+    if any(difference):
+        target_book.save()
+    return difference
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Synchronize the target address book data file with the source one, "
+                    "applying only the added, removed and changed contacts"
+    )
+    parser.add_argument("source", help="the source data file")
+    parser.add_argument("target", help="the target data file, created if it does not exist")
+    parser.add_argument("--check", action="store_true", help="only list the differences")
+    args = parser.parse_args(argv)
+
+    try:
+        difference: BookDiff = sync_data_files(
+            get_absolute_path(args.source), get_absolute_path(args.target), check=args.check
+        )
+        print_colored(format_difference(difference))
+        if not args.check and any(difference):
+            print_help("The target data file is synchronized.")
+    except (AddressBookDataFileNotFound, AddressBookDataFileWrongFormat, ) as e:
+        print_error(e)
+    except Exception as e:
+        print_error("An unexpected error occurred: {error}.".format(error=repr(e)))
+
+    # Reset console styles to default
+    console_style_reset()
+
+
+if __name__ == "__main__":
+    main()
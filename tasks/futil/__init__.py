@@ -4,7 +4,18 @@ __title__ = 'File Utilities'
 __author__ = 'Roman'
 
 
-from .file import get_absolute_path, build_directory_tree, read_text_file_by_line, load_text_file_data
+from .file import get_absolute_path, build_directory_tree, walk_directory, read_text_file_by_line, load_text_file_data
+from .file import text_file_chunks, read_text_file_chunk, read_text_file_by_chunks, read_text_files
 
 
-__all__ = ['get_absolute_path', 'build_directory_tree', 'read_text_file_by_line', 'load_text_file_data']
+__all__ = [
+    'get_absolute_path',
+    'build_directory_tree',
+    'walk_directory',
+    'read_text_file_by_line',
+    'load_text_file_data',
+    'text_file_chunks',
+    'read_text_file_chunk',
+    'read_text_file_by_chunks',
+    'read_text_files',
+]
@@ -4,8 +4,17 @@
 Functions for works with the files and directories
 """
 
-from collections.abc import Iterator
-from typing import Optional, Any, Union
+import os
+import re
+import glob
+import mmap
+import queue
+import fnmatch
+import threading
+from collections import deque
+from collections.abc import Iterator, Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Any, Union, Callable
 from pathlib import Path
 
 
@@ -32,10 +41,34 @@ def get_absolute_path(path: Union[Path, str], current_dir: Optional[Union[Path,
     return (current_dir if current_dir is not None else Path.cwd()) / path
 
 
-def build_directory_tree(directory_path: Path) -> dict[str, Any]:
-    """Return the given directory tree with metadata
+def _scan_directory(directory_path: str, dir_tree: dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+    """Fill the children of the given directory tree node and return its subdirectories for the further scanning
+
+    :param directory_path: directory path (str, mandatory)
+    :param dir_tree: directory tree node (dictionary, mandatory)
+    :return: subdirectories paths with their tree nodes (list of tuples)
+    """
+    subdirectories: list[tuple[str, dict[str, Any]]] = []
+
+    # Iterate of the directory contents, the entry type and the stat result are cached by the directory entry
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                child: dict[str, Any] = dict(name=entry.name, type='directory', stat=entry.stat(), children=[])
+                subdirectories.append((entry.path, child))
+            else:
+                child = dict(name=entry.name, type='file', stat=entry.stat())
+            dir_tree['children'].append(child)
+
+    return subdirectories
+
+
+def build_directory_tree(directory_path: Path, max_workers: Optional[int] = None) -> dict[str, Any]:
+    """Return the given directory tree with metadata.
+    The subdirectories are scanned iteratively across a thread pool.
 
     :param directory_path: specified directory absolute path (Path, mandatory)
+    :param max_workers: maximum number of the scanning threads, by default depends on CPU count (int, optional)
     :return: directory tree (dictionary)
     """
 
@@ -54,22 +87,146 @@ def build_directory_tree(directory_path: Path) -> dict[str, Any]:
         children=[],
     )
 
-    # Iterate of the directory contents
-    for child in directory_path.iterdir():
-        if child.is_dir():
-            dir_tree['children'].append(build_directory_tree(child))
-        else:
-            dir_tree['children'].append(
-                dict(
-                    name=child.name,
-                    type='file',
-                    stat=child.stat(),
-                )
-            )
+    # Scan the directories, scheduling the found subdirectories, until there is nothing left to scan
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan_directory, str(directory_path), dir_tree)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for subdirectory_path, subdirectory_tree in future.result():
+                    pending.add(executor.submit(_scan_directory, subdirectory_path, subdirectory_tree))
 
     return dir_tree
 
 
+def _matches(relative_path: str, name: str, patterns: Iterable[str]) -> bool:
+    """Check whether the entry name or its relative path matches any of the given glob patterns
+
+    :param relative_path: entry path relative to the walked directory (str, mandatory)
+    :param name: entry name (str, mandatory)
+    :param patterns: glob patterns (iterable of strings, mandatory)
+    :return: True, if any pattern matches (bool)
+    """
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern) for pattern in patterns)
+
+
+def _walk_directory(
+        directory_path: Path,
+        max_depth: Optional[int],
+        include: tuple[str, ...],
+        exclude: tuple[str, ...],
+) -> Iterator[tuple[Path, str, os.stat_result]]:
+    """Walk the directory depth-first, keeping only the open directory iterators of the current branch
+
+    :param directory_path: specified directory path (Path, mandatory)
+    :param max_depth: maximum depth, the directory contents have depth 1 (int, optional)
+    :param include: glob patterns of the files to return, all files if empty (tuple of strings, mandatory)
+    :param exclude: glob patterns of the files and directories to skip (tuple of strings, mandatory)
+    :return: entry path, type and stat result (Iterator of tuples)
+    """
+    root: str = str(directory_path)
+    stack: list[tuple[Any, int]] = [(os.scandir(root), 1)]
+    try:
+        while stack:
+            entries, depth = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                # The directory is over - return to the parent one
+                entries.close()
+                stack.pop()
+                continue
+
+            relative_path: str = os.path.relpath(entry.path, root).replace(os.sep, '/')
+            if exclude and _matches(relative_path, entry.name, exclude):
+                continue
+
+            if entry.is_dir():
+                yield Path(entry.path), 'directory', entry.stat()
+                if max_depth is None or depth < max_depth:
+                    stack.append((os.scandir(entry.path), depth + 1))
+            elif not include or _matches(relative_path, entry.name, include):
+                yield Path(entry.path), 'file', entry.stat()
+    finally:
+        # Close the open directory iterators, if the walk is stopped early
+        for entries, _ in stack:
+            entries.close()
+
+
+def walk_directory(
+        directory_path: Path,
+        max_depth: Optional[int] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        queue_size: int = 1024,
+) -> Iterator[tuple[Path, str, os.stat_result]]:
+    """Return the entries of the given directory tree one by one, with the constant memory.
+    The directories are returned, but only the files are filtered by the include patterns.
+    The excluded directories are not walked.
+
+    :param directory_path: specified directory path (Path, mandatory)
+    :param max_depth: maximum depth, the directory contents have depth 1 (int, optional)
+    :param include: glob patterns of the files to return, all files by default (iterable of strings, optional)
+    :param exclude: glob patterns of the files and directories to skip (iterable of strings, optional)
+    :param queue_size: number of the entries read ahead by a background thread, 0 disables it (int, optional)
+    :return: entry path, type ('directory' or 'file') and stat result (Iterator of tuples)
+    """
+
+    # Verify that the specified path exists
+    if not directory_path.exists():
+        raise ValueError(f'The path "{directory_path}" not found')
+
+    # Verify that the specified path is the file
+    if not directory_path.is_dir():
+        raise ValueError(f'The specified path "{directory_path}" is not a directory')
+
+    walk = _walk_directory(directory_path, max_depth, tuple(include or ()), tuple(exclude or ()))
+    if queue_size <= 0:
+        yield from walk
+        return
+
+    # Read ahead by a background thread into the bounded queue
+    entries: queue.Queue = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+    end_of_walk = object()
+
+    def producer() -> None:
+        try:
+            for item in walk:
+                while not stopped.is_set():
+                    try:
+                        entries.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stopped.is_set():
+                    break
+        except Exception as e:
+            # Pass the error to the consumer
+            item = e
+        else:
+            item = end_of_walk
+        finally:
+            walk.close()
+        while not stopped.is_set():
+            try:
+                entries.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while (item := entries.get()) is not end_of_walk:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Stop the producer, if the caller stops early
+        stopped.set()
+        thread.join()
+
+
 def read_text_file_by_line(file_path: Path) -> Iterator[tuple[int, str]]:
     """Return the next line of the given text file
 
@@ -103,6 +260,126 @@ def read_text_file_by_line(file_path: Path) -> Iterator[tuple[int, str]]:
         raise Exception('An unexpected error occurred: {error}.'.format(error=repr(e)))
 
 
+# Default size of the text file chunks, the chunks are extended to the end of the line
+TEXT_FILE_CHUNK_SIZE: int = 16 * 1024 * 1024
+
+# Line endings of the universal newlines mode: "\r\n", "\r" or "\n"
+_LINE_END_PATTERN = re.compile(rb"\r\n?|\n")
+
+
+def _verify_text_file(file_path: Path) -> None:
+    """Verify that the given text file exists and is the file
+
+    :param file_path: specified text file path (Path, mandatory)
+    """
+
+    # Verify that the specified file exists
+    if not file_path.exists():
+        raise ValueError(f'The file "{file_path}" not found')
+
+    # Verify that the specified path is the file
+    if not file_path.is_file():
+        raise ValueError(f'The specified path "{file_path}" is not a file')
+
+
+def _chunk_boundaries(data: mmap.mmap, chunk_size: int) -> Iterator[tuple[int, int]]:
+    """Return the byte ranges of the newline-aligned chunks of the memory-mapped data.
+    The lines end with "\r\n", "\r" or "\n", as in the universal newlines mode, "\r\n" is not split.
+
+    :param data: memory-mapped data (mmap, mandatory)
+    :param chunk_size: minimal chunk size in bytes (int, mandatory)
+    :return: chunk start and end offsets (Iterator of tuples)
+    """
+    size: int = len(data)
+    start: int = 0
+    while start < size:
+        # Extend the chunk to the end of the line, so the chunk can be decoded independently
+        line_end: Optional[re.Match] = (
+            _LINE_END_PATTERN.search(data, start + chunk_size - 1) if start + chunk_size < size else None
+        )
+        end: int = size if line_end is None else line_end.end()
+        yield start, end
+        start = end
+
+
+def _decode_chunk(data: Union[mmap.mmap, bytes], start: int, end: int) -> list[str]:
+    """Decode the lines of the chunk, removing the trailing whitespaces.
+    The lines end with "\r\n", "\r" or "\n", as in the universal newlines mode.
+
+    :param data: memory-mapped data (mmap, bytes, mandatory)
+    :param start: chunk start offset (int, mandatory)
+    :param end: chunk end offset (int, mandatory)
+    :return: chunk lines (list of strings)
+    """
+    with memoryview(data) as view:
+        lines: list[str] = str(view[start:end], 'utf-8').replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    # The last chunk line ends with the newline, if it is not the end of the file without the newline
+    if lines and not lines[-1]:
+        lines.pop()
+    return [line.rstrip() for line in lines]
+
+
+def text_file_chunks(file_path: Path, chunk_size: int = TEXT_FILE_CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Return the byte ranges of the newline-aligned chunks of the given text file.
+    Each chunk can be read by read_text_file_chunk independently, for example, in a worker process.
+
+    :param file_path: specified text file path (Path, mandatory)
+    :param chunk_size: minimal chunk size in bytes (int, optional)
+    :return: chunk start and end offsets (list of tuples)
+    """
+    _verify_text_file(file_path)
+
+    with open(file_path, 'rb') as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return list(_chunk_boundaries(data, chunk_size))
+
+
+def read_text_file_chunk(file_path: Path, start: int, end: int) -> list[str]:
+    """Return the lines of the given text file chunk
+
+    :param file_path: specified text file path (Path, mandatory)
+    :param start: chunk start offset, returned by text_file_chunks (int, mandatory)
+    :param end: chunk end offset, returned by text_file_chunks (int, mandatory)
+    :return: chunk lines (list of strings)
+    """
+    _verify_text_file(file_path)
+
+    try:
+        with open(file_path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _decode_chunk(data, start, end)
+    except UnicodeDecodeError:
+        # The file data is corrupted
+        # Raise exception to the upper level
+        raise ValueError(f'The file "{file_path}" data is corrupted')
+
+
+def read_text_file_by_chunks(file_path: Path, chunk_size: int = TEXT_FILE_CHUNK_SIZE) -> Iterator[tuple[int, str]]:
+    """Return the next line of the given text file, decoding the memory-mapped file by newline-aligned chunks
+
+    :param file_path: specified text file path (Path, mandatory)
+    :param chunk_size: minimal chunk size in bytes (int, optional)
+    :return: line index and next text line of the file (Iterator of tuples)
+    """
+    _verify_text_file(file_path)
+
+    try:
+        row_number: int = 0
+        with open(file_path, 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for start, end in _chunk_boundaries(data, chunk_size):
+                    for line in _decode_chunk(data, start, end):
+                        yield row_number, line
+                        row_number += 1
+    except UnicodeDecodeError:
+        # The file data is corrupted
+        # Raise exception to the upper level
+        raise ValueError(f'The file "{file_path}" data is corrupted')
+
+
 def load_text_file_data(file_path: Path, remove_empty_lines: bool = False) -> list[str]:
     """Return the content of the given text file
 
@@ -115,3 +392,88 @@ def load_text_file_data(file_path: Path, remove_empty_lines: bool = False) -> li
     file_content = [line for _, line in read_text_file_by_line(file_path) if not remove_empty_lines or line]
     # Return the file data
     return file_content
+
+
+def _read_text_file_lines(file_path: Path, remove_empty_lines: bool) -> list[tuple[int, str]]:
+    """Return the lines of the given text file with the line indexes
+
+    :param file_path: specified text file path (Path, mandatory)
+    :param remove_empty_lines: determines whether to remove empty lines (bool, mandatory)
+    :return: line indexes and lines (list of tuples)
+    """
+    return [
+        (row_number, line) for row_number, line in read_text_file_by_line(file_path) if not remove_empty_lines or line
+    ]
+
+
+def _resolve_text_files(source: Union[Path, str], pattern: str) -> list[Path]:
+    """Return the sorted files of the given directory matching the pattern, or the files matching the given glob
+
+    :param source: directory or glob (str, Path, mandatory)
+    :param pattern: glob pattern of the files in the directory (str, mandatory)
+    :return: file paths (list of Path)
+    """
+    if Path(source).is_dir():
+        return sorted(path for path in Path(source).glob(pattern) if path.is_file())
+    return sorted(Path(path) for path in glob.glob(str(source), recursive=True) if Path(path).is_file())
+
+
+def read_text_files(
+        source: Union[Path, str],
+        pattern: str = '*',
+        remove_empty_lines: bool = False,
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+) -> Iterator[tuple[Path, int, str]]:
+    """Return the lines of the text files from the given directory or glob, read concurrently.
+    The files are returned one after another in the sorted order, the failed files are reported to the error handler
+    and skipped. Without the error handler, the error is raised after the lines of all the other files are returned.
+
+    :param source: directory or glob, for example "feeds/**/*.txt" (str, Path, mandatory)
+    :param pattern: glob pattern of the files, if the directory is given (str, optional)
+    :param remove_empty_lines: determines whether to remove empty lines (bool, optional)
+    :param max_workers: maximum number of the workers, by default depends on CPU count (int, optional)
+    :param use_processes: determines whether to read the files in the process pool instead of threads (bool, optional)
+    :param on_error: the file error handler, receives the file path and the exception (Callable, optional)
+    :return: file path, line index and line (Iterator of tuples)
+    """
+    files: list[Path] = _resolve_text_files(source, pattern)
+
+    executor: Executor = (ProcessPoolExecutor if use_processes else ThreadPoolExecutor)(max_workers=max_workers)
+    # Read a bounded number of the files ahead, keeping the order of the files
+    read_ahead: int = 2 * (max_workers or os.cpu_count() or 1)
+    with executor:
+        pending: deque = deque()
+        # The failed files, which are reported at the end, if there is no error handler
+        failed: list[tuple[Path, Exception]] = []
+        files_iterator: Iterator[Path] = iter(files)
+        for file_path in files_iterator:
+            pending.append((file_path, executor.submit(_read_text_file_lines, file_path, remove_empty_lines)))
+            if len(pending) >= read_ahead:
+                break
+
+        while pending:
+            file_path, future = pending.popleft()
+            # Schedule the next file in place of the current one
+            if (next_file_path := next(files_iterator, None)) is not None:
+                pending.append(
+                    (next_file_path, executor.submit(_read_text_file_lines, next_file_path, remove_empty_lines))
+                )
+            try:
+                lines: list[tuple[int, str]] = future.result()
+            except Exception as e:
+                # Report the file error and continue with the next file
+                if on_error is not None:
+                    on_error(file_path, e)
+                else:
+                    failed.append((file_path, e))
+                continue
+            for row_number, line in lines:
+                yield file_path, row_number, line
+
+    if failed:
+        # Raise exception to the upper level
+        raise ValueError(
+            'The files could not be read: ' + ', '.join(f'"{file_path}" ({e!r})' for file_path, e in failed)
+        ) from failed[0][1]
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-"
+
+__title__ = 'Profiling Utilities'
+__author__ = 'Roman'
+
+
+from .profiler import SessionProfiler
+
+__all__ = ['SessionProfiler']
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Session profiler for capturing the CPU and memory allocation statistics
+"""
+
+import io
+import cProfile
+import pstats
+import tracemalloc
+from typing import Optional
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SessionProfiler:
+    def __init__(self, top_allocations: int = 25):
+        """ Initialize the session profiler
+
+        :param top_allocations: number of the top allocations to include in the report (int, optional)
+        """
+        self.__top_allocations = top_allocations
+        self.__profile = cProfile.Profile()
+        self.__enabled = False
+        self.__captured = False
+        self.__started_tracemalloc = False
+        self.__snapshot: Optional[tracemalloc.Snapshot] = None
+        self.__allocation_reports: list[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        """ Return whether the capture is currently enabled
+
+        :return: capture status (bool)
+        """
+        return self.__enabled
+
+    @property
+    def captured(self) -> bool:
+        """ Return whether anything has been captured since the profiler was created
+
+        :return: capture status (bool)
+        """
+        return self.__captured
+
+    def start(self) -> bool:
+        """ Start the capture, if it is not already started
+
+        :return: True if the capture has been started, False if it is already running (bool)
+        """
+        if self.__enabled:
+            return False
+
+        # Start tracing of the memory allocations, if it is not already traced by someone else
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+        self.__snapshot = tracemalloc.take_snapshot()
+
+        # Start (or continue) collecting the CPU statistics
+        self.__profile.enable()
+        self.__enabled = True
+        self.__captured = True
+        return True
+
+    def stop(self) -> bool:
+        """ Stop the capture, if it is started, and keep the allocation statistics of the capture window
+
+        :return: True if the capture has been stopped, False if it is not running (bool)
+        """
+        if not self.__enabled:
+            return False
+
+        self.__profile.disable()
+        self.__enabled = False
+
+        # Compare the memory allocations with the beginning of the capture window
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        report: list[str] = [
+            f"Capture window #{len(self.__allocation_reports) + 1}: "
+            f"current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB",
+        ]
+        for statistic in snapshot.compare_to(self.__snapshot, "lineno")[:self.__top_allocations]:
+            report.append(str(statistic))
+        self.__allocation_reports.append("\n".join(report))
+        self.__snapshot = None
+
+        # Stop tracing only if it has been started by the profiler
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+        return True
+
+    @contextmanager
+    def capture(self):
+        """ Context manager for capturing a specific block of code
+        """
+        started: bool = self.start()
+        try:
+            yield self
+        finally:
+            if started:
+                self.stop()
+
+    def report(self, datafile: Path) -> Optional[tuple[Path, Path]]:
+        """ Write the CPU statistics (.pstats) and the top allocations report next to the given data file
+
+        :param datafile: the data file path, next to which the reports are written (Path, mandatory)
+        :return: paths of the CPU statistics and the allocations report, if anything was captured (tuple, optional)
+        """
+        # Make sure that the current capture window is closed
+        self.stop()
+
+        if not self.__captured:
+            return None
+
+        # Make the data directory if it does not exist
+        datafile.parent.mkdir(parents=True, exist_ok=True)
+
+        pstats_path: Path = datafile.with_suffix(".pstats")
+        allocations_path: Path = datafile.with_suffix(".allocations.txt")
+
+        # Write the raw CPU statistics, which can be opened by pstats or snakeviz
+        self.__profile.dump_stats(str(pstats_path))
+
+        # Write the human-readable reports: the top functions by cumulative time and the top allocations
+        stream = io.StringIO()
+        pstats.Stats(self.__profile, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            self.__top_allocations
+        )
+        with open(allocations_path, "tw", encoding="utf-8") as fh:
+            fh.write("Top allocations by capture window\n\n")
+            fh.write("\n\n".join(self.__allocation_reports))
+            fh.write("\n\nTop functions by cumulative time\n")
+            fh.write(stream.getvalue())
+
+        return pstats_path, allocations_path
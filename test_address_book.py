@@ -4,7 +4,12 @@
 Tests for AddressBook and Record classes
 """
 
-from tasks.address_book import AddressBook, Record
+import os
+import tempfile
+from pathlib import Path
+
+from tasks.address_book import AddressBook, Record, BookManager, Primary, ReplicationServer, Replica, SharedPublisher, SharedReader
+from tasks.address_book.query import EmailDomain, PhonePrefix
 
 
 def main():
@@ -163,6 +168,223 @@ def main():
     except Exception as e:
         print(e)
 
+    try:
+
+        print("#" * 20, "  Test 7  ", "#" * 20)
+
+        # Create the new address book with the duplicate contacts
+        book = AddressBook(
+            Record("John", birthday="20.02.2002", phones=["1234567890"]),
+            Record("Johnny", phones=["1234567890", "5555555555"]),
+            Record("J. Smith", emails=["john@test.com"], phones=["5555555555"]),
+            Record("john", birthday="20.02.2002", emails=["john.john@test.com"]),
+            Record("Jane", phones=["1111111111"]),
+        )
+
+        # Print the clusters of the duplicate contacts, including the same name with the same birthday
+        for cluster in book.find_duplicates(by_name_birthday=True):
+            print(", ".join(str(record.name) for record in cluster))
+
+        # Merge the duplicate contacts and print all records in the address book
+        book.merge_duplicates(by_name_birthday=True)
+        for name, record in book.items():
+            print(record)
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 8  ", "#" * 20)
+
+        # Apply the batch of changes, which fails halfway and is rolled back
+        try:
+            with book.batch():
+                book.find("John").add_phone("9999999999")
+                book.add_record(Record("Bob", phones=["7777777777"]))
+                book.delete_record("Unknown")
+        except Exception as e:
+            print(e)
+
+        # Print all records in the address book, nothing is changed
+        for name, record in book.items():
+            print(record)
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 9  ", "#" * 20)
+
+        # Replicate the address book to the read-only replica over the local socket
+        with Primary(book, heartbeat=0.1) as primary, ReplicationServer(primary) as server:
+            with Replica(server.address, poll=0.05) as replica:
+                with primary.lock:
+                    book.add_record(Record("Bob", phones=["7777777777"]))
+                    book.find("John").add_email("john@example.com")
+
+                # Wait until the replica applies the mutations and print its records and lag
+                replica.wait(primary.sequence, timeout=5)
+                with replica.lock:
+                    for name, record in replica.book.items():
+                        print(record)
+                print(replica.lag())
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 10 ", "#" * 20)
+
+        # Publish the read-only snapshot of the address book into the shared memory and query it
+        with SharedPublisher(book, f"address-book-{os.getpid()}") as publisher:
+            publisher.publish()
+            with SharedReader(publisher.name) as reader:
+                print(reader.snapshot.find("Bob"))
+                for phone, record in reader.snapshot.find_by_phone_prefix("555"):
+                    print(phone, record.name)
+
+                # Swap the reader to the new snapshot
+                book.find("Jane").edit_birthday("01.01.2000")
+                publisher.publish()
+                for upcoming_birthday in reader.snapshot.birthdays_in_month(1, 2025):
+                    print(upcoming_birthday.congratulation_date.strftime("%d.%m.%Y"), upcoming_birthday.contact)
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 11 ", "#" * 20)
+
+        # Query the contacts with an email at example.com or a phone number starting with 777, and print the plan
+        query = EmailDomain("example.com") | PhonePrefix("777")
+        for record in book.query(query):
+            print(record)
+        print(book.explain(query))
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 12 ", "#" * 20)
+
+        # Open the address books of three tenants, keeping at most two of them in memory
+        with tempfile.TemporaryDirectory() as directory:
+            manager = BookManager(directory, max_open=2)
+            for tenant in ("alice", "bob", "carol", ):
+                with manager.book(tenant) as tenant_book:
+                    tenant_book.add_record(Record(tenant.capitalize(), phones=["1234567890"]))
+
+            # Save and evict the least recently used address book, then load it again from its data file
+            manager.maintain()
+            print(len(manager), manager.datafile("alice").exists())
+            with manager.book("alice") as tenant_book:
+                for name, record in tenant_book.items():
+                    print(record)
+            manager.close()
+            print(len(manager))
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 13 ", "#" * 20)
+
+        # Keep at most two records in memory, the other ones are evicted to the temporary dbm file
+        cached_book = AddressBook(*(Record(f"Contact {i}", phones=[f"12345678{i:02}"]) for i in range(5)), cache_size=2)
+        first = cached_book.find("Contact 0")
+        for i in range(1, 5):
+            cached_book.find(f"Contact {i}")
+
+        # The paged in record is the same instance, so the changes made through both references are kept
+        second = cached_book.find("Contact 0")
+        first.add_phone("5555555555")
+        second.add_email("contact@example.com")
+        for i in range(1, 5):
+            cached_book.find(f"Contact {i}")
+        print(first is second, cached_book.find("Contact 0"))
+        print(cached_book.cache_info())
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 14 ", "#" * 20)
+
+        # Find the contact by the name in another case and Unicode normalization form
+        caseless_book = AddressBook(Record("Zoë", phones=["1234567890"]), Record("JOHN"), Record("John"))
+        print(caseless_book.find("ZOE\u0308"))
+
+        # The name matching many contacts only by the case is ambiguous, nothing is deleted
+        try:
+            caseless_book.delete_record("john")
+        except Exception as e:
+            print(e)
+        print(", ".join(caseless_book.keys()))
+
+        # The exact name is preferred, the variant of the existing name is rejected, if requested
+        caseless_book.delete_record("JOHN")
+        try:
+            caseless_book.add_record(Record("JOHN"), allow_variants=False)
+        except Exception as e:
+            print(e)
+        print(", ".join(caseless_book.keys()))
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 15 ", "#" * 20)
+
+        with tempfile.TemporaryDirectory() as directory:
+            # Write the snapshot of the changed address book, then save it again before the snapshot is committed
+            datafile = Path(directory) / "addressbook.pkl"
+            saved_book = AddressBook.load(datafile)
+            saved_book.add_record(Record("Alice", phones=["1234567890"]))
+            snapshot = saved_book.snapshot()
+            print(saved_book.write_snapshot(snapshot), saved_book.version_stamp)
+            saved_book.add_record(Record("Bob", phones=["5555555555"]))
+            saved_book.save()
+            saved_book.commit_snapshot(snapshot)
+
+            # The version stamp is not rolled back, so the next save does not merge and keeps the undo history
+            print(saved_book.version_stamp)
+            saved_book.find("Bob").add_email("bob@example.com")
+            saved_book.save()
+            print(saved_book.version_stamp, len(saved_book.undo()))
+            for name, record in AddressBook.load(datafile).items():
+                print(record)
+
+    except Exception as e:
+        print(e)
+
+    try:
+
+        print("#" * 20, "  Test 16 ", "#" * 20)
+
+        # Compare the staging copy of the address book with the production one
+        production = AddressBook(Record("Alice", phones=["1234567890"]), Record("Bob", phones=["5555555555"]))
+        staging = AddressBook(Record("Alice", phones=["1234567890"]), Record("Bob", phones=["5555555555"]))
+        print(production.digest() == staging.digest())
+        staging.find("Bob").add_email("bob@example.com")
+        staging.delete_record("Alice")
+        staging.add_record(Record("Carol", birthday="01.05.1990"))
+        print(production.diff(staging))
+
+        # Apply only the differences, the address books become equal
+        production.sync(staging)
+        print(production.digest() == staging.digest(), ", ".join(production.keys()))
+
+    except Exception as e:
+        print(e)
+
     exit(0)
 
 
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-"
+
+"""
+Tests for the file utilities
+"""
+
+import tempfile
+from pathlib import Path
+
+from tasks.futil import read_text_file_by_line, read_text_file_by_chunks
+
+
+def main():
+    try:
+
+        print("#" * 20, "  Test 1  ", "#" * 20)
+
+        with tempfile.TemporaryDirectory() as directory:
+            # Write the text file with the Windows, the old Mac and the Unix line endings
+            file_path = Path(directory) / "lines.txt"
+            file_path.write_bytes(b"first\r\nsecond\rthird\n\r\nlast")
+
+            # The chunked reader splits the lines as the text mode reader does, in the chunks of any size
+            lines = list(read_text_file_by_line(file_path))
+            print(lines)
+            for chunk_size in (1, 4, 1024, ):
+                print(chunk_size, list(read_text_file_by_chunks(file_path, chunk_size=chunk_size)) == lines)
+
+    except Exception as e:
+        print(e)
+
+    exit(0)
+
+
+if __name__ == "__main__":
+    main()